@@ -0,0 +1,79 @@
+from specdal.containers.collection import proximal_join
+from specdal import filters
+from .common import collection
+from .generators import ASD_SPLICES
+
+# the operators modify the collection in place: run each once per setup
+class Stitch(object):
+    number = 1
+
+    def setup(self):
+        # overlapping detectors
+        self.c = collection('sig')
+
+    def time_stitch(self):
+        self.c.stitch(method='mean')
+
+class Interpolate(object):
+    params = ['as7', 'sig']
+    param_names = ['format']
+    number = 1
+
+    def setup(self, fmt):
+        self.c = collection(fmt)
+        if fmt == 'sig':
+            self.c.stitch(method='mean')
+
+    def time_interpolate(self, fmt):
+        self.c.interpolate(spacing=1, method='slinear')
+
+class JumpCorrect(object):
+    number = 1
+
+    def setup(self):
+        self.c = collection('as7')
+
+    def time_jump_correct(self):
+        self.c.jump_correct(splices=ASD_SPLICES, reference=0)
+
+class ProximalJoin(object):
+    number = 1
+
+    def setup(self):
+        self.base = collection('as7', interpolate=True, seed=1, interval=20)
+        self.rover = collection('as7', interpolate=True, start_time=100005)
+
+    def time_proximal_join(self):
+        proximal_join(self.base, self.rover)
+
+class GroupBy(object):
+    def setup(self):
+        self.c = collection('as7')
+
+    def time_groupby(self):
+        self.c.groupby(separator='_', indices=[0])
+
+class Aggregate(object):
+    params = ['mean', 'median', 'min', 'max', 'std']
+    param_names = ['aggregate']
+
+    def setup(self, aggr):
+        self.c = collection('as7')
+
+    def time_aggregate(self, aggr):
+        getattr(self.c, aggr)()
+
+class Filter(object):
+    params = ['std', 'threshold', 'white']
+    param_names = ['filter']
+
+    def setup(self, name):
+        self.c = collection('as7', interpolate=True)
+
+    def time_filter(self, name):
+        if name == 'std':
+            filters.filter_std(self.c, 400, 2400, 1)
+        elif name == 'threshold':
+            filters.filter_threshold(self.c, 400, 2400, 0.1, 0.3)
+        else:
+            filters.filter_white(self.c)
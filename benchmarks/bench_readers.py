@@ -0,0 +1,32 @@
+import os
+from specdal.readers import read
+from specdal.containers.collection import Collection
+from .common import dataset
+from .generators import FORMATS
+
+class ReadFile(object):
+    """Parse a single file of each format and asd version"""
+    params = FORMATS
+    param_names = ['format']
+
+    def setup(self, fmt):
+        directory = dataset(fmt)
+        self.path = os.path.join(directory, sorted(os.listdir(directory))[0])
+
+    def time_read(self, fmt):
+        read(self.path)
+
+class CollectionRead(object):
+    """Read a directory of N files into a Collection"""
+    # the oldest asd version holds no white reference, so it cannot be
+    # read as pct_reflect
+    params = ['as7', 'sig', 'sed', 'pico']
+    param_names = ['format']
+    number = 1
+    timeout = 600
+
+    def setup(self, fmt):
+        self.directory = dataset(fmt)
+
+    def time_read(self, fmt):
+        Collection(name=fmt, directory=self.directory)
@@ -0,0 +1,44 @@
+# common.py provides the datasets shared by the benchmarks. Generated files
+# and parsed collections are cached per process so that setup stays cheap.
+import os
+import pickle
+import tempfile
+from specdal.containers.collection import Collection
+from .generators import generate
+
+# number of spectra per dataset; set SPECDAL_BENCH_N to benchmark at scale
+N = int(os.environ.get('SPECDAL_BENCH_N', 100))
+
+_collections = {}
+
+def dataset(fmt, n=N, **kwargs):
+    """
+    Return a directory holding n generated files of format fmt, reused
+    across processes until the generator arguments change
+    """
+    name = '-'.join(['specdal-bench', fmt, str(n)] +
+                    ['{}{}'.format(k, v) for k, v in sorted(kwargs.items())])
+    directory = os.path.join(tempfile.gettempdir(), name)
+    if not os.path.exists(directory):
+        # generate next to the final directory, then rename, so that an
+        # interrupted run never leaves a partial dataset
+        tmp = tempfile.mkdtemp(dir=tempfile.gettempdir())
+        generate(tmp, fmt, n, **kwargs)
+        try:
+            os.rename(tmp, directory)
+        except OSError:
+            # created by a concurrent process
+            pass
+    return directory
+
+def collection(fmt, n=N, interpolate=False, **kwargs):
+    """
+    Return a fresh Collection of the dataset, optionally interpolated
+    """
+    key = (fmt, n, interpolate, tuple(sorted(kwargs.items())))
+    if key not in _collections:
+        c = Collection(name=fmt, directory=dataset(fmt, n, **kwargs))
+        if interpolate:
+            c.interpolate(spacing=1)
+        _collections[key] = pickle.dumps(c, protocol=pickle.HIGHEST_PROTOCOL)
+    return pickle.loads(_collections[key])
@@ -0,0 +1,201 @@
+# generators.py writes synthetic spectrum files in every format specdal
+# reads, so that the benchmarks can run at any scale without field data.
+# The content follows what the readers in specdal.readers expect.
+import os
+import json
+import struct
+import numpy as np
+from specdal.readers.asd import ASD_GPS_DATA, ASD_DATA_TYPES
+
+FORMATS = ['asd', 'as6', 'as7', 'as8', 'sig', 'sed', 'pico']
+
+# extension written for each format
+EXTENSIONS = {'asd': '.asd', 'as6': '.asd', 'as7': '.asd', 'as8': '.asd',
+              'sig': '.sig', 'sed': '.sed', 'pico': '.pico'}
+
+# FieldSpec detector splices
+ASD_SPLICES = (1000, 1800)
+
+# (start, stop, channels) of the three detectors of an SVC HR-1024, which
+# overlap at their edges
+SIG_DETECTORS = ((338., 1015., 512), (985., 1905., 256), (1880., 2510., 256))
+
+def reflectance(wavelengths, rng, scale=1.):
+    """
+    A vegetation-like reflectance curve: green peak, red edge and water
+    absorption bands, with noise
+    """
+    w = np.asarray(wavelengths, dtype=float)
+    r = 0.04 + 0.05*np.exp(-((w - 550)/40)**2)
+    r = r + 0.4/(1 + np.exp(-(w - 720)/15))
+    r = r - 0.15*np.exp(-((w - 1450)/60)**2) - 0.25*np.exp(-((w - 1940)/80)**2)
+    r = r*scale + rng.normal(0, 0.002, w.size)
+    return np.clip(r, 0.001, None)
+
+def irradiance(wavelengths, peak=20000.):
+    """A smooth, solar-like reference signal"""
+    w = np.asarray(wavelengths, dtype=float)
+    return peak*np.exp(-((w - 700)/700)**2) + 500
+
+def write_asd(path, version='as7', rng=None, gps_time=0, wavestart=350.,
+              channels=2151):
+    """
+    Write a binary ASD file
+
+    Versions 'as6' and later store a white reference after the target
+    spectrum and are written as raw counts; 'asd' files hold reflectance
+    only. The target has additive jumps at the detector splices.
+    """
+    rng = rng or np.random.default_rng()
+    waves = wavestart + np.arange(channels)
+    header = bytearray(484)
+    header[0:3] = version.encode()
+    has_ref = version != 'asd'
+    spectrum_type = 'RAW_TYPE' if has_ref else 'REF_TYPE'
+    header[186] = list(ASD_DATA_TYPES).index(spectrum_type)
+    struct.pack_into('f', header, 191, wavestart)
+    struct.pack_into('f', header, 195, 1.)
+    # data format 2: doubles
+    header[199] = 2
+    struct.pack_into('h', header, 204, channels)
+    # the gps timestamp shares its last byte with the integration time,
+    # so timestamps must stay below 2**24 and integration times a
+    # multiple of 256
+    ASD_GPS_DATA.pack_into(header, 344, 0., 0., 42.1, -76.5, 300., 0, 0, b'\x00',
+                           int(gps_time), 0, 0, 8, 0, 0, 0, 0, b'\x00', b'\x00')
+    struct.pack_into('= L', header, 390, 512)
+    struct.pack_into('f', header, 444, ASD_SPLICES[0])
+    struct.pack_into('f', header, 448, ASD_SPLICES[1])
+    target = reflectance(waves, rng, scale=rng.uniform(0.8, 1.2))
+    target = target + 0.01*(waves > ASD_SPLICES[0]) - 0.01*(waves > ASD_SPLICES[1])
+    with open(path, 'wb') as f:
+        f.write(header)
+        if has_ref:
+            reference = irradiance(waves)
+            f.write(np.asarray(target*reference, dtype='<f8').tobytes())
+            description = b'white reference'
+            ref_header = bytearray(20)
+            ref_header[0:2] = b'\x01\x00'
+            struct.pack_into('H', ref_header, 18, len(description))
+            f.write(ref_header + description)
+            f.write(np.asarray(reference, dtype='<f8').tobytes())
+        else:
+            f.write(np.asarray(target, dtype='<f8').tobytes())
+
+def write_sig(path, rng=None, gps_time=0.):
+    """
+    Write an SVC .sig file with overlapping detectors
+    """
+    rng = rng or np.random.default_rng()
+    waves = np.concatenate([np.linspace(*d) for d in SIG_DETECTORS])
+    reference = irradiance(waves, peak=8000.)
+    target = reference*reflectance(waves, rng, scale=rng.uniform(0.8, 1.2))
+    lines = ['/*** Spectra Vista SIG Data ***/',
+             'name= {}'.format(os.path.basename(path)),
+             'instrument= HI: 1234 (HR-1024i)',
+             'integration= 100, 100, 100, 100, 100, 100',
+             'scan method= Time-based, Time-based',
+             'scan settings= 1.0, 1.0',
+             'optic= LENS4, LENS4',
+             'temp= 30.1, 2.0, -5.5, 30.2, 2.1, -5.4',
+             'battery= 7.9, 7.9',
+             'units= Radiance, Radiance',
+             'gpstime= {:.2f}, {:.2f}'.format(gps_time - 5, gps_time),
+             'data= ']
+    lines.extend('{:.1f}  {:.2f}  {:.2f}  {:.2f}'.format(w, r, t, 100*t/r)
+                 for w, r, t in zip(waves, reference, target))
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+def write_sed(path, rng=None):
+    """
+    Write a Spectral Evolution .sed file
+    """
+    rng = rng or np.random.default_rng()
+    waves = np.arange(350, 2501)
+    reference = irradiance(waves)
+    target = reference*reflectance(waves, rng, scale=rng.uniform(0.8, 1.2))
+    lines = ['Comment: ',
+             'Version: 2.3 [1.2.6286]',
+             'File Name: {}'.format(os.path.basename(path)),
+             'Instrument: PSR-3500 (SN: 1234)',
+             'Detectors: 512,256,256',
+             'Measurement: REFLECTANCE',
+             'Date: 06/01/2017,06/01/2017',
+             'Time: 10:00:00.00,10:00:05.00',
+             'Temperature (C): 30.1,2.0,-5.5,30.2,2.1,-5.4',
+             'Battery Voltage: 7.9',
+             'Averages: 10,10',
+             'Integration: 10,10,10,10,10,10',
+             'Dark Mode: AUTO,AUTO',
+             'Foreoptic: LENS4 {DN},LENS4 {DN}',
+             'Radiometric Calibration: RADIANCE',
+             'Units: W/m^2/sr/nm',
+             'GPS Time: n/a',
+             'Wavelength Range: 350,2500',
+             'Channels: 2151',
+             'Data:',
+             'Wvl\tRad. (Ref.)\tRad. (Target)\tTgt./Ref. %']
+    lines.extend('{}\t{:.3e}\t{:.3e}\t{:.2f}'.format(w, r, t, 100*t/r)
+                 for w, r, t in zip(waves, reference, target))
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+def write_pico(path, rng=None, pixels=1024):
+    """
+    Write a Piccolo .pico file holding the light and dark spectra of both
+    directions
+    """
+    rng = rng or np.random.default_rng()
+    coefficients = [340., 0.72, -1e-5]
+    waves = np.poly1d(coefficients[::-1])(range(pixels))
+    downwelling = irradiance(waves, peak=50000.)
+    upwelling = downwelling*reflectance(waves, rng, scale=rng.uniform(0.8, 1.2))
+    dark = 1000.
+    spectra = []
+    for direction, signal in (('Upwelling', upwelling),
+                              ('Downwelling', downwelling)):
+        for is_dark in (False, True):
+            counts = np.full(pixels, dark) if is_dark else signal + dark
+            counts = counts + rng.normal(0, 5, pixels)
+            spectra.append({
+                'Metadata': {'name': 'QEP01234', 'Dark': is_dark,
+                             'Direction': direction,
+                             'WavelengthCalibrationCoefficients': coefficients,
+                             'IntegrationTime': 100.,
+                             'SaturationLevel': 200000},
+                'Pixels': [int(c) for c in counts]})
+    with open(path, 'w') as f:
+        json.dump({'Spectra': spectra}, f)
+
+def generate(directory, fmt='as7', n=100, groups=10, seed=0,
+             start_time=100000, interval=10):
+    """
+    Write n synthetic files of format fmt to directory
+
+    Files are named <group>_<i>.<ext> (e.g. plot03_0007.asd), so they
+    can be grouped on index 0 with separator '_'. GPS times (asd, sig)
+    increase by interval from start_time.
+
+    Returns
+    -------
+    list of the written paths
+    """
+    assert fmt in FORMATS
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(n):
+        path = os.path.join(directory, 'plot{:02d}_{:04d}{}'.format(
+            i % groups, i, EXTENSIONS[fmt]))
+        gps_time = start_time + i*interval
+        if fmt == 'sig':
+            write_sig(path, rng, gps_time=gps_time)
+        elif fmt == 'sed':
+            write_sed(path, rng)
+        elif fmt == 'pico':
+            write_pico(path, rng)
+        else:
+            write_asd(path, fmt, rng, gps_time=gps_time)
+        paths.append(path)
+    return paths
@@ -0,0 +1,75 @@
+"""
+Run the benchmarks without asv
+
+    python -m benchmarks.run [-n N] [-r REPEAT] [PATTERN]
+
+The benchmark modules follow asv conventions (classes with setup, time_*
+methods, params and number) so they also run with ``asv run``.
+"""
+import os
+import sys
+import time
+import argparse
+import importlib
+import itertools
+import pkgutil
+import re
+
+def _params(cls):
+    params = getattr(cls, 'params', None)
+    if params is None:
+        return [()]
+    if not (params and isinstance(params[0], (list, tuple))):
+        params = [params]
+    return list(itertools.product(*params))
+
+def _time(cls, method, args, number, repeat):
+    """Return the per-call times of repeat samples of number calls"""
+    samples = []
+    for _ in range(repeat):
+        bench = cls()
+        if hasattr(bench, 'setup'):
+            bench.setup(*args)
+        function = getattr(bench, method)
+        start = time.perf_counter()
+        for _ in range(number):
+            function(*args)
+        samples.append((time.perf_counter() - start)/number)
+        if hasattr(bench, 'teardown'):
+            bench.teardown(*args)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description='SpecDAL benchmarks')
+    parser.add_argument('pattern', nargs='?', default='',
+                        help='only run benchmarks whose name matches this regex')
+    parser.add_argument('-n', type=int, default=None,
+                        help='number of spectra per dataset (SPECDAL_BENCH_N)')
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = parser.parse_args()
+    if args.n is not None:
+        os.environ['SPECDAL_BENCH_N'] = str(args.n)
+    package = importlib.import_module('benchmarks')
+    pattern = re.compile(args.pattern)
+    for info in pkgutil.iter_modules(package.__path__):
+        if not info.name.startswith('bench_'):
+            continue
+        module = importlib.import_module('benchmarks.' + info.name)
+        for cls_name, cls in sorted(vars(module).items()):
+            if not (isinstance(cls, type) and cls.__module__ == module.__name__):
+                continue
+            for method in sorted(m for m in dir(cls) if m.startswith('time_')):
+                for args_ in _params(cls):
+                    name = '{}.{}.{}({})'.format(info.name, cls_name, method,
+                                                 ', '.join(map(str, args_)))
+                    if not pattern.search(name):
+                        continue
+                    samples = _time(cls, method, args_,
+                                    getattr(cls, 'number', 1), args.repeat)
+                    samples.sort()
+                    print('{:<60} {:>10.4f}s {:>10.4f}s'.format(
+                        name, samples[0], samples[len(samples)//2]))
+                    sys.stdout.flush()
+
+if __name__ == '__main__':
+    main()
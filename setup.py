@@ -19,8 +19,9 @@ setup(name='specdal',
       license='MIT',
       packages=['specdal',  'specdal.gui','specdal.gui.pyqt',
           'specdal.readers','specdal.containers',
-          'specdal.operators','specdal.filters'],
+          'specdal.operators','specdal.filters','specdal.writers'],
       install_requires=['numpy', 'pandas', 'matplotlib', 'scipy','pyqt5'],
+      extras_require={'hdf5': ['h5py']},
       package_data = {'':['specdal/gui/select.png'],
                       'specdal.gui.pyqt':['Assets/*.*']},
       include_package_data = True,
@@ -31,5 +32,5 @@ setup(name='specdal',
           'Topic :: Scientific/Engineering :: Atmospheric Science',
           'Programming Language :: Python :: 3',
       ],
-      python_requires='>=3'
+      python_requires='>=3.7'
 )
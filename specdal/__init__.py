@@ -1,5 +1,28 @@
-from .containers.spectrum import Spectrum
-from .containers.collection import Collection, df_to_collection, proximal_join
-from .readers import read
+from importlib import import_module
 
-# __all__ = ['spectrum', 'collection', 'reader']
+__all__ = ['Spectrum', 'LazySpectrum', 'Collection', 'df_to_collection', 'hdf_to_collection',
+           'proximal_join', 'read']
+
+# the top level names are imported on first access so that importing a
+# subpackage (e.g. specdal.readers) does not pull in every container and
+# operator along with pandas
+_LAZY_ATTRS = {
+    'Spectrum': '.containers.spectrum',
+    'LazySpectrum': '.containers.lazy',
+    'Collection': '.containers.collection',
+    'df_to_collection': '.containers.collection',
+    'hdf_to_collection': '.containers.collection',
+    'proximal_join': '.containers.collection',
+    'read': '.readers',
+}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        value = getattr(import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module {!r} has no attribute {!r}".format(
+        __name__, name))
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,191 @@
+# cache.py provides a content-addressed cache for the results of processing
+# stages, and a manifest of written outputs, so that re-running a pipeline
+# only recomputes and rewrites what its changed inputs and arguments affect.
+import os
+import json
+import pickle
+import hashlib
+from os.path import abspath, expanduser
+from specdal import instrument
+
+def fingerprint(*parts):
+    """
+    Return a hex digest identifying parts
+
+    parts can be any json serializable values (tuples, lists, dicts,
+    strings, numbers); other objects are identified by their str().
+    """
+    text = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+def fingerprint_directory(directory, recursive=False):
+    """
+    Fingerprint the files of a directory by name, size and modification time
+    """
+    directory = abspath(expanduser(directory))
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        if not recursive and dirpath != directory:
+            continue
+        for f in sorted(filenames):
+            stat = os.stat(os.path.join(dirpath, f))
+            entries.append((os.path.relpath(os.path.join(dirpath, f),
+                                            directory),
+                            stat.st_size, stat.st_mtime_ns))
+    return fingerprint(directory, entries)
+
+def fingerprint_spectrum(spectrum):
+    """
+    Fingerprint a spectrum by its name, wavelengths and values
+    """
+    h = hashlib.sha1(str(spectrum.name).encode())
+    measurement = spectrum.measurement
+    if measurement is not None:
+        h.update(str(measurement.name).encode())
+        h.update(measurement.index.values.tobytes())
+        h.update(measurement.values.tobytes())
+    return h.hexdigest()
+
+def fingerprint_collection(collection):
+    """
+    Fingerprint a collection by the fingerprints of its spectra
+    """
+    return fingerprint(collection.name,
+                       [fingerprint_spectrum(s) for s in collection.spectra])
+
+class StageCache(object):
+    """
+    Pickled stage results stored under directory, keyed by stage name and
+    a fingerprint of the stage's input and arguments.
+
+    Entries that were not used since the cache was opened can be removed
+    with prune(), which keeps the cache at the size of a single run.
+    """
+    def __init__(self, directory):
+        self.directory = abspath(expanduser(directory))
+        os.makedirs(self.directory, exist_ok=True)
+        self._used = set()
+
+    def _path(self, stage, key):
+        return os.path.join(self.directory, '{}-{}.pkl'.format(stage, key))
+
+    def __contains__(self, item):
+        stage, key = item
+        return os.path.exists(self._path(stage, key))
+
+    def get(self, stage, key):
+        self._used.add(self._path(stage, key))
+        with instrument.stage('StageCache.get'):
+            with open(self._path(stage, key), 'rb') as f:
+                return pickle.load(f)
+
+    def put(self, stage, key, value):
+        path = self._path(stage, key)
+        self._used.add(path)
+        # write then rename so an interrupted run never leaves a bad entry
+        with instrument.stage('StageCache.put'):
+            with open(path + '.tmp', 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + '.tmp', path)
+
+    def touch(self, stage, key):
+        """Mark an entry as used without loading it"""
+        self._used.add(self._path(stage, key))
+
+    def prune(self):
+        """Remove the entries not used since the cache was opened"""
+        for f in os.listdir(self.directory):
+            path = os.path.join(self.directory, f)
+            if f.endswith('.pkl') and path not in self._used:
+                os.remove(path)
+
+def _touch(cache, stages):
+    """Mark stages, and the chains of stages they read, as used"""
+    for name, key, function, *inputs in stages:
+        cache.touch(name, key)
+        for chain in (inputs[0] if inputs else ()):
+            _touch(cache, chain)
+
+def run_stages(stages, cache=None):
+    """
+    Run a chain of stages, reusing cached results
+
+    Parameters
+    ----------
+    stages: list
+        (name, key, function) tuples. function receives the result of the
+        previous stage (None for the first) and returns its own result.
+        key must fingerprint everything the result depends on, including
+        the key of the previous stage. A stage that also runs other
+        chains of stages (e.g. a join) lists them as a fourth element,
+        (name, key, function, [chain, ...]), so that they are kept by
+        StageCache.prune when its result is reused.
+
+    cache: StageCache or None
+        if None, every stage is run
+
+    Returns
+    -------
+    the result of the last stage
+
+    Notes
+    -----
+    Only the result of the last cached stage is loaded; the stages after
+    it are run and their results stored.
+    """
+    start = 0
+    result = None
+    if cache is not None:
+        for i in range(len(stages) - 1, -1, -1):
+            name, key = stages[i][:2]
+            if (name, key) in cache:
+                result = cache.get(name, key)
+                start = i + 1
+                _touch(cache, stages[:i + 1])
+                break
+    for name, key, function, *inputs in stages[start:]:
+        result = function(result)
+        if cache is not None:
+            cache.put(name, key, result)
+    return result
+
+class OutputManifest(object):
+    """
+    Content keys of the files written to an output directory by the last
+    run, used to skip rewriting outputs whose content did not change.
+    """
+    FILENAME = '.specdal_manifest.json'
+
+    def __init__(self, directory):
+        self.directory = abspath(expanduser(directory))
+        self.path = os.path.join(self.directory, self.FILENAME)
+        self._old = {}
+        self._new = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self._old = json.load(f)
+
+    def _relpath(self, filepath):
+        return os.path.relpath(abspath(filepath), self.directory)
+
+    def changed(self, filepath, key):
+        """Return True if filepath has to be (re)written for content key"""
+        return not (os.path.exists(filepath) and
+                    self._old.get(self._relpath(filepath)) == key)
+
+    def record(self, filepath, key):
+        self._new[self._relpath(filepath)] = key
+
+    def save(self, remove_stale=True):
+        """
+        Write the manifest of this run, removing outputs of the previous
+        run that were not produced again.
+        """
+        if remove_stale:
+            for relpath in set(self._old) - set(self._new):
+                path = os.path.join(self.directory, relpath)
+                if os.path.isfile(path):
+                    os.remove(path)
+        with open(self.path, 'w') as f:
+            json.dump(self._new, f, sort_keys=True, indent=0)
+        self._old = dict(self._new)
@@ -1,7 +1,5 @@
-from os.path import dirname, basename, isfile 
-import glob
-modules = glob.glob(dirname(__file__)+"/*.py")
-__all__ = [ basename(f)[:-3] for f in modules if isfile(f) and not f.endswith('__init__.py')]
+__all__ = ['collection', 'spectrum', 'lazy']
 
 from .spectrum import Spectrum
+from .lazy import LazySpectrum
 from .collection import *
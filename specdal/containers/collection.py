@@ -5,10 +5,16 @@ import pandas as pd
 import numpy as np
 from collections import OrderedDict, defaultdict
 from .spectrum import Spectrum
+from .lazy import LazySpectrum, LRUCache, CACHE_SIZE
+from .flags import RowIndex, Flags, DEFAULT_LAYER, read_flag_file
 import specdal.operators as op
-from itertools import groupby
-from specdal.readers import read
+from specdal import parallel
+from itertools import groupby, compress
+from specdal.readers import read, SUPPORTED_READERS
+from specdal.readers.sniff import sniff as sniff_format
+from specdal.instrument import stage
 import copy
+import json
 import logging
 from os.path import abspath, expanduser, splitext
 import os
@@ -27,7 +33,7 @@ def separator_with_filler_keyfun(spectrum, separator, indices, filler='.'):
     return separator.join([elements[i] if i in indices else
                            fill for i in range(len(elements))])
 
-def df_to_collection(df, name, measure_type='pct_reflect'):
+def df_to_collection(df, name, measure_type='pct_reflect', dtype=None):
     '''
     Create a collection from a pandas.DataFrame
     
@@ -39,13 +45,16 @@ def df_to_collection(df, name, measure_type='pct_reflect'):
     
     name: string
         Name to assign to collection
+
+    dtype: numpy dtype or string
+        Precision of the collection (see Collection)
     
     Returns
     -------
     c: specdal.Collection object
     
     '''
-    c = Collection(name=name, measure_type=measure_type)
+    c = Collection(name=name, measure_type=measure_type, dtype=dtype)
     wave_cols, meta_cols = op.get_column_types(df)
     metadata_dict = defaultdict(lambda: None)
     if len(meta_cols) > 0:
@@ -58,6 +67,81 @@ def df_to_collection(df, name, measure_type='pct_reflect'):
                           metadata=metadata_dict[spectrum_name]))
     return c
 
+# layout version written to the attributes of HDF5 collection files
+HDF_FORMAT_VERSION = 1
+
+def _import_h5py():
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError("HDF5 input/output requires h5py "
+                          "(pip install h5py)")
+    return h5py
+
+def _json_default(obj):
+    """Convert numpy scalars and other metadata values for json.dumps"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)
+
+def hdf_to_collection(path, name=None, dtype=None):
+    '''
+    Create a collection from an HDF5 file written by Collection.to_hdf
+    
+    Parameters
+    ----------
+
+    path: string
+        Path of the HDF5 file
+    
+    name: string
+        Name to assign to collection. Defaults to the stored name.
+
+    dtype: numpy dtype or string
+        Precision of the collection (see Collection). Defaults to the
+        dtype of the stored collection.
+    
+    Returns
+    -------
+    c: specdal.Collection object
+
+    Notes
+    -----
+    Metadata is stored as json, so tuples are returned as lists.
+    '''
+    h5py = _import_h5py()
+    with h5py.File(abspath(expanduser(path)), 'r') as f:
+        if name is None:
+            name = f.attrs['name']
+        if dtype is None and f.attrs.get('dtype'):
+            dtype = f.attrs['dtype']
+        measure_type = f.attrs['measure_type']
+        wavelength = pd.Index(f['wavelength'][:], name='wavelength')
+        values = f['values'][:]
+        if dtype is not None:
+            values = values.astype(dtype, copy=False)
+        names = f['name'].asstr()[:]
+        flags = f['flags'][:]
+        metadata = f['metadata'].asstr()[:]
+        interpolated = f['interpolated'][:]
+        stitched = f['stitched'][:]
+        jump_corrected = f['jump_corrected'][:]
+    spectra = []
+    for i in range(len(names)):
+        measurement = pd.Series(values[i], index=wavelength, copy=False,
+                                name=measure_type)
+        spectra.append(Spectrum(name=names[i], measurement=measurement,
+                                measure_type=measure_type,
+                                metadata=json.loads(
+                                    metadata[i], object_pairs_hook=OrderedDict),
+                                interpolated=bool(interpolated[i]),
+                                stitched=bool(stitched[i]),
+                                jump_corrected=bool(jump_corrected[i])))
+    return Collection(name=name, spectra=spectra, measure_type=measure_type,
+                      flags=names[flags], dtype=dtype)
+
 def proximal_join(base, rover, on='gps_time_tgt', direction='nearest'):
     '''
     Perform proximal join and return a new collection.
@@ -75,8 +159,14 @@ def proximal_join(base, rover, on='gps_time_tgt', direction='nearest'):
         default: specdal.Collection object
         if output_df is True: pandas.DataFrame object
     '''
+    with stage('proximal_join', items=len(rover.spectra) if
+               isinstance(rover, Collection) else len(rover)):
+        return _proximal_join(base, rover, on, direction)
+
+def _proximal_join(base, rover, on, direction):
     result = None
     return_collection = False
+    dtype = None
     name = 'proximally_joined'
     # ensure that wavelength indices are monotonically increasing
     if (pd.Series(rover.data.index).diff()[1:] <= 0).any() or \
@@ -95,27 +185,69 @@ def proximal_join(base, rover, on='gps_time_tgt', direction='nearest'):
     if isinstance(rover, Collection):
         return_collection = True
         name = rover.name
+        dtype = rover.dtype
         rover = rover.data_with_meta(fields=[on])
     result = op.proximal_join(base, rover, on=on, direction=direction)
     if return_collection:
-        result = df_to_collection(result, name=name)
+        result = df_to_collection(result, name=name,
+                                  dtype=dtype)
     return result
 
+def _wavelength_runs(spectra):
+    """Split spectra into runs of consecutive spectra sharing wavelengths"""
+    runs = []
+    for spectrum in spectra:
+        if runs:
+            index = spectrum.measurement.index
+            previous = runs[-1][-1].measurement.index
+            if index is previous or (len(index) == len(previous) and
+                                     np.array_equal(index.values, previous.values)):
+                runs[-1].append(spectrum)
+                continue
+        runs.append([spectrum])
+    return runs
+
 ################################################################################
 # main Collection class
 class Collection(object):
     """
     Represents a dataset consisting of a collection of spectra
+
+    Parameters
+    ----------
+
+    lazy: boolean
+        Only read the file headers of directory; the measurements are
+        read when they are first used (see LazySpectrum).
+
+    cache_size: int
+        Number of measurements of lazy spectra kept in memory, the least
+        recently used being dropped first. None keeps all of them.
+
+    Notes
+    -----
+    Flags are boolean arrays aligned with the order of the spectra, in
+    named layers (see flag_layer). Collection.flags is the "manual"
+    layer, set by flag() and unflag() and in the viewers; a spectrum is
+    flagged when it is flagged in any layer.
     """
+    # class defaults for collections pickled before dtype and lazy
+    # reading existed
+    dtype = None
+    cache_size = CACHE_SIZE
     def __init__(self, name, directory=None, spectra=None,
-                 measure_type='pct_reflect', metadata=None, flags=None):
+                 measure_type='pct_reflect', metadata=None, flags=None,
+                 sniff=False, dtype=None, lazy=False, cache_size=CACHE_SIZE):
         self.name = name
+        self.dtype = None if dtype is None else np.dtype(dtype)
+        self.cache_size = cache_size
+        self._cache = LRUCache(cache_size)
         self.spectra = spectra
         self.measure_type = measure_type
         self.metadata = metadata
         self.flags = flags
         if directory:
-            self.read(directory, measure_type)
+            self.read(directory, measure_type, sniff=sniff, lazy=lazy)
     @property
     def spectra(self):
         """
@@ -130,46 +262,114 @@ class Collection(object):
 
     @spectra.setter
     def spectra(self, value):
+        # flags are kept by name for the spectra still in the collection
+        flagged = OrderedDict((name, list(layer)) for name, layer in
+                              getattr(self, '_layers', {}).items())
         self._spectra = OrderedDict()
         if value is not None:
             # assume value is an iterable such as list
             for spectrum in value:
                 assert spectrum.name not in self._spectra
+                if self.dtype is not None:
+                    spectrum.set_dtype(self.dtype)
+                if isinstance(spectrum, LazySpectrum):
+                    spectrum.attach(self._cache)
                 self._spectra[spectrum.name] = spectrum
+        self._index = RowIndex(self._spectra)
+        self._layers = OrderedDict((name, Flags(self._index, name))
+                                   for name in flagged or [DEFAULT_LAYER])
+        for name, names in flagged.items():
+            self._layers[name].set(names)
     @property
     def flags(self):
         """
-        A dict of flags for each spectrum in the collection
+        The "manual" layer of flags, behaving as the set of flagged
+        spectrum names (see specdal.containers.flags.Flags)
         """
-        return self._flags
+        return self._layers[DEFAULT_LAYER]
     @flags.setter
     def flags(self, value):
         '''
-        TODO: test this
+        Flag the spectra named in value, an iterable of names, in the
+        "manual" layer and unflag the others
         '''
-        self._flags = defaultdict(lambda: False)
-        if value is not None:
-            for v in value:
-                if v in self._spectra:
-                    self._flags[v] = True
-    def flag(self, spectrum_name):
-        self.flags[spectrum_name] = True
+        layer = self._layers[DEFAULT_LAYER]
+        names = [] if value is None else list(value)
+        layer.clear()
+        layer.set(names)
+    @property
+    def flag_layers(self):
+        """ Names of the layers of flags """
+        return list(self._layers)
+    def flag_layer(self, layer=DEFAULT_LAYER):
+        """ Return the Flags of layer, creating it when needed """
+        if layer not in self._layers:
+            self._layers[layer] = Flags(self._index, layer)
+        return self._layers[layer]
+    def flag(self, names, layer=DEFAULT_LAYER):
+        """ Flag a spectrum name or an iterable of names in layer """
+        self.flag_layer(layer).set(names, True)
 
-    def unflag(self, spectrum_name):
-        del self.flags[spectrum_name]
+    def unflag(self, names, layer=DEFAULT_LAYER):
+        """ Unflag a spectrum name or an iterable of names in layer """
+        self.flag_layer(layer).set(names, False)
 
-    def as_flagged(self):
-        """ Return a collection with just the flagged spectra """
-        flags = set(self.flags)
-        spectra = [s for s in self.spectra if s.name in flags]
-        return Collection(self.name+'_flagged', None,
-                spectra=spectra, metadata=self.metadata, flags=self.flags)
-    def as_unflagged(self):
+    def apply_flag_files(self, paths, layer=DEFAULT_LAYER):
+        '''
+        Flag in layer the spectra named in one or more flag files, as
+        saved by the viewers, and return the number of spectra flagged
+        in layer
+
+        Names that are not in the collection are counted in a warning.
+        '''
+        if isinstance(paths, str):
+            paths = [paths]
+        names = []
+        for path in paths:
+            names.extend(read_flag_file(path))
+        rows = self._index.lookup(names)
+        missing = np.count_nonzero(rows < 0)
+        if missing:
+            logging.warning("{} of the {} names in the flag files are not "
+                            "in collection {}".format(missing, len(names), self.name))
+        mask = self.flag_layer(layer).mask
+        mask[rows[rows >= 0]] = True
+        return int(np.count_nonzero(mask))
+
+    def flag_mask(self, layers=None):
+        '''
+        Return a boolean array, in the order of the spectra, of the
+        spectra flagged in any of layers (default: every layer)
+        '''
+        if layers is None:
+            layers = list(self._layers)
+        elif isinstance(layers, str):
+            layers = [layers]
+        mask = np.zeros(len(self._index), dtype=bool)
+        for layer in layers:
+            if layer in self._layers:
+                mask |= self._layers[layer].mask
+        return mask
+
+    def _subset(self, name, mask):
+        """ A collection of the spectra in mask, sharing their objects """
+        result = Collection(name, None, measure_type=self.measure_type,
+                            metadata=self.metadata, dtype=self.dtype,
+                            cache_size=self.cache_size)
+        # with the cache shared, attaching the lazy spectra leaves the
+        # measurements of this collection in place
+        result._cache = self._cache
+        result.spectra = list(compress(self._spectra.values(), mask))
+        for layer, flags in self._layers.items():
+            result.flag_layer(layer).set_mask(flags.mask[mask])
+        return result
+
+    def as_flagged(self, layers=None):
         """ Return a collection with just the flagged spectra """
-        flags = set(self.flags)
-        spectra = [s for s in self.spectra if not s.name in flags]
-        return Collection(self.name+'_unflagged', None,
-                spectra=spectra, metadata=self.metadata, flags=None)
+        return self._subset(self.name+'_flagged', self.flag_mask(layers))
+    def as_unflagged(self, layers=None):
+        """ Return a collection with just the unflagged spectra """
+        return self._subset(self.name+'_unflagged', ~self.flag_mask(layers))
         
     def _check_uniform_wavelengths(self):
         warning =\
@@ -206,7 +406,8 @@ unpredictable behavior."""
 
     def _unflagged_data(self):
         try:
-            spectra = [s for s in self.spectra if not s.name in self.flags]
+            spectra = list(compress(self._spectra.values(),
+                                    ~self.flag_mask()))
             return pd.concat(objs=[s.measurement for s in spectra],
                              axis=1, keys=[s.name for s in spectra])
         except (ValueError, pd.core.indexes.base.InvalidIndexError) as err:
@@ -225,7 +426,20 @@ unpredictable behavior."""
         """
         assert spectrum.name not in self._spectra
         assert isinstance(spectrum, Spectrum)
+        if self.dtype is not None:
+            spectrum.set_dtype(self.dtype)
+        if isinstance(spectrum, LazySpectrum):
+            spectrum.attach(self._cache)
         self._spectra[spectrum.name] = spectrum
+        self._index.append(spectrum.name)
+    def set_dtype(self, dtype):
+        """
+        Convert every spectrum to dtype (e.g. "float32") and keep the
+        collection at that precision. None stops converting.
+        """
+        self.dtype = None if dtype is None else np.dtype(dtype)
+        for spectrum in self.spectra:
+            spectrum.set_dtype(self.dtype)
         
     def data_with_meta(self, data=True, fields=None):
         """
@@ -268,66 +482,212 @@ unpredictable behavior."""
         return self._spectra[key]
     def __delitem__(self, key):
         self._spectra.__delitem__(key)
-        self._flags.__delitem__(key)
+        row = self._index.remove(key)
+        for layer in self._layers.values():
+            layer.delete(row)
     def __missing__(self, key):
         pass
     def __len__(self):
         return len(self._spectra)
     def __contains__(self, item):
-        self._spectra.__contains__(item)
+        return self._spectra.__contains__(item)
+    def __getstate__(self):
+        # flags are pickled as the flagged names of each layer
+        state = self.__dict__.copy()
+        state['_layers'] = OrderedDict((name, list(layer)) for name, layer
+                                       in self._layers.items())
+        state.pop('_index', None)
+        state.pop('_cache', None)
+        return state
+    def __setstate__(self, state):
+        # collections pickled before flag layers hold a list of names
+        layers = state.pop('_layers', None) or \
+            OrderedDict([(DEFAULT_LAYER, state.pop('_flags', []))])
+        self.__dict__.update(state)
+        self._index = RowIndex(self._spectra)
+        self._layers = OrderedDict()
+        for name, names in layers.items():
+            self.flag(names, name)
+        self.flag_layer(DEFAULT_LAYER)
+        self._cache = LRUCache(self.cache_size)
+        for spectrum in self._spectra.values():
+            if isinstance(spectrum, LazySpectrum):
+                spectrum.attach(self._cache)
     ##################################################
     # reader
     def read(self, directory, measure_type='pct_reflect',
              ext=[".asd", ".sed", ".sig",".pico",".light"], recursive=False,
-             verbose=False):
+             verbose=False, sniff=False, lazy=False):
         """
         read all files in a path matching extension
+
+        If sniff is True, file formats are identified from their content.
+        Files with an unrecognized extension (e.g. .asd.bak, .txt) are then
+        read too when their content matches one of the formats in ext.
+
+        If lazy is True, only the file headers are read and the spectra
+        are added as LazySpectrum, reading their measurement on first use.
         """
         directory = abspath(expanduser(directory))
+        filepaths = []
         for dirpath, dirnames, filenames in os.walk(directory):
             if not recursive:
                 # only read given path
                 if dirpath != directory:
                     continue
-            for f in sorted(filenames):
-                f_name, f_ext = splitext(f)
-                if f_ext not in list(ext):
+            filepaths.extend(os.path.join(dirpath, f) for f in sorted(filenames))
+        self.read_files(filepaths, measure_type=measure_type, ext=ext,
+                        verbose=verbose, sniff=sniff, lazy=lazy)
+    def read_files(self, filepaths, measure_type='pct_reflect',
+                   ext=[".asd", ".sed", ".sig",".pico",".light"],
+                   verbose=False, sniff=False, lazy=False):
+        """
+        read the files in filepaths matching extension
+
+        See read for the meaning of ext, sniff and lazy.
+        """
+        with stage('Collection.read') as s:
+            n = len(self.spectra)
+            self._read_files(filepaths, measure_type, ext, verbose, sniff,
+                             lazy)
+            s.items = len(self.spectra) - n
+    def _read_files(self, filepaths, measure_type, ext, verbose, sniff, lazy):
+        spectrum_class = LazySpectrum if lazy else Spectrum
+        # extensions match regardless of case, as in SUPPORTED_READERS
+        ext = [e.lower() for e in ext]
+        for filepath in filepaths:
+            f_name, f_ext = splitext(os.path.basename(filepath))
+            if f_ext.lower() not in ext:
+                # files with a known but excluded extension (i.e. .dark)
+                # are skipped even when sniffing
+                if (not sniff or f_ext in SUPPORTED_READERS or
+                        sniff_format(filepath) not in ext):
                     # skip to next file
                     continue
-                filepath = os.path.join(dirpath, f)
-                try:
-                    spectrum = Spectrum(name=f_name, filepath=filepath,
-                                        measure_type=measure_type,
-                                        verbose=verbose)
-                    self.append(spectrum)
-                except UnicodeDecodeError:
-                    logging.warning("Input file {} contains non-unicode "
-                                    "character. Please inspect input file.".format(
-                                    f_name))
-                except KeyError:
-                    logging.warning("Input file {} missing metadata key. "
-                                    "Please inspect input file.".format(f_name))
+            try:
+                spectrum = spectrum_class(name=f_name, filepath=filepath,
+                                          measure_type=measure_type,
+                                          verbose=verbose, sniff=sniff,
+                                          dtype=self.dtype)
+                self.append(spectrum)
+            except UnicodeDecodeError:
+                logging.warning("Input file {} contains non-unicode "
+                                "character. Please inspect input file.".format(
+                                f_name))
+            except KeyError:
+                logging.warning("Input file {} missing metadata key. "
+                                "Please inspect input file.".format(f_name))
     ##################################################
     # wrapper around spectral operations
-    def interpolate(self, spacing=1, method='slinear'):
+    def interpolate(self, spacing=1, method='slinear', processes=None):
         '''
+        processes: int
+            number of worker processes; defaults to
+            specdal.parallel.PROCESSES (see specdal.parallel)
 	'''
-        for spectrum in self.spectra:
-            spectrum.interpolate(spacing, method)
-    def stitch(self, method='max'):
+        with stage('Collection.interpolate', items=len(self.spectra)):
+            if self._use_processes(processes):
+                self._map_operator(op.interpolate, 'interpolated', processes,
+                                   spacing=spacing, method=method)
+                return
+            for spectrum in self.spectra:
+                spectrum.interpolate(spacing, method)
+    def stitch(self, method='max', processes=None):
         '''
+        processes: int
+            number of worker processes; defaults to
+            specdal.parallel.PROCESSES (see specdal.parallel)
 	'''
-        for spectrum in self.spectra:
-            try:
-                spectrum.stitch(method)
-            except Exception as e:
-                logging.error("Error occurred while stitching {}".format(spectrum.name))
-                raise e
-    def jump_correct(self, splices, reference, method='additive'):
+        with stage('Collection.stitch', items=len(self.spectra)):
+            if self._use_processes(processes):
+                self._map_operator(op.stitch, 'stitched', processes,
+                                   method=method)
+                return
+            for spectrum in self.spectra:
+                try:
+                    spectrum.stitch(method)
+                except Exception as e:
+                    logging.error("Error occurred while stitching {}".format(spectrum.name))
+                    raise e
+    def jump_correct(self, splices, reference, method='additive',
+                     processes=None):
         '''
+        processes: int
+            number of worker processes; defaults to
+            specdal.parallel.PROCESSES (see specdal.parallel)
 	'''
-        for spectrum in self.spectra:
-            spectrum.jump_correct(splices, reference, method)
+        with stage('Collection.jump_correct', items=len(self.spectra)):
+            if self._use_processes(processes):
+                self._map_operator(op.jump_correct, 'jump_corrected', processes,
+                                   splices=splices, reference=reference,
+                                   method=method)
+                return
+            for spectrum in self.spectra:
+                spectrum.jump_correct(splices, reference, method)
+    def smooth(self, method='savgol', window=10, polyorder=2, sigma=None):
+        '''
+        Smooth each measurement (see specdal.operators.smooth). Spectra
+        sharing their wavelengths are smoothed together in one
+        convolution.
+        '''
+        with stage('Collection.smooth', items=len(self.spectra)):
+            self._apply_to_runs('smooth', op.smooth, method, window,
+                                polyorder, sigma)
+    def resample_bands(self, centers=None, fwhm=None, srf=None, sensor=None):
+        '''
+        Convolve each measurement to the bands of a sensor (see
+        specdal.operators.resample_bands). The weight matrix is built
+        once per wavelength axis and applied to all the spectra sharing
+        it in one matrix product.
+        '''
+        with stage('Collection.resample_bands', items=len(self.spectra)):
+            self._apply_to_runs('resample_bands', op.resample_bands, centers,
+                                fwhm, srf, sensor)
+    def derivative(self, order=1, method='gradient', window=11, polyorder=2):
+        '''
+        Replace each measurement with its derivative (see
+        specdal.operators.derivative). Spectra sharing their wavelengths
+        are differentiated together in one vectorized call.
+        '''
+        with stage('Collection.derivative', items=len(self.spectra)):
+            self._apply_to_runs('derivative', op.derivative, order, method,
+                                window, polyorder)
+    def _apply_to_runs(self, name, function, *args):
+        """
+        Replace the measurements with function(data, *args), called once
+        on the DataFrame of each run of spectra sharing their wavelengths.
+        Lazy spectra record the Spectrum method name instead.
+        """
+        spectra = self.spectra
+        if any(isinstance(s, LazySpectrum) for s in spectra):
+            for spectrum in spectra:
+                getattr(spectrum, name)(*args)
+            return
+        for run in _wavelength_runs(spectra):
+            index = run[0].measurement.index
+            values = np.column_stack([s.measurement.values for s in run])
+            result = function(pd.DataFrame(values, index=index), *args)
+            index, result = result.index, result.values
+            for i, spectrum in enumerate(run):
+                spectrum.measurement = spectrum._cast(pd.Series(
+                    result[:, i], index=index, name=spectrum.measurement.name))
+    def _use_processes(self, processes):
+        """
+        Whether to run an operator on a process pool. Lazy spectra record
+        the operators instead, so they always run serially.
+        """
+        return (parallel.resolve_processes(processes, len(self.spectra)) > 1
+                and not any(isinstance(s, LazySpectrum) for s in self.spectra))
+    def _map_operator(self, function, flag, processes, **kwargs):
+        """
+        Replace each measurement with function(measurement, **kwargs),
+        computed on a process pool, and set the spectrum attribute flag
+        """
+        measurements = parallel.map_spectra(function, self.spectra,
+                                            processes, **kwargs)
+        for spectrum, measurement in zip(self.spectra, measurements):
+            spectrum.measurement = spectrum._cast(measurement)
+            setattr(spectrum, flag, True)
     ##################################################
     # group operations
     def groupby(self, separator, indices, filler=None):
@@ -346,16 +706,17 @@ unpredictable behavior."""
         if filler is not None:
             args.append(filler)
             key_fun = separator_with_filler_keyfun
-        spectra_sorted = sorted(self.spectra,
-                                  key=lambda x: key_fun(x, *args))
-        groups = groupby(spectra_sorted,
-                         lambda x: key_fun(x, *args))
-        result = OrderedDict()
-        for g_name, g_spectra in groups:
-            coll = Collection(name=g_name,
-                              spectra=[copy.deepcopy(s) for s in g_spectra])
-            result[coll.name] = coll
-        return result
+        with stage('Collection.groupby', items=len(self.spectra)):
+            spectra_sorted = sorted(self.spectra,
+                                      key=lambda x: key_fun(x, *args))
+            groups = groupby(spectra_sorted,
+                             lambda x: key_fun(x, *args))
+            result = OrderedDict()
+            for g_name, g_spectra in groups:
+                coll = Collection(name=g_name,
+                                  spectra=[copy.deepcopy(s) for s in g_spectra])
+                result[coll.name] = coll
+            return result
 
     def plot(self, *args, **kwargs):
         '''
@@ -365,56 +726,176 @@ unpredictable behavior."""
     def to_csv(self, *args, **kwargs):
         '''
         '''
-        self.data.transpose().to_csv(*args, **kwargs)
+        with stage('Collection.to_csv', items=len(self.spectra)):
+            self.data.transpose().to_csv(*args, **kwargs)
+    def to_hdf(self, path, mode='w', chunksize=10000, compression=None):
+        '''
+        Write the collection to a single HDF5 file
+
+        The wavelength axis is stored once and the measurements as a 2-D
+        (spectra x wavelengths) array, next to the spectrum names, flags
+        and metadata. Read it back with hdf_to_collection.
+
+        Parameters
+        ----------
+
+        path: string
+            Path of the HDF5 file
+
+        mode: string
+            "w" to overwrite path, "a" to append the spectra to an
+            existing file with the same wavelength axis
+
+        chunksize: int
+            number of spectra converted and written at a time; also the
+            HDF5 chunk size along the spectrum axis
+
+        compression: string
+            HDF5 compression filter (e.g. "gzip", "lzf"), or None
+
+        Values are stored at the dtype of the collection, float64 if it
+        has none.
+        '''
+        with stage('Collection.to_hdf', items=len(self.spectra)):
+            self._to_hdf(path, mode, chunksize, compression)
+    def _to_hdf(self, path, mode, chunksize, compression):
+        h5py = _import_h5py()
+        spectra = self.spectra
+        # an empty collection is written as a file with no spectra and no
+        # wavelengths, which appending replaces
+        wavelength = pd.Index([], dtype=float, name='wavelength')
+        uniform = True
+        if spectra:
+            wavelength = spectra[0].measurement.index
+            # plain array comparison; Index.equals is too slow per spectrum
+            uniform = all(s.measurement.index is wavelength or
+                          np.array_equal(s.measurement.index.values,
+                                         wavelength.values)
+                          for s in spectra[1:])
+            if not uniform:
+                self._check_uniform_wavelengths()
+                wavelength = self.data.index
+        path = abspath(expanduser(path))
+        if mode == 'a':
+            if not os.path.exists(path):
+                mode = 'w'
+            elif not spectra:
+                return
+            else:
+                with h5py.File(path, 'r') as f:
+                    if f['name'].shape[0] == 0:
+                        mode = 'w'
+        str_dt = h5py.string_dtype()
+        with h5py.File(path, mode) as f:
+            if mode == 'w':
+                n_wave = len(wavelength)
+                chunk_rows = max(1, min(chunksize, len(spectra)))
+                f.attrs['specdal_format_version'] = HDF_FORMAT_VERSION
+                f.attrs['name'] = self.name
+                f.attrs['measure_type'] = self.measure_type
+                f.attrs['dtype'] = '' if self.dtype is None else \
+                    np.dtype(self.dtype).name
+                f.create_dataset('wavelength', data=np.asarray(wavelength,
+                                                               dtype=float))
+                f.create_dataset('values', shape=(0, n_wave),
+                                 maxshape=(None, n_wave or None),
+                                 chunks=(chunk_rows, max(1, n_wave)),
+                                 dtype=float if self.dtype is None else self.dtype,
+                                 compression=compression)
+                for key, dtype in (('name', str_dt), ('metadata', str_dt),
+                                   ('flags', bool), ('interpolated', bool),
+                                   ('stitched', bool),
+                                   ('jump_corrected', bool)):
+                    f.create_dataset(key, shape=(0,), maxshape=(None,),
+                                     chunks=(chunk_rows,), dtype=dtype)
+            else:
+                if not np.array_equal(f['wavelength'][:],
+                                      np.asarray(wavelength, dtype=float)):
+                    raise ValueError("Cannot append spectra with different "
+                                     "wavelengths to {}".format(path))
+            start = f['name'].shape[0]
+            flags = self.flags.mask
+            for i in range(0, len(spectra), chunksize):
+                chunk = spectra[i:i+chunksize]
+                if uniform:
+                    values = np.vstack([s.measurement.values for s in chunk])
+                else:
+                    values = np.vstack([s.measurement.reindex(wavelength).values
+                                        for s in chunk])
+                columns = {
+                    'values': values,
+                    'name': [s.name for s in chunk],
+                    'metadata': [json.dumps(s.metadata, default=_json_default)
+                                 for s in chunk],
+                    'flags': flags[i:i+chunksize],
+                    'interpolated': [s.interpolated for s in chunk],
+                    'stitched': [s.stitched for s in chunk],
+                    'jump_corrected': [s.jump_corrected for s in chunk],
+                }
+                stop = start + len(chunk)
+                for key, value in columns.items():
+                    f[key].resize(stop, axis=0)
+                    f[key][start:stop] = value
+                start = stop
     ##################################################
     # aggregate
     def mean(self, append=False, ignore_flagged=True):
         '''
         '''
-        data =  self._unflagged_data() if ignore_flagged else data
-        spectrum = Spectrum(name=self.name + '_mean',
-                            measurement=data.mean(axis=1),
-                            measure_type=self.measure_type)
+        with stage('Collection.mean', items=len(self.spectra)):
+            data =  self._unflagged_data() if ignore_flagged else data
+            spectrum = Spectrum(name=self.name + '_mean',
+                                measurement=data.mean(axis=1),
+                                measure_type=self.measure_type,
+                                dtype=self.dtype)
         if append:
             self.append(spectrum)
         return spectrum
     def median(self, append=False, ignore_flagged=True):
         '''
 	'''
-        data =  self._unflagged_data() if ignore_flagged else data
-        spectrum = Spectrum(name=self.name + '_median',
-                            measurement=data.median(axis=1),
-                            measure_type=self.measure_type)
+        with stage('Collection.median', items=len(self.spectra)):
+            data =  self._unflagged_data() if ignore_flagged else data
+            spectrum = Spectrum(name=self.name + '_median',
+                                measurement=data.median(axis=1),
+                                measure_type=self.measure_type,
+                                dtype=self.dtype)
         if append:
             self.append(spectrum)
         return spectrum
     def min(self, append=False, ignore_flagged=True):
         '''
 	'''
-        data =  self._unflagged_data() if ignore_flagged else data
-        spectrum = Spectrum(name=self.name + '_min',
-                            measurement=data.min(axis=1),
-                            measure_type=self.measure_type)
+        with stage('Collection.min', items=len(self.spectra)):
+            data =  self._unflagged_data() if ignore_flagged else data
+            spectrum = Spectrum(name=self.name + '_min',
+                                measurement=data.min(axis=1),
+                                measure_type=self.measure_type,
+                                dtype=self.dtype)
         if append:
             self.append(spectrum)
         return spectrum
     def max(self, append=False, ignore_flagged=True):
         '''
 	'''
-        data =  self._unflagged_data() if ignore_flagged else data
-        spectrum = Spectrum(name=self.name + '_max',
-                            measurement=data.max(axis=1),
-                            measure_type=self.measure_type)
+        with stage('Collection.max', items=len(self.spectra)):
+            data =  self._unflagged_data() if ignore_flagged else data
+            spectrum = Spectrum(name=self.name + '_max',
+                                measurement=data.max(axis=1),
+                                measure_type=self.measure_type,
+                                dtype=self.dtype)
         if append:
             self.append(spectrum)
         return spectrum
     def std(self, append=False, ignore_flagged=True):
         '''
 	'''
-        data =  self._unflagged_data() if ignore_flagged else data
-        spectrum = Spectrum(name=self.name + '_std',
-                            measurement=data.std(axis=1),
-                            measure_type=self.measure_type)
+        with stage('Collection.std', items=len(self.spectra)):
+            data =  self._unflagged_data() if ignore_flagged else data
+            spectrum = Spectrum(name=self.name + '_std',
+                                measurement=data.std(axis=1),
+                                measure_type=self.measure_type,
+                                dtype=self.dtype)
         if append:
             self.append(spectrum)
         return spectrum
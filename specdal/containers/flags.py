@@ -0,0 +1,155 @@
+# flags.py stores the flags of the spectra of a collection as boolean
+# arrays aligned with the order of its spectra. A RowIndex maps spectrum
+# names to rows, and each named layer of flags (e.g. "manual", "white",
+# "saturated") is a Flags array over those rows, so flagging many names,
+# counting flags and selecting the flagged spectra are array operations.
+from itertools import repeat
+import numpy as np
+
+# layer of Collection.flags and of the flags set in the viewers
+DEFAULT_LAYER = 'manual'
+
+class RowIndex(object):
+    """
+    Row of each spectrum name of a collection, in insertion order
+    """
+    def __init__(self, names=()):
+        self.names = list(names)
+        self.rows = dict(zip(self.names, range(len(self.names))))
+        assert len(self.rows) == len(self.names)
+
+    def append(self, name):
+        assert name not in self.rows
+        self.rows[name] = len(self.names)
+        self.names.append(name)
+
+    def remove(self, name):
+        """Remove name, shifting the following rows, and return its row"""
+        row = self.rows.pop(name)
+        del self.names[row]
+        for other in self.names[row:]:
+            self.rows[other] -= 1
+        return row
+
+    def lookup(self, names):
+        '''
+        Return the rows of names as an integer array, -1 for the names
+        not in the index
+        '''
+        if isinstance(names, str):
+            names = [names]
+        # hashing in one pass is faster than a binary search in sorted
+        # names, once the conversion of names to a numpy array is counted
+        return np.fromiter(map(self.rows.get, names, repeat(-1)),
+                           dtype=int, count=len(names))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.rows
+
+class Flags(object):
+    """
+    A layer of boolean flags over the rows of a RowIndex
+
+    Behaves as the set of flagged names for `in`, iteration and len(),
+    and as a dict of flagged names to True for items(). Names that are
+    not in the index are ignored.
+
+    Attributes
+    ----------
+    name: string
+        name of the layer
+
+    mask: numpy boolean array
+        flag of each row of the index
+    """
+    def __init__(self, index, name=DEFAULT_LAYER):
+        self.index = index
+        self.name = name
+        self._mask = np.zeros(len(index), dtype=bool)
+
+    @property
+    def mask(self):
+        n = len(self.index)
+        if len(self._mask) < n:
+            # rows were appended, grow with room for more
+            grown = np.zeros(max(n, 2*len(self._mask)), dtype=bool)
+            grown[:len(self._mask)] = self._mask
+            self._mask = grown
+        return self._mask[:n]
+
+    def set(self, names, value=True):
+        """Set the flag of one name or of an iterable of names"""
+        if not isinstance(names, str):
+            names = list(names)
+        rows = self.index.lookup(names)
+        self.mask[rows[rows >= 0]] = value
+
+    def set_mask(self, mask):
+        """Set the flags of every row from a boolean array"""
+        mask = np.asarray(mask, dtype=bool)
+        assert mask.shape == (len(self.index),)
+        self._mask = mask.copy()
+
+    def clear(self):
+        self._mask = np.zeros(len(self.index), dtype=bool)
+
+    def delete(self, row):
+        """Drop row, after it was removed from the index"""
+        mask = self._mask[:len(self.index) + 1]
+        if row < len(mask):
+            mask = np.delete(mask, row)
+        self._mask = mask
+
+    def __contains__(self, name):
+        row = self.index.rows.get(name)
+        return row is not None and row < len(self._mask) and \
+            self._mask.item(row)
+
+    def __getitem__(self, name):
+        return name in self
+
+    def __setitem__(self, name, value):
+        self.set(name, bool(value))
+
+    def __delitem__(self, name):
+        self.set(name, False)
+
+    def __iter__(self):
+        names = self.index.names
+        return iter([names[i] for i in np.flatnonzero(self.mask)])
+
+    def __len__(self):
+        return int(np.count_nonzero(self.mask))
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [True]*len(self)
+
+    def items(self):
+        return [(name, True) for name in self]
+
+    def get(self, name, default=False):
+        return name in self or default
+
+    def __repr__(self):
+        return 'Flags({!r}, {!r})'.format(self.name, list(self))
+
+def read_flag_file(path):
+    '''
+    Return the spectrum names listed in a flag file, one per line, as
+    written by the viewers; blank lines are skipped
+    '''
+    with open(path) as f:
+        names = [line.strip() for line in f]
+    return [name for name in names if name]
+
+def write_flag_file(path, names):
+    """Write spectrum names to a flag file, one per line"""
+    with open(path, 'w') as f:
+        for name in names:
+            print(name, file=f)
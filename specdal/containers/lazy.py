@@ -0,0 +1,211 @@
+# lazy.py provides a spectrum that reads its measurement from its file
+# only when it is used, and the bounded cache holding the measurements
+# that were read.
+import threading
+from collections import OrderedDict
+from os.path import abspath, expanduser, splitext, basename
+import numpy as np
+import specdal.operators as op
+from specdal.readers import read
+from .spectrum import Spectrum
+
+# default number of measurements a collection keeps in memory
+CACHE_SIZE = 1024
+
+class LRUCache(object):
+    """
+    Mapping holding at most maxsize items, evicting the least recently
+    used one first. maxsize None keeps every item.
+    """
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._items.move_to_end(key)
+            except KeyError:
+                return default
+            return self._items[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._items) > self.maxsize:
+                    self._items.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._items.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getstate__(self):
+        # cached values are dropped, they are read again when used
+        return {'maxsize': self.maxsize}
+
+    def __setstate__(self, state):
+        self.__init__(state['maxsize'])
+
+class LazySpectrum(Spectrum):
+    """
+    Spectrum whose measurement is read from its file on first use
+
+    Only the header metadata is read when the spectrum is created. The
+    measurement is parsed the first time it is accessed and kept in
+    cache, which is usually shared by the spectra of a collection; it is
+    read again if it was evicted. Operators (interpolate, stitch,
+    smooth, ...) are recorded and applied as the measurement is read. Assigning a
+    measurement keeps it in the spectrum, which then no longer reads its
+    file.
+
+    Parameters
+    ----------
+
+    filepath: string
+        Path to the file to read from.
+
+    cache: LRUCache
+        Cache of the measurements read. Defaults to one holding only the
+        measurement of this spectrum.
+
+    See Spectrum for the other parameters.
+
+    Notes
+    -----
+
+    Errors in the data of a file are raised when its measurement is
+    first used rather than when the spectrum is created.
+    """
+    def __init__(self, name=None, filepath=None, measure_type='pct_reflect',
+                 metadata=None, verbose=False, sniff=False, dtype=None,
+                 cache=None):
+        assert filepath is not None
+        if name is None:
+            name = splitext(basename(filepath))[0]
+        self.filepath = abspath(expanduser(filepath))
+        self.sniff = sniff
+        self._cache = LRUCache(1) if cache is None else cache
+        self._measurement = None
+        self._operations = []
+        if metadata is None:
+            metadata = read(self.filepath, read_data=False, verbose=verbose,
+                            sniff=sniff)[1]
+        Spectrum.__init__(self, name=name, measure_type=measure_type,
+                          metadata=metadata, dtype=dtype)
+
+    @property
+    def measurement(self):
+        if self._measurement is not None:
+            return self._measurement
+        measurement = self._cache.get(self)
+        if measurement is None:
+            measurement = self._load()
+            self._cache.put(self, measurement)
+        return measurement
+
+    @measurement.setter
+    def measurement(self, value):
+        self._measurement = value
+        self._operations = []
+        self._cache.pop(self)
+
+    @property
+    def loaded(self):
+        """True if the measurement is in memory"""
+        return self._measurement is not None or self in self._cache
+
+    def _load(self):
+        """Read the measurement and apply the recorded operations"""
+        data, meta = read(self.filepath, sniff=self.sniff, dtype=self.dtype)
+        if self.metadata is not None:
+            # fields only known from the data, e.g. the wavelength range
+            # of .sig files
+            for key, value in meta.items():
+                if self.metadata.get(key) is None:
+                    self.metadata[key] = value
+        measurement = self._measurement_from(data, self.measure_type)
+        for function, args in self._operations:
+            measurement = self._cast(function(measurement, *args))
+        return measurement
+
+    def _defer(self, function, *args):
+        """Apply function(measurement, *args) now or as it is read"""
+        if self._measurement is not None:
+            self._measurement = self._cast(function(self._measurement, *args))
+            return
+        self._operations.append((function, args))
+        cached = self._cache.get(self)
+        if cached is not None:
+            self._cache.put(self, self._cast(function(cached, *args)))
+
+    def attach(self, cache):
+        """Keep the measurement in cache from now on"""
+        if cache is self._cache:
+            return
+        measurement = self._cache.pop(self)
+        self._cache = cache
+        if measurement is not None:
+            cache.put(self, measurement)
+
+    def set_dtype(self, dtype):
+        '''
+        See Spectrum.set_dtype. A measurement that was not read yet is
+        read at dtype.
+        '''
+        self.dtype = None if dtype is None else np.dtype(dtype)
+        if self._measurement is not None:
+            self._measurement = self._cast(self._measurement)
+            return
+        cached = self._cache.get(self)
+        if cached is not None:
+            self._cache.put(self, self._cast(cached))
+
+    def interpolate(self, spacing=1, method='slinear'):
+        '''
+        '''
+        self._defer(op.interpolate, spacing, method)
+        self.interpolated = True
+    def stitch(self, method='mean'):
+        '''
+        '''
+        self._defer(op.stitch, method)
+        self.stitched = True
+    def jump_correct(self, splices, reference, method="additive"):
+        '''
+        '''
+        self._defer(op.jump_correct, splices, reference, method)
+        self.jump_corrected = True
+    def smooth(self, method='savgol', window=10, polyorder=2, sigma=None):
+        '''
+        '''
+        self._defer(op.smooth, method, window, polyorder, sigma)
+    def resample_bands(self, centers=None, fwhm=None, srf=None, sensor=None):
+        '''
+        '''
+        self._defer(op.resample_bands, centers, fwhm, srf, sensor)
+    def derivative(self, order=1, method='gradient', window=11, polyorder=2):
+        '''
+        '''
+        self._defer(op.derivative, order, method, window, polyorder)
+
+    def __getstate__(self):
+        # the shared cache stays behind; the measurement is read again
+        state = self.__dict__.copy()
+        state['_cache'] = None
+        return state
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cache = LRUCache(1)
@@ -28,6 +28,14 @@ class Spectrum(object):
     
     metadata: OrderedDict
         Metadata associated with spectrum
+
+    sniff: boolean
+        Identify the file format from its content rather than its
+        extension when reading from filepath.
+
+    dtype: numpy dtype or string
+        Precision the measurement is stored and processed at, e.g.
+        "float32" to halve memory. None keeps the precision of the data.
     
     Notes
     -----
@@ -36,22 +44,25 @@ class Spectrum(object):
     pandas.Series with index named: "wavelength".
     
     """
+    # class default for spectra pickled before dtype existed
+    dtype = None
     def __init__(self, name=None, filepath=None, measurement=None,
                  measure_type='pct_reflect', metadata=None,
                  interpolated=False, stitched=False, jump_corrected=False,
-                 verbose=False):
+                 verbose=False, sniff=False, dtype=None):
         if name is None:
             assert filepath is not None
             name = os.path.splitext(os.path.basename(filepath))[0]
         self.name = name
-        self.measurement = measurement
+        self.dtype = None if dtype is None else np.dtype(dtype)
+        self.measurement = self._cast(measurement)
         self.measure_type = measure_type
         self.metadata = metadata
         self.interpolated = interpolated
         self.stitched = stitched
         self.jump_corrected = jump_corrected
         if filepath:
-            self.read(filepath, measure_type, verbose=verbose)
+            self.read(filepath, measure_type, verbose=verbose, sniff=sniff)
     def __str__(self):
         string = "\nname:\t\t{!s},\n".format(self.name)
         string += "measure_type:\t{!s}\n".format(self.measure_type)
@@ -71,34 +82,70 @@ class Spectrum(object):
         return string
     ##################################################
     # reader
-    def read(self, filepath, measure_type, verbose=False):
+    def read(self, filepath, measure_type, verbose=False, sniff=False):
         '''
         Read measurement from a file.
         '''
-        data, meta = read(filepath, verbose=verbose)
+        data, meta = read(filepath, verbose=verbose, sniff=sniff,
+                          dtype=self.dtype)
         self.metadata = meta
+        self.measurement = self._measurement_from(data, measure_type)
+    def _measurement_from(self, data, measure_type):
+        """Return the measure_type column of data read from a file"""
         if measure_type == 'pct_reflect' and 'pct_reflect' not in data:
-            self.measurement = self.get_pct_reflect(data)
-            return
+            return self._cast(self.get_pct_reflect(data))
         assert measure_type in data # TODO: handle this
-        self.measurement = data[measure_type]
+        return data[measure_type]
+    def _cast(self, measurement):
+        """Return measurement converted to the dtype of the spectrum"""
+        if (self.dtype is None or measurement is None or
+                measurement.dtype == self.dtype):
+            return measurement
+        return measurement.astype(self.dtype)
+    def set_dtype(self, dtype):
+        '''
+        Convert the measurement to dtype and keep it at that precision
+        through later operations. None stops converting.
+        '''
+        self.dtype = None if dtype is None else np.dtype(dtype)
+        self.measurement = self._cast(self.measurement)
     ##################################################
     # wrappers around spectral operations
     def interpolate(self, spacing=1, method='slinear'):
         '''
         '''
-        self.measurement = op.interpolate(self.measurement, spacing, method)
+        self.measurement = self._cast(op.interpolate(self.measurement, spacing, method))
         self.interpolated = True
     def stitch(self, method='mean'):
         '''
         '''
-        self.measurement = op.stitch(self.measurement, method)
+        self.measurement = self._cast(op.stitch(self.measurement, method))
         self.stitched = True
     def jump_correct(self, splices, reference, method="additive"):
         '''
         '''
-        self.measurement = op.jump_correct(self.measurement, splices, reference, method)
+        self.measurement = self._cast(op.jump_correct(self.measurement, splices, reference, method))
         self.jump_corrected = True
+    def smooth(self, method='savgol', window=10, polyorder=2, sigma=None):
+        '''
+        Smooth the measurement (see specdal.operators.smooth)
+        '''
+        self.measurement = self._cast(op.smooth(self.measurement, method,
+                                                window, polyorder, sigma))
+    def resample_bands(self, centers=None, fwhm=None, srf=None, sensor=None):
+        '''
+        Convolve the measurement to the bands of a sensor (see
+        specdal.operators.resample_bands)
+        '''
+        self.measurement = self._cast(op.resample_bands(
+            self.measurement, centers, fwhm, srf, sensor))
+    def derivative(self, order=1, method='gradient', window=11, polyorder=2):
+        '''
+        Replace the measurement with its derivative (see
+        specdal.operators.derivative)
+        '''
+        self.measurement = self._cast(op.derivative(self.measurement, order,
+                                                    method, window, polyorder))
     def get_pct_reflect(self,dataframe):
         """
         Helper function to calculate pct_reflect from other columns
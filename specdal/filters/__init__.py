@@ -1,7 +1,5 @@
-from os.path import dirname, basename, isfile 
-import glob
-modules = glob.glob(dirname(__file__)+"/*.py")
-__all__ = [ basename(f)[:-3] for f in modules if isfile(f) and not f.endswith('__init__.py')]
+__all__ = ['filter_std', 'filter_threshold', 'filter_white', 'is_monotonic',
+           'split_good_bad']
 
 from .filter_std import filter_std
 from .filter_threshold import filter_threshold
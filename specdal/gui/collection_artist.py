@@ -0,0 +1,124 @@
+# collection_artist.py draws the spectra of a collection as a single
+# matplotlib LineCollection. Flags, selection and visibility are boolean
+# arrays aligned with the spectra, so changing them updates the colors and
+# line styles of one artist instead of one Line2D per spectrum. The lines
+# are decimated to the x-range and width of the axes (see lod.py).
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+from specdal.gui.lod import LevelOfDetail
+
+class CollectionArtist(object):
+    """
+    Draw every spectrum of a collection with one LineCollection
+
+    Parameters
+    ----------
+    ax: matplotlib.axes.Axes
+
+    collection: specdal.Collection
+
+    color, flag_color: matplotlib colors
+        colors of unflagged and flagged spectra
+
+    style, selected_style: matplotlib line styles
+        line styles of unselected and selected spectra
+
+    Attributes
+    ----------
+    keys: list
+        spectrum names, in the order of the arrays
+
+    flagged, selected: numpy boolean arrays
+        state of each spectrum; call update() after changing them
+
+    show_flagged, show_unselected: bool
+        whether flagged and unselected spectra are drawn
+
+    lod: LevelOfDetail
+        decimated envelopes of the spectra. The artist follows the x
+        limits and size of the axes and draws the envelope level matching
+        them; set_view() applies a view explicitly.
+    """
+    def __init__(self, ax, collection, color='k', flag_color='r',
+                 style='-', selected_style='--', **kwargs):
+        self.ax = ax
+        spectra = collection.spectra
+        self.keys = [s.name for s in spectra]
+        self.rows = {key: i for i, key in enumerate(self.keys)}
+        self.lod = LevelOfDetail([s.measurement.index for s in spectra],
+                                 [s.measurement.values for s in spectra])
+        self.flagged = np.zeros(len(self.keys), dtype=bool)
+        self.selected = np.zeros(len(self.keys), dtype=bool)
+        self.show_flagged = True
+        self.show_unselected = True
+        self._colors = np.array([to_rgba(color), to_rgba(flag_color)])
+        self._styles = (style, selected_style)
+        self._drawn = None
+        self._view = self.lod.view(None, ax.bbox.width)
+        self.lines = LineCollection([], **kwargs)
+        ax.add_collection(self.lines, autolim=False)
+        if len(self.keys) > 0:
+            xmin, ymin, xmax, ymax = self.lod.bounds
+            ax.update_datalim([(xmin, ymin), (xmax, ymax)])
+        self._cids = [ax.callbacks.connect('xlim_changed', self._follow),
+                      ax.figure.canvas.mpl_connect('resize_event',
+                                                   self._follow)]
+        # the flags of the collection are aligned with its spectra
+        self.flagged[:] = collection.flags.mask
+        self.update()
+
+    def indices(self, keys):
+        """Return the rows of the spectra named in keys, ignoring others"""
+        rows = self.rows
+        return np.fromiter((rows[key] for key in keys if key in rows),
+                           dtype=int)
+
+    def in_box(self, x0, x1, y0, y1):
+        """Return the names of the spectra passing through a rectangle"""
+        keys = self.keys
+        return [keys[i] for i in np.flatnonzero(self.lod.in_box(x0, x1, y0, y1))]
+
+    @property
+    def visible(self):
+        """Boolean array of the spectra that are drawn"""
+        visible = np.ones(len(self.keys), dtype=bool)
+        if not self.show_unselected:
+            visible &= self.selected
+        if not self.show_flagged:
+            visible &= ~self.flagged
+        return visible
+
+    def set_view(self, xlim=None, width=None):
+        '''
+        Draw the level of detail for an x-range xlim spanning width
+        pixels; None draws every point
+        '''
+        view = self.lod.view(xlim, width)
+        if view != self._view:
+            self._view = view
+            if self._drawn is not None:
+                self.lines.set_segments(self.lod.segments(self._drawn, view))
+
+    def _follow(self, *args):
+        self.set_view(self.ax.get_xlim(), self.ax.bbox.width)
+
+    def update(self):
+        """Apply the flagged, selected and show_* state to the artist"""
+        drawn = np.flatnonzero(self.visible)
+        if self._drawn is None or not np.array_equal(drawn, self._drawn):
+            self.lines.set_segments(self.lod.segments(drawn, self._view))
+            self._drawn = drawn
+        self.lines.set_color(self._colors[self.flagged[drawn].astype(int)])
+        selected = self.selected[drawn]
+        if not selected.any():
+            self.lines.set_linestyle(self._styles[0])
+        elif selected.all():
+            self.lines.set_linestyle(self._styles[1])
+        else:
+            self.lines.set_linestyle([self._styles[s] for s in selected.astype(int)])
+
+    def remove(self):
+        self.ax.callbacks.disconnect(self._cids[0])
+        self.ax.figure.canvas.mpl_disconnect(self._cids[1])
+        self.lines.remove()
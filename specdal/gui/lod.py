@@ -0,0 +1,226 @@
+# lod.py decimates the spectra of a collection for plotting. Spectra
+# sharing their wavelengths are stacked in a matrix, from which min/max
+# envelopes are precomputed at resolutions halving down to a few bins.
+# A plot then draws, for its current x-range and width in pixels, the
+# coarsest envelope with bins narrower than two pixels, clipped to the
+# x-range. The envelopes also index the spectra for rectangle selection:
+# the extrema of every spectrum over a range of wavelengths are read from
+# a few precomputed bins instead of every point.
+import numpy as np
+
+# envelopes are computed down to this number of bins
+MIN_BINS = 16
+
+class LevelOfDetail(object):
+    """
+    Min/max envelopes of a set of spectra at several resolutions
+
+    Parameters
+    ----------
+    xs, ys: lists of 1-d arrays
+        wavelengths and values of each spectrum
+
+    min_bins: int
+        coarsest resolution computed
+
+    Notes
+    -----
+    Level k holds, for bins of 2**k consecutive wavelengths, the minimum
+    and maximum of each spectrum; level 0 is the data itself. A bin is
+    drawn as two vertices, the minimum at the first wavelength of the bin
+    and the maximum at its last, so the decimated line covers the same
+    band of pixels as the full resolution one.
+    """
+    def __init__(self, xs, ys, min_bins=MIN_BINS):
+        assert len(xs) == len(ys)
+        self.min_bins = min_bins
+        self._groups = []
+        self._group = np.zeros(len(xs), dtype=int)
+        self._position = np.zeros(len(xs), dtype=int)
+        keys = {}
+        members = []
+        for i, x in enumerate(xs):
+            x = np.asarray(x, dtype=float)
+            key = x.tobytes()
+            if key not in keys:
+                keys[key] = len(members)
+                members.append((x, []))
+            g = keys[key]
+            self._group[i] = g
+            self._position[i] = len(members[g][1])
+            members[g][1].append(i)
+        self._rows = []
+        for x, rows in members:
+            y = np.array([np.asarray(ys[i], dtype=float) for i in rows])
+            y = y.reshape(len(rows), len(x))
+            self._groups.append(_Group(x, y, min_bins))
+            self._rows.append(np.array(rows, dtype=int))
+
+    def __len__(self):
+        return len(self._group)
+
+    @property
+    def bounds(self):
+        """(xmin, ymin, xmax, ymax) of the data, ignoring NaN"""
+        lows = np.array([g.bounds[:2] for g in self._groups]).reshape(-1, 2)
+        highs = np.array([g.bounds[2:] for g in self._groups]).reshape(-1, 2)
+        return tuple(np.nanmin(lows, axis=0)) + tuple(np.nanmax(highs, axis=0))
+
+    def view(self, xlim=None, width=None):
+        '''
+        Return, for each group of spectra, the level and the range of
+        bins to draw for an x-range xlim spanning width pixels. None
+        draws the whole x-range at full resolution.
+
+        The result is hashable and equal for views drawing the same
+        vertices, so it tells when segments have to be recomputed.
+        '''
+        return tuple(g.view(xlim, width) for g in self._groups)
+
+    def in_box(self, x0, x1, y0, y1):
+        '''
+        Return a boolean array of the spectra whose line passes through
+        the rectangle [x0, x1] x [y0, y1]
+
+        Notes
+        -----
+        A line drawn between consecutive points passes through the
+        rectangle if and only if its extrema over [x0, x1], including its
+        values interpolated at x0 and x1, overlap [y0, y1]. Wavelengths
+        that go back (unstitched overlaps) split a spectrum into
+        increasing runs, tested separately. NaN values are skipped.
+        '''
+        x0, x1 = sorted((x0, x1))
+        y0, y1 = sorted((y0, y1))
+        hit = np.zeros(len(self), dtype=bool)
+        for rows, group in zip(self._rows, self._groups):
+            for lo, hi in group.extrema(x0, x1):
+                hit[rows] |= (hi >= y0) & (lo <= y1)
+        return hit
+
+    def segments(self, rows=None, view=None):
+        '''
+        Return the vertices of spectra rows at view, as a list of (m, 2)
+        arrays in the order of rows
+        '''
+        if rows is None:
+            rows = np.arange(len(self))
+        rows = np.asarray(rows, dtype=int)
+        if view is None:
+            view = self.view()
+        out = [None]*len(rows)
+        groups = self._group[rows]
+        for g, group in enumerate(self._groups):
+            which = np.flatnonzero(groups == g)
+            if len(which) == 0:
+                continue
+            vertices = group.vertices(self._position[rows[which]], *view[g])
+            for i, v in zip(which, vertices):
+                out[i] = v
+        return out
+
+class _Group(object):
+    """Spectra sharing the same wavelengths x, stacked in the rows of y"""
+    def __init__(self, x, y, min_bins):
+        self.x = x
+        self.increasing = bool((np.diff(x) > 0).all())
+        # increasing runs of wavelengths
+        edges = np.concatenate(([0], np.flatnonzero(np.diff(x) <= 0) + 1,
+                                [len(x)]))
+        self.runs = list(zip(edges[:-1], edges[1:]))
+        with np.errstate(all='ignore'):
+            self.bounds = (np.nanmin(x) if len(x) else np.nan,
+                           np.nanmin(y) if y.size else np.nan,
+                           np.nanmax(x) if len(x) else np.nan,
+                           np.nanmax(y) if y.size else np.nan)
+        self.y = y
+        self.levels = [(y, y)]
+        lo, hi = y, y
+        while lo.shape[1] > 2*min_bins:
+            if lo.shape[1] % 2:
+                # repeat the last column so that the last bin is complete
+                lo = np.concatenate((lo, lo[:, -1:]), axis=1)
+                hi = np.concatenate((hi, hi[:, -1:]), axis=1)
+            lo = np.fmin(lo[:, 0::2], lo[:, 1::2])
+            hi = np.fmax(hi[:, 0::2], hi[:, 1::2])
+            self.levels.append((lo, hi))
+
+    def view(self, xlim, width):
+        n = len(self.x)
+        start, stop = 0, n
+        if xlim is not None and self.increasing:
+            x0, x1 = sorted(xlim)
+            # one point beyond each side, so lines leave the axes
+            start = max(np.searchsorted(self.x, x0, 'left') - 1, 0)
+            stop = min(np.searchsorted(self.x, x1, 'right') + 1, n)
+        if not width or stop - start <= width:
+            return (0, start, stop)
+        # bins of at most two pixels, i.e. about a vertex per pixel
+        level = min(int(np.log2(2*(stop - start)/width)), len(self.levels) - 1)
+        if level < 2:
+            # a level 1 envelope has as many vertices as the data
+            return (0, start, stop)
+        return (level, start >> level, ((stop - 1) >> level) + 1)
+
+    def vertices(self, positions, level, start, stop):
+        n = len(self.x)
+        if level == 0:
+            x = self.x[start:stop]
+            y = self.y[positions, start:stop]
+        else:
+            first = np.arange(start, stop) << level
+            last = np.minimum(first + (1 << level), n) - 1
+            x = np.empty(2*(stop - start))
+            x[0::2], x[1::2] = self.x[first], self.x[last]
+            lo, hi = self.levels[level]
+            y = np.empty((len(positions), len(x)))
+            y[:, 0::2] = lo[positions, start:stop]
+            y[:, 1::2] = hi[positions, start:stop]
+        vertices = np.empty(y.shape + (2,))
+        vertices[..., 0] = x
+        vertices[..., 1] = y
+        return vertices
+
+    def extrema(self, x0, x1):
+        """
+        Yield, for each run of increasing wavelengths overlapping
+        [x0, x1], the minimum and maximum of every spectrum over it
+        """
+        x = self.x
+        for r0, r1 in self.runs:
+            # points within [x0, x1]
+            a = r0 + np.searchsorted(x[r0:r1], x0, 'left')
+            b = r0 + np.searchsorted(x[r0:r1], x1, 'right')
+            lo, hi = self.range_extrema(a, b)
+            # lines crossing the edges of the range
+            for edge, i in ((x0, a), (x1, b)):
+                if r0 < i < r1 and x[i - 1] < edge < x[i]:
+                    t = (edge - x[i - 1])/(x[i] - x[i - 1])
+                    value = self.y[:, i - 1]*(1 - t) + self.y[:, i]*t
+                    lo, hi = np.fmin(lo, value), np.fmax(hi, value)
+            yield lo, hi
+
+    def range_extrema(self, start, stop):
+        """
+        Minimum and maximum of every spectrum over points start to stop,
+        combining the largest bins of the envelopes that fit in the range
+        """
+        lo = np.full(len(self.y), np.nan)
+        hi = np.full(len(self.y), np.nan)
+        level = 0
+        while start < stop:
+            mins, maxs = self.levels[level]
+            if level == len(self.levels) - 1:
+                lo = np.fmin(lo, np.fmin.reduce(mins[:, start:stop], axis=1))
+                hi = np.fmax(hi, np.fmax.reduce(maxs[:, start:stop], axis=1))
+                break
+            if start & 1:
+                lo, hi = np.fmin(lo, mins[:, start]), np.fmax(hi, maxs[:, start])
+                start += 1
+            if stop & 1:
+                stop -= 1
+                lo, hi = np.fmin(lo, mins[:, stop]), np.fmax(hi, maxs[:, stop])
+            start >>= 1
+            stop >>= 1
+            level += 1
+        return lo, hi
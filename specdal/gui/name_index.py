@@ -0,0 +1,97 @@
+# name_index.py indexes the names of the spectra shown in a viewer, so
+# that selecting by regular expression or by group returns a boolean
+# array over the rows of the list at once. The names are joined into one
+# newline separated text searched by a single regex scan, matches being
+# mapped back to rows by their offsets; the group of each row is an
+# integer column next to the names.
+import re
+import numpy as np
+
+# constructs that see past the ends of a name in the joined text
+_UNSAFE = re.compile(r'\\[AZ]|\(\?<[=!]|\(\?[=!]')
+
+class NameIndex(object):
+    """
+    Names and group labels of a list of spectra
+
+    Parameters
+    ----------
+    names: list of strings
+
+    Attributes
+    ----------
+    names: list of strings
+
+    groups: numpy int array
+        group of each name, as a position in group_names; -1 for none
+
+    group_names: list of strings
+    """
+    def __init__(self, names):
+        self.names = list(names)
+        self.groups = np.full(len(self.names), -1, dtype=int)
+        self.group_names = []
+        self._text = '\n'.join(self.names)
+        lengths = np.fromiter(map(len, self.names), dtype=int,
+                              count=len(self.names))
+        # offset of the first character of each name in the text
+        self._starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+        self._joinable = not any('\n' in name for name in self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, pattern):
+        '''
+        Return a boolean array of the names in which the regular
+        expression pattern is found, as by re.search
+
+        Raises re.error for invalid patterns.
+        '''
+        regex = re.compile(pattern, re.MULTILINE)
+        if len(self.names) == 0:
+            return np.zeros(0, dtype=bool)
+        if (not self._joinable or _UNSAFE.search(regex.pattern) or
+                regex.search('') is not None):
+            return self._search_each(regex)
+        spans = np.array([m.span() for m in regex.finditer(self._text)],
+                         dtype=int).reshape(-1, 2)
+        rows = np.searchsorted(self._starts, spans[:, 0], 'right') - 1
+        # a match running over a newline spans two names
+        ends = np.searchsorted(self._starts, spans[:, 1], 'right') - 1
+        if (ends != rows).any():
+            return self._search_each(regex)
+        hit = np.zeros(len(self.names), dtype=bool)
+        hit[rows] = True
+        return hit
+
+    def _search_each(self, regex):
+        return np.fromiter(map(bool, map(regex.search, self.names)),
+                           dtype=bool, count=len(self.names))
+
+    def set_group(self, rows, group):
+        """Put the names at rows (indices or boolean array) in group; None for none"""
+        if group is None:
+            self.groups[rows] = -1
+            return
+        if group not in self.group_names:
+            self.group_names.append(group)
+        self.groups[rows] = self.group_names.index(group)
+
+    def in_group(self, group):
+        """Return a boolean array of the names in group"""
+        if group not in self.group_names:
+            return np.zeros(len(self.names), dtype=bool)
+        return self.groups == self.group_names.index(group)
+
+    def label(self, row):
+        """Text of row in a list, the name followed by its group"""
+        group = self.groups[row]
+        if group < 0:
+            return self.names[row]
+        return '{} ({})'.format(self.names[row], self.group_names[group])
+
+def runs(mask):
+    """Return the (start, stop) of the runs of True in a boolean array"""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.view(np.int8), [0]))))
+    return list(zip(edges[0::2], edges[1::2]))
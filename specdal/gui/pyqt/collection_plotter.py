@@ -10,72 +10,13 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT
 from matplotlib.figure import Figure
 from matplotlib.patches import Rectangle
+from specdal.gui.collection_artist import CollectionArtist
 
 def set_or_none(iterable):
     if iterable is not None and not isinstance(iterable,set):
         iterable = set(iterable)
     return iterable
 
-class SpectrumArtist():
-    show_flagged = True
-    show_unselected = True
-
-    def __init__(self,artist):
-        self.artist = artist
-        self._flagged = False
-        self._selected = False
-        self._visible = True
-        self.style = '-'
-        self.color = 'k'
-
-    @property
-    def flagged(self):
-        return self._flagged
-    
-    @flagged.setter
-    def flagged(self,value):
-        self._flagged = value
-        self.color = 'r' if self._flagged else 'k'
-        self._update_look()
-
-    @property
-    def selected(self):
-        return self._selected
-    
-    @selected.setter
-    def selected(self,value):
-        self._selected = value
-        self.style = '--' if self._selected else '-'
-        self._update_look()
-    
-    @property
-    def visible(self):
-        return self._visible
-
-    @visible.setter
-    def visible(self,value):
-        self._visible = value
-        if self._visible:
-            self.artist.set_linestyle(self.style)
-        else:
-            self.artist.set_linestyle('None')
-
-    def _calculate_visibility(self):
-        visible = True
-        if not self.selected and not self.show_unselected:
-            visible = False
-        if self.flagged and not self.show_flagged:
-            visible = False
-        self.visible = visible
-
-    def _update_look(self):
-        self._calculate_visibility()
-        if self.visible:
-            self.artist.set_color(self.color)
-            self.artist.set_linestyle(self.style)
-
-            
-
 class CollectionCanvas(FigureCanvasQTAgg):
     """Ultimately, this is a QWidget (as well as a FigureCanvasAgg, etc.)."""
 
@@ -87,6 +28,9 @@ class CollectionCanvas(FigureCanvasQTAgg):
         self.ax.grid(True)
         self._flag_style = 'r'
         self._unselected_style = '-'
+        self.artist = None
+        self._show_flagged = True
+        self._show_unselected = True
 
         fig.tight_layout()
         FigureCanvasQTAgg.__init__(self, fig)
@@ -100,19 +44,23 @@ class CollectionCanvas(FigureCanvasQTAgg):
 
     @property 
     def show_unselected(self):
-        pass
+        return self._show_unselected
 
     @show_unselected.setter
     def show_unselected(self,value):
-        SpectrumArtist.show_unselected = value
+        self._show_unselected = value
+        if self.artist is not None:
+            self.artist.show_unselected = value
 
     @property
     def show_flagged(self):
-        pass
+        return self._show_flagged
 
     @show_flagged.setter
     def show_flagged(self,value):
-        SpectrumArtist.show_flagged = value
+        self._show_flagged = value
+        if self.artist is not None:
+            self.artist.show_flagged = value
 
     def rectangleStartEvent(self,event):
         self._rect = None
@@ -190,27 +138,30 @@ class CollectionCanvas(FigureCanvasQTAgg):
 
 
     def update_selected(self,selected_keys,only_add=False):
-        # better lookup time
-        selected_keys = set_or_none(selected_keys)
-        if only_add:
-            # if we're only adding, just select
-            for key in selected_keys:
-                self.artist_dict[key].selected = True
-        else:
+        if self.artist is None:
+            return
+        rows = self.artist.indices(selected_keys)
+        if not only_add:
             # otherwise, unselect everything that isn't selected
-            keys = self.artist_dict.keys()
-            for key in keys:
-                self.artist_dict[key].selected = key in selected_keys
-        self.draw()
+            self.artist.selected[:] = False
+        self.artist.selected[rows] = True
+        self.artist.update()
+        self.draw_idle()
+
+    def select_rows(self,mask):
+        """Select the spectra at the True rows of mask, in collection order"""
+        if self.artist is None:
+            return
+        self.artist.selected[:] = mask
+        self.artist.update()
+        self.draw_idle()
 
     def set_flagged(self,flagged_keys,selected_keys=None,flag=True):
-        # better lookup time
-        flagged_keys = set_or_none(flagged_keys)
-        selected_keys = set_or_none(selected_keys)
-        for key in flagged_keys:
-            self.artist_dict[key].flagged = flag
-            
-        self.draw()
+        if self.artist is None:
+            return
+        self.artist.flagged[self.artist.indices(flagged_keys)] = flag
+        self.artist.update()
+        self.draw_idle()
 
     def add_flagged(self,unflagged_keys,selected_keys=None):
         self.set_flagged(unflagged_keys,selected_keys,True)
@@ -226,16 +177,15 @@ class CollectionCanvas(FigureCanvasQTAgg):
             xlim = self.ax.get_xlim()
             ylim = self.ax.get_ylim()
         # plot
+        if self.artist is not None:
+            self.artist.remove()
         self.ax.clear()
-        collection.plot(ax=self.ax, style='k', picker=1)
+        self.artist = CollectionArtist(self.ax, collection)
+        self.artist.show_flagged = self._show_flagged
+        self.artist.show_unselected = self._show_unselected
+        self.artist.update()
         #self.ax.set_title(collection.name)
-        keys = [s.name for s in collection.spectra]
-        artists = self.ax.lines
-        self.artist_dict = {key:SpectrumArtist(artist)
-                for key,artist in zip(keys,artists)}
-        for key in collection.flags:
-            self.artist_dict[key].flagged = True
-        self.ax.legend().remove()
+        self.ax.autoscale_view()
         self.ax.grid(True)
         self.draw()
 
@@ -1,16 +1,94 @@
+# export_collection.py writes a collection to an output directory in the
+# background. Individual csv files are written by a thread pool and
+# individual figures by a process pool reusing one figure per worker.
+# Every file is written under a temporary name and renamed, so an export
+# that was cancelled or crashed can be resumed by skipping the files that
+# exist.
 import os
-from matplotlib import pyplot as plt
+from threading import Event
 from PyQt5 import QtCore
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from specdal.writers import write_csvs, write_pngs
+from specdal.gui.collection_artist import CollectionArtist
+from .jobs import Cancelled
+
+# threads writing csv files and processes rendering figures; None renders
+# on every cpu
+THREADS = min(32, (os.cpu_count() or 1) + 4)
+PROCESSES = None
 
 class CollectionExporter(QtCore.QThread):
+    """
+    Export a collection in a background thread
+
+    The configuration is a dict with keys
+    path: output directory
+    flags: whether flagged spectra are exported
+    data, figures: dicts of booleans dataset and individual
+    resume: skip the files already in the output directory
+
+    Signals
+    -------
+    progress(stage, done, total), exported(path), cancelled(),
+    failed(message); QThread.finished is emitted after each of them
+    """
+    progress = QtCore.pyqtSignal(str, int, int)
+    exported = QtCore.pyqtSignal(str)
+    cancelled = QtCore.pyqtSignal()
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cancel = Event()
+        self.collection = None
+        self.configuration = None
+
     def export(self,collection,configuration):
         self.collection = collection
         self.configuration = configuration
+        self._cancel.clear()
         self.start()
 
+    def cancel(self):
+        """Stop the export after the files being written"""
+        self._cancel.set()
+
     def run(self):
-        c = self.collection
-        configuration = self.configuration
+        try:
+            self._export(self.collection, self.configuration)
+        except Cancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit("{}: {}".format(type(e).__name__, e))
+        else:
+            self.exported.emit(self.configuration['path'])
+
+    def _reporter(self, stage, skipped, total):
+        """Callback of the writers emitting progress and checking for cancel"""
+        def callback(done):
+            self.progress.emit(stage, skipped + done, total)
+            if self._cancel.is_set():
+                raise Cancelled(stage)
+        return callback
+
+    def _pending(self, spectra, directory, extension):
+        """The spectra without an output file, or all when not resuming"""
+        if not self.configuration.get('resume', False):
+            return spectra
+        done = set(os.listdir(directory))
+        return [s for s in spectra if s.name + extension not in done]
+
+    def _write(self, stage, path, write):
+        """Call write(tmp) and rename tmp to path, unless resuming past it"""
+        if self.configuration.get('resume', False) and os.path.exists(path):
+            return
+        self.progress.emit(stage, 0, 1)
+        write(path + '.tmp')
+        os.replace(path + '.tmp', path)
+        self._reporter(stage, 0, 1)(1)
+
+    def _export(self, c, configuration):
         if not configuration['flags']:
             c = c.as_unflagged()
         # output individual spectra
@@ -19,27 +97,45 @@ class CollectionExporter(QtCore.QThread):
         figdir = os.path.join(outdir, 'figures')
         os.makedirs(datadir,exist_ok=True)
         os.makedirs(figdir,exist_ok=True)
+        total = len(c.spectra)
         if configuration['data']['individual']:
             indiv_datadir = os.path.join(datadir, 'indiv')
             os.makedirs(indiv_datadir,exist_ok=True)
-            for spectrum in c.spectra:
-                spectrum.to_csv(os.path.join(indiv_datadir, spectrum.name + '.csv'))
+            spectra = self._pending(c.spectra, indiv_datadir, '.csv')
+            callback = self._reporter("Writing spectra",
+                                      total - len(spectra), total)
+            callback(0)
+            write_csvs(spectra, indiv_datadir, threads=THREADS,
+                       callback=callback)
 
         if configuration['figures']['individual']:
             indiv_figdir = os.path.join(figdir, 'indiv')
             os.makedirs(indiv_figdir,exist_ok=True)
-            for spectrum in c.spectra:
-                spectrum.plot(legend=False)
-                plt.savefig(os.path.join(indiv_figdir, spectrum.name + '.png'), bbox_inches='tight')
-                plt.close()
+            spectra = self._pending(c.spectra, indiv_figdir, '.png')
+            callback = self._reporter("Plotting spectra",
+                                      total - len(spectra), total)
+            callback(0)
+            write_pngs(spectra, indiv_figdir, processes=PROCESSES,
+                       callback=callback)
 
         # output whole and group data
         if configuration['data']['dataset']:
-            c.to_csv(os.path.join(datadir, c.name + ".csv"))
+            self._write("Writing dataset",
+                        os.path.join(datadir, c.name + ".csv"), c.to_csv)
 
         if configuration['figures']['dataset']:
-        # output whole and group figures (possibly with aggregates appended)
-            c.plot(legend=False)
-            plt.savefig(os.path.join(figdir, c.name + ".png"),  bbox_inches="tight")
-            plt.close()
+            self._write("Plotting dataset",
+                        os.path.join(figdir, c.name + ".png"),
+                        lambda path: plot_collection(c, path))
 
+def plot_collection(collection, path):
+    """Save a figure of every spectrum of collection to a png file"""
+    # draw with the Agg canvas directly, pyplot is not thread safe
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    CollectionArtist(ax, collection)
+    ax.autoscale_view()
+    if len(collection.spectra) > 0:
+        ax.set_xlabel(collection.spectra[0].measurement.index.name or '')
+    fig.savefig(path, format='png', bbox_inches='tight')
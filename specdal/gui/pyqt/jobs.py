@@ -0,0 +1,211 @@
+# jobs.py runs the operators of the Qt viewer in the background. A job is
+# a list of steps, each computing a new collection from the previous one,
+# so the collection shown keeps working until a job finishes and its
+# result is swapped in whole. Jobs report progress and can be cancelled
+# between chunks of spectra.
+import copy
+from queue import Queue
+from threading import Event, Lock
+from PyQt5 import QtCore
+from specdal import parallel
+from specdal.containers.collection import Collection, proximal_join
+
+# number of progress reports per step
+PROGRESS_STEPS = 100
+
+class Cancelled(Exception):
+    """Raised in a job that was cancelled"""
+
+class Job(object):
+    """
+    A named list of steps, functions of (collection, job) returning a new
+    collection. Steps call job.report(done, total) to report progress and
+    job.check() between chunks of work, which raises Cancelled once the
+    job is cancelled.
+    """
+    def __init__(self, name, steps, queue):
+        self.name = name
+        self.steps = steps
+        self._queue = queue
+        self._cancel = Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise Cancelled(self.name)
+
+    def report(self, done, total):
+        self._queue.progress.emit(self.name, done, total)
+
+class JobQueue(QtCore.QThread):
+    """
+    Run jobs one at a time on the collection, in a background thread
+
+    Each job starts from the collection left by the previous one, or set
+    with set_collection(). Signals are emitted from the worker thread;
+    connected slots of GUI objects run in the GUI thread.
+
+    Signals
+    -------
+    started_job(name), progress(name, done, total),
+    done(name, collection), cancelled(name), failed(name, message)
+    """
+    started_job = QtCore.pyqtSignal(str)
+    progress = QtCore.pyqtSignal(str, int, int)
+    done = QtCore.pyqtSignal(str, object)
+    cancelled = QtCore.pyqtSignal(str)
+    failed = QtCore.pyqtSignal(str, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._queue = Queue()
+        self._lock = Lock()
+        self._jobs = []
+        self._collection = None
+
+    @property
+    def collection(self):
+        with self._lock:
+            return self._collection
+
+    def set_collection(self, collection):
+        """Cancel every job and start the next ones from collection"""
+        with self._lock:
+            self._collection = collection
+            jobs, self._jobs = self._jobs, []
+        for job in jobs:
+            job.cancel()
+
+    def submit(self, name, *steps):
+        """Queue a job running steps in order and return it"""
+        job = Job(name, steps, self)
+        with self._lock:
+            self._jobs.append(job)
+        self._queue.put(job)
+        return job
+
+    def cancel(self):
+        """Cancel the running and queued jobs"""
+        with self._lock:
+            jobs, self._jobs = self._jobs, []
+        for job in jobs:
+            job.cancel()
+
+    @property
+    def busy(self):
+        with self._lock:
+            return len(self._jobs) > 0
+
+    def stop(self):
+        """Cancel every job and end the thread"""
+        self.cancel()
+        self._queue.put(None)
+        self.wait()
+
+    def run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            collection = self.collection
+            error = None
+            try:
+                job.check()
+                self.started_job.emit(job.name)
+                for step in job.steps:
+                    collection = step(collection, job)
+                    job.check()
+            except Cancelled:
+                pass
+            except Exception as e:
+                error = "{}: {}".format(type(e).__name__, e)
+            with self._lock:
+                # done once off the list, so that busy is up to date in
+                # the slots; a collection replaced meanwhile cancels it
+                if job in self._jobs:
+                    self._jobs.remove(job)
+                swap = error is None and not job.cancelled
+                if swap:
+                    self._collection = collection
+            if error is not None:
+                self.failed.emit(job.name, error)
+            elif swap:
+                self.done.emit(job.name, collection)
+            else:
+                self.cancelled.emit(job.name)
+
+def copy_collection(collection, spectra):
+    """
+    A collection of spectra with the name, metadata and flags of
+    collection, spectra being in the order of collection.spectra
+    """
+    result = Collection(name=collection.name, spectra=spectra,
+                        measure_type=collection.measure_type,
+                        metadata=collection.metadata,
+                        dtype=collection.dtype)
+    for layer in collection.flag_layers:
+        result.flag_layer(layer).set_mask(collection.flag_layer(layer).mask)
+    return result
+
+def map_operator(function, flag=None, processes=None, **kwargs):
+    '''
+    Return a step replacing each measurement with
+    function(measurement, **kwargs), e.g. specdal.operators.stitch,
+    computed on the worker pool of specdal.parallel
+
+    Parameters
+    ----------
+    flag: string
+        spectrum attribute set to True, e.g. "stitched"
+
+    processes: int
+        number of worker processes; defaults to
+        specdal.parallel.PROCESSES
+    '''
+    def step(collection, job):
+        spectra = collection.spectra
+        total = len(spectra)
+        chunksize = max(1, -(-total//PROGRESS_STEPS))
+        measurements = []
+        job.report(0, total)
+        chunks = parallel.imap_spectra(function, spectra, processes,
+                                       chunksize, **kwargs)
+        try:
+            for chunk in chunks:
+                job.check()
+                measurements.extend(chunk)
+                job.report(len(measurements), total)
+        finally:
+            chunks.close()
+        result = []
+        for spectrum, measurement in zip(spectra, measurements):
+            spectrum = copy.copy(spectrum)
+            spectrum.measurement = spectrum._cast(measurement)
+            if flag is not None:
+                setattr(spectrum, flag, True)
+            result.append(spectrum)
+        return copy_collection(collection, result)
+    return step
+
+def proximal_join_step(directory, on='gps_time_tgt', direction='nearest'):
+    """Return a step dividing the spectra by the nearest ones read from directory"""
+    def step(collection, job):
+        job.report(0, 2)
+        base = Collection(name='base', directory=directory)
+        job.check()
+        job.report(1, 2)
+        try:
+            result = proximal_join(base, collection, on=on, direction=direction)
+        except SystemExit:
+            # proximal_join exits on wavelengths that go back
+            raise ValueError("Cannot proximally join dataset with "
+                             "non-increasing wavelengths. Try stitching.")
+        job.report(2, 2)
+        return result
+    return step
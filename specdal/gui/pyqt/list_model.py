@@ -0,0 +1,68 @@
+# list_model.py shows the spectra of a collection in a QListView through
+# a model instead of one QListWidgetItem per spectrum. The view asks for
+# the rows it draws only, reading names and groups from a NameIndex and
+# flags from the collection, and changes notify the rows they touch.
+import numpy as np
+from PyQt5 import QtCore, QtGui
+from specdal.gui.name_index import NameIndex, runs
+
+# changes touching more runs of rows are notified as one range
+MAX_RANGES = 64
+
+class SpectrumListModel(QtCore.QAbstractListModel):
+    """
+    The spectra of a collection, one row each in collection order
+
+    Attributes
+    ----------
+    names: specdal.gui.name_index.NameIndex
+        names and groups of the rows
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.names = NameIndex([])
+        self._flags = None
+        # the view asks for the row count for every row it lays out
+        self._rows = 0
+        self._flag_brush = QtGui.QBrush(QtCore.Qt.red)
+
+    def set_collection(self, collection):
+        """Show the spectra of collection, resetting the view"""
+        self.beginResetModel()
+        self.names = NameIndex([s.name for s in collection.spectra])
+        self._flags = collection.flags
+        self._rows = len(self.names)
+        self.endResetModel()
+
+    def set_flags(self, flags):
+        """Read flags from a collection with the same spectra"""
+        self._flags = flags
+        self.rows_changed(np.ones(len(self.names), dtype=bool))
+
+    def rows_changed(self, rows):
+        """Notify the views that rows (indices or boolean array) changed"""
+        mask = np.zeros(len(self.names), dtype=bool)
+        mask[rows] = True
+        changed = runs(mask)
+        if len(changed) > MAX_RANGES:
+            # one signal spanning scattered rows; the view repaints what
+            # it shows of them
+            changed = [(changed[0][0], changed[-1][1])]
+        for start, stop in changed:
+            self.dataChanged.emit(self.index(start), self.index(stop - 1))
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._rows
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == QtCore.Qt.DisplayRole:
+            return self.names.label(row)
+        if role == QtCore.Qt.ForegroundRole:
+            if self._flags is not None and self.names.names[row] in self._flags:
+                return self._flag_brush
+        return None
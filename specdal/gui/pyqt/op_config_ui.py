@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'op_config.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_Dialog(object):
+    def setupUi(self, Dialog):
+        Dialog.setObjectName("Dialog")
+        Dialog.resize(420, 518)
+        self.verticalLayout = QtWidgets.QVBoxLayout(Dialog)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.statsBox = QtWidgets.QGroupBox(Dialog)
+        self.statsBox.setCheckable(True)
+        self.statsBox.setChecked(False)
+        self.statsBox.setObjectName("statsBox")
+        self.verticalLayout_2 = QtWidgets.QVBoxLayout(self.statsBox)
+        self.verticalLayout_2.setObjectName("verticalLayout_2")
+        self.gridLayout_2 = QtWidgets.QGridLayout()
+        self.gridLayout_2.setObjectName("gridLayout_2")
+        self.minCheck = QtWidgets.QCheckBox(self.statsBox)
+        self.minCheck.setObjectName("minCheck")
+        self.gridLayout_2.addWidget(self.minCheck, 0, 1, 1, 1)
+        self.meanCheck = QtWidgets.QCheckBox(self.statsBox)
+        self.meanCheck.setTristate(False)
+        self.meanCheck.setObjectName("meanCheck")
+        self.gridLayout_2.addWidget(self.meanCheck, 0, 0, 1, 1)
+        self.medianCheck = QtWidgets.QCheckBox(self.statsBox)
+        self.medianCheck.setObjectName("medianCheck")
+        self.gridLayout_2.addWidget(self.medianCheck, 1, 0, 1, 1)
+        self.maxCheck = QtWidgets.QCheckBox(self.statsBox)
+        self.maxCheck.setObjectName("maxCheck")
+        self.gridLayout_2.addWidget(self.maxCheck, 1, 1, 1, 1)
+        self.verticalLayout_2.addLayout(self.gridLayout_2)
+        self.verticalLayout.addWidget(self.statsBox)
+        self.stitchBox = QtWidgets.QGroupBox(Dialog)
+        self.stitchBox.setCheckable(True)
+        self.stitchBox.setChecked(False)
+        self.stitchBox.setObjectName("stitchBox")
+        self.gridLayout_4 = QtWidgets.QGridLayout(self.stitchBox)
+        self.gridLayout_4.setObjectName("gridLayout_4")
+        self.label_3 = QtWidgets.QLabel(self.stitchBox)
+        self.label_3.setObjectName("label_3")
+        self.gridLayout_4.addWidget(self.label_3, 0, 0, 1, 1)
+        self.stitchMethod = QtWidgets.QComboBox(self.stitchBox)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Maximum, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.stitchMethod.sizePolicy().hasHeightForWidth())
+        self.stitchMethod.setSizePolicy(sizePolicy)
+        self.stitchMethod.setObjectName("stitchMethod")
+        self.stitchMethod.addItem("")
+        self.stitchMethod.addItem("")
+        self.stitchMethod.addItem("")
+        self.stitchMethod.addItem("")
+        self.stitchMethod.addItem("")
+        self.gridLayout_4.addWidget(self.stitchMethod, 0, 1, 1, 1)
+        self.verticalLayout.addWidget(self.stitchBox)
+        self.jumpCorrectBox = QtWidgets.QGroupBox(Dialog)
+        self.jumpCorrectBox.setCheckable(True)
+        self.jumpCorrectBox.setChecked(False)
+        self.jumpCorrectBox.setObjectName("jumpCorrectBox")
+        self.verticalLayout_3 = QtWidgets.QVBoxLayout(self.jumpCorrectBox)
+        self.verticalLayout_3.setObjectName("verticalLayout_3")
+        self.gridLayout = QtWidgets.QGridLayout()
+        self.gridLayout.setObjectName("gridLayout")
+        self.label = QtWidgets.QLabel(self.jumpCorrectBox)
+        self.label.setObjectName("label")
+        self.gridLayout.addWidget(self.label, 0, 0, 1, 1)
+        self.jumpSplices = QtWidgets.QLineEdit(self.jumpCorrectBox)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Maximum, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.jumpSplices.sizePolicy().hasHeightForWidth())
+        self.jumpSplices.setSizePolicy(sizePolicy)
+        self.jumpSplices.setText("")
+        self.jumpSplices.setObjectName("jumpSplices")
+        self.gridLayout.addWidget(self.jumpSplices, 0, 1, 1, 1)
+        self.jumpReference = QtWidgets.QSpinBox(self.jumpCorrectBox)
+        self.jumpReference.setProperty("value", 0)
+        self.jumpReference.setObjectName("jumpReference")
+        self.gridLayout.addWidget(self.jumpReference, 1, 1, 1, 1)
+        self.label_2 = QtWidgets.QLabel(self.jumpCorrectBox)
+        self.label_2.setObjectName("label_2")
+        self.gridLayout.addWidget(self.label_2, 1, 0, 1, 1)
+        self.verticalLayout_3.addLayout(self.gridLayout)
+        self.jumpCorrectWarningLabel = QtWidgets.QLabel(self.jumpCorrectBox)
+        self.jumpCorrectWarningLabel.setStyleSheet("QLabel { color : orange; font-weight: bold; }")
+        self.jumpCorrectWarningLabel.setWordWrap(True)
+        self.jumpCorrectWarningLabel.setObjectName("jumpCorrectWarningLabel")
+        self.verticalLayout_3.addWidget(self.jumpCorrectWarningLabel)
+        self.verticalLayout.addWidget(self.jumpCorrectBox)
+        self.interpolateBox = QtWidgets.QGroupBox(Dialog)
+        self.interpolateBox.setCheckable(True)
+        self.interpolateBox.setChecked(False)
+        self.interpolateBox.setObjectName("interpolateBox")
+        self.gridLayout_3 = QtWidgets.QGridLayout(self.interpolateBox)
+        self.gridLayout_3.setObjectName("gridLayout_3")
+        self.label_4 = QtWidgets.QLabel(self.interpolateBox)
+        self.label_4.setObjectName("label_4")
+        self.gridLayout_3.addWidget(self.label_4, 0, 0, 1, 1)
+        self.interpSpacing = QtWidgets.QDoubleSpinBox(self.interpolateBox)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Maximum, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.interpSpacing.sizePolicy().hasHeightForWidth())
+        self.interpSpacing.setSizePolicy(sizePolicy)
+        self.interpSpacing.setObjectName("interpSpacing")
+        self.gridLayout_3.addWidget(self.interpSpacing, 0, 1, 1, 1)
+        self.label_6 = QtWidgets.QLabel(self.interpolateBox)
+        self.label_6.setObjectName("label_6")
+        self.gridLayout_3.addWidget(self.label_6, 1, 0, 1, 1)
+        self.interpMethod = QtWidgets.QComboBox(self.interpolateBox)
+        self.interpMethod.setObjectName("interpMethod")
+        self.interpMethod.addItem("")
+        self.interpMethod.addItem("")
+        self.gridLayout_3.addWidget(self.interpMethod, 1, 1, 1, 1)
+        self.verticalLayout.addWidget(self.interpolateBox)
+        self.proximalBox = QtWidgets.QGroupBox(Dialog)
+        self.proximalBox.setCheckable(True)
+        self.proximalBox.setChecked(False)
+        self.proximalBox.setObjectName("proximalBox")
+        self.horizontalLayout_3 = QtWidgets.QHBoxLayout(self.proximalBox)
+        self.horizontalLayout_3.setObjectName("horizontalLayout_3")
+        self.label_5 = QtWidgets.QLabel(self.proximalBox)
+        self.label_5.setObjectName("label_5")
+        self.horizontalLayout_3.addWidget(self.label_5)
+        self.proxDir = QtWidgets.QToolButton(self.proximalBox)
+        self.proxDir.setObjectName("proxDir")
+        self.horizontalLayout_3.addWidget(self.proxDir)
+        self.verticalLayout.addWidget(self.proximalBox)
+        spacerItem = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.verticalLayout.addItem(spacerItem)
+        self.buttonBox = QtWidgets.QDialogButtonBox(Dialog)
+        self.buttonBox.setOrientation(QtCore.Qt.Horizontal)
+        self.buttonBox.setStandardButtons(QtWidgets.QDialogButtonBox.Cancel|QtWidgets.QDialogButtonBox.Ok)
+        self.buttonBox.setObjectName("buttonBox")
+        self.verticalLayout.addWidget(self.buttonBox)
+
+        self.retranslateUi(Dialog)
+        self.buttonBox.accepted.connect(Dialog.accept) # type: ignore
+        self.buttonBox.rejected.connect(Dialog.reject) # type: ignore
+        QtCore.QMetaObject.connectSlotsByName(Dialog)
+
+    def retranslateUi(self, Dialog):
+        _translate = QtCore.QCoreApplication.translate
+        Dialog.setWindowTitle(_translate("Dialog", "Operator Configuration"))
+        self.statsBox.setTitle(_translate("Dialog", "Plot Statistics"))
+        self.minCheck.setText(_translate("Dialog", "Mi&nimum"))
+        self.meanCheck.setText(_translate("Dialog", "&Mean"))
+        self.medianCheck.setText(_translate("Dialog", "M&edian"))
+        self.maxCheck.setText(_translate("Dialog", "M&aximum"))
+        self.stitchBox.setTitle(_translate("Dialog", "Stitch"))
+        self.label_3.setText(_translate("Dialog", "Stitching Method:"))
+        self.stitchMethod.setItemText(0, _translate("Dialog", "Maximum"))
+        self.stitchMethod.setItemText(1, _translate("Dialog", "Minimum"))
+        self.stitchMethod.setItemText(2, _translate("Dialog", "Mean"))
+        self.stitchMethod.setItemText(3, _translate("Dialog", "Median"))
+        self.stitchMethod.setItemText(4, _translate("Dialog", "Interpolated"))
+        self.jumpCorrectBox.setTitle(_translate("Dialog", "Jump Correct"))
+        self.label.setText(_translate("Dialog", "Wavelength Splices:"))
+        self.label_2.setText(_translate("Dialog", "Reference Band:"))
+        self.jumpCorrectWarningLabel.setText(_translate("Dialog", "⚠ Couldn\'t parse wavelength splices"))
+        self.interpolateBox.setTitle(_translate("Dialog", "Interpolate"))
+        self.label_4.setText(_translate("Dialog", "Interpolation Spacing (nm): "))
+        self.label_6.setText(_translate("Dialog", "Interpolation Method:"))
+        self.interpMethod.setItemText(0, _translate("Dialog", "Linear Spline"))
+        self.interpMethod.setItemText(1, _translate("Dialog", "Cubic"))
+        self.proximalBox.setTitle(_translate("Dialog", "Proximal Reference"))
+        self.label_5.setText(_translate("Dialog", "Reference Directory:"))
+        self.proxDir.setText(_translate("Dialog", "Select Directory ... "))
@@ -97,13 +97,16 @@ class Ui_MainWindow(object):
         self.onlyShowSelected = QtWidgets.QCheckBox(self.layoutWidget)
         self.onlyShowSelected.setObjectName("onlyShowSelected")
         self.verticalLayout_2.addWidget(self.onlyShowSelected)
-        self.spectraList = QtWidgets.QListWidget(self.layoutWidget)
+        self.spectraList = QtWidgets.QListView(self.layoutWidget)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
         sizePolicy.setHeightForWidth(self.spectraList.sizePolicy().hasHeightForWidth())
         self.spectraList.setSizePolicy(sizePolicy)
         self.spectraList.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.spectraList.setLayoutMode(QtWidgets.QListView.Batched)
+        self.spectraList.setUniformItemSizes(True)
+        self.spectraList.setBatchSize(2000)
         self.spectraList.setObjectName("spectraList")
         self.verticalLayout_2.addWidget(self.spectraList)
         self.loadLabel = QtWidgets.QLabel(self.layoutWidget)
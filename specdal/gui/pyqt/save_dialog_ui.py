@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'save_dialog.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_Dialog(object):
+    def setupUi(self, Dialog):
+        Dialog.setObjectName("Dialog")
+        Dialog.resize(330, 324)
+        self.verticalLayout = QtWidgets.QVBoxLayout(Dialog)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.exportData = QtWidgets.QGroupBox(Dialog)
+        self.exportData.setCheckable(True)
+        self.exportData.setObjectName("exportData")
+        self.verticalLayout_2 = QtWidgets.QVBoxLayout(self.exportData)
+        self.verticalLayout_2.setObjectName("verticalLayout_2")
+        self.saveDataset = QtWidgets.QCheckBox(self.exportData)
+        self.saveDataset.setObjectName("saveDataset")
+        self.verticalLayout_2.addWidget(self.saveDataset)
+        self.saveIndiv = QtWidgets.QCheckBox(self.exportData)
+        self.saveIndiv.setObjectName("saveIndiv")
+        self.verticalLayout_2.addWidget(self.saveIndiv)
+        self.verticalLayout.addWidget(self.exportData)
+        self.exportPlots = QtWidgets.QGroupBox(Dialog)
+        self.exportPlots.setFlat(False)
+        self.exportPlots.setCheckable(True)
+        self.exportPlots.setObjectName("exportPlots")
+        self.verticalLayout_3 = QtWidgets.QVBoxLayout(self.exportPlots)
+        self.verticalLayout_3.setObjectName("verticalLayout_3")
+        self.plotDataset = QtWidgets.QCheckBox(self.exportPlots)
+        self.plotDataset.setObjectName("plotDataset")
+        self.verticalLayout_3.addWidget(self.plotDataset)
+        self.plotIndiv = QtWidgets.QCheckBox(self.exportPlots)
+        self.plotIndiv.setObjectName("plotIndiv")
+        self.verticalLayout_3.addWidget(self.plotIndiv)
+        self.verticalLayout.addWidget(self.exportPlots)
+        self.includeFlags = QtWidgets.QCheckBox(Dialog)
+        self.includeFlags.setObjectName("includeFlags")
+        self.verticalLayout.addWidget(self.includeFlags)
+        self.resumeExport = QtWidgets.QCheckBox(Dialog)
+        self.resumeExport.setObjectName("resumeExport")
+        self.verticalLayout.addWidget(self.resumeExport)
+        self.horizontalLayout = QtWidgets.QHBoxLayout()
+        self.horizontalLayout.setObjectName("horizontalLayout")
+        self.label = QtWidgets.QLabel(Dialog)
+        self.label.setObjectName("label")
+        self.horizontalLayout.addWidget(self.label)
+        self.saveDir = QtWidgets.QToolButton(Dialog)
+        self.saveDir.setObjectName("saveDir")
+        self.horizontalLayout.addWidget(self.saveDir)
+        self.verticalLayout.addLayout(self.horizontalLayout)
+        spacerItem = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.verticalLayout.addItem(spacerItem)
+        self.buttonBox = QtWidgets.QDialogButtonBox(Dialog)
+        self.buttonBox.setOrientation(QtCore.Qt.Horizontal)
+        self.buttonBox.setStandardButtons(QtWidgets.QDialogButtonBox.Cancel|QtWidgets.QDialogButtonBox.Ok)
+        self.buttonBox.setObjectName("buttonBox")
+        self.verticalLayout.addWidget(self.buttonBox)
+
+        self.retranslateUi(Dialog)
+        self.buttonBox.accepted.connect(Dialog.accept) # type: ignore
+        self.buttonBox.rejected.connect(Dialog.reject) # type: ignore
+        QtCore.QMetaObject.connectSlotsByName(Dialog)
+
+    def retranslateUi(self, Dialog):
+        _translate = QtCore.QCoreApplication.translate
+        Dialog.setWindowTitle(_translate("Dialog", "Export Dataset"))
+        self.exportData.setTitle(_translate("Dialog", "Export Data"))
+        self.saveDataset.setText(_translate("Dialog", "Export Whole Dataset"))
+        self.saveIndiv.setText(_translate("Dialog", "Export Individual Spectra"))
+        self.exportPlots.setTitle(_translate("Dialog", "Export Figures"))
+        self.plotDataset.setText(_translate("Dialog", "Export Whole Dataset"))
+        self.plotIndiv.setText(_translate("Dialog", "Export Individual Spectra"))
+        self.includeFlags.setText(_translate("Dialog", "Include Flagged Spectra"))
+        self.resumeExport.setToolTip(_translate("Dialog", "Keep the files already in the export directory and write the missing ones"))
+        self.resumeExport.setText(_translate("Dialog", "Resume Previous Export"))
+        self.label.setText(_translate("Dialog", "Export Directory:"))
+        self.saveDir.setText(_translate("Dialog", "Select Directory ... "))
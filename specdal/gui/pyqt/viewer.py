@@ -2,17 +2,21 @@ from PyQt5 import QtGui, QtCore, QtWidgets
 import os
 import sys
 import re
+import numpy as np
 from specdal.containers.spectrum import Spectrum
 from specdal.containers.collection import Collection
-from threading import Lock
-from queue import Queue
+from specdal.containers.flags import write_flag_file
 from collections import OrderedDict
 from contextlib import contextmanager
 from . import qt_viewer_ui
 from . import op_config_ui
 from . import save_dialog_ui 
 from .collection_plotter import CollectionCanvas, ToolBar
+from .list_model import SpectrumListModel
+from specdal.gui.name_index import runs
 from .export_collection import CollectionExporter
+from .jobs import JobQueue, map_operator, proximal_join_step
+import specdal.operators as op
 
 PATH = os.path.split(os.path.abspath(__file__))[0]
 DIR = os.path.join(PATH,"Assets")
@@ -40,6 +44,7 @@ class SaveDialog(QtWidgets.QDialog,save_dialog_ui.Ui_Dialog):
         self.result = {
             "path":self.saveDir.text(),
             "flags":self.includeFlags.isChecked(),
+            "resume":self.resumeExport.isChecked(),
             "data": {
                 "dataset":self.saveDataset.isChecked(),
                 "individual":self.saveIndiv.isChecked(),
@@ -146,30 +151,6 @@ class OperatorConfigDialog(QtWidgets.QDialog,op_config_ui.Ui_Dialog):
         self.state = self.make_opstate()
 
 
-class ComputeThread(QtCore.QThread):
-    """Run large computations in a background thread
-    so GUI can still run. Sort of works."""
-    done = QtCore.pyqtSignal(bool)
-    lock = Lock()
-    tQ = Queue()
-    def __init__(self,prefix,suffix):
-        super().__init__()
-        self.prefix = prefix
-        self.done.connect(suffix)
-
-    def compute(self,target,*args,**kwargs):
-        self.prefix() #prefix might not be thread safe
-        self.tQ.put((target,args,kwargs))
-
-    def run(self):
-        while True:
-            target,args,kwargs = self.tQ.get()
-            try:
-                target(*args,**kwargs)
-            except Exception:
-                print("Target Failed!")
-            self.done.emit(True)
-
 class OperatorState():
     class _ProximalState():
         directory = os.getcwd()
@@ -208,6 +189,8 @@ class SpecDALViewer(QtWidgets.QMainWindow, qt_viewer_ui.Ui_MainWindow):
         self._add_plot()
         self._directory = None
         self._collection = None
+        self._list = SpectrumListModel(self)
+        self.spectraList.setModel(self._list)
         self.show_flagged = True
         self.show_unselected = True
         self.op_state = OperatorState()
@@ -247,7 +230,8 @@ class SpecDALViewer(QtWidgets.QMainWindow, qt_viewer_ui.Ui_MainWindow):
                 self._restore_dataset)
 
         # Text-based selection dialog
-        self.spectraList.itemSelectionChanged.connect(self.updateFromList)
+        self.spectraList.selectionModel().selectionChanged.connect(
+                lambda selected,deselected: self.updateFromList())
         self.selectByName.clicked.connect(self.updateFromRegex)
         self.nameSelection.returnPressed.connect(self.updateFromRegex)
         self.createGroup.clicked.connect(self.updateGroupNames)
@@ -260,31 +244,87 @@ class SpecDALViewer(QtWidgets.QMainWindow, qt_viewer_ui.Ui_MainWindow):
         self.loadLabel.hide()
         self._movie.start()
 
-        #compute thread
-        self._ct = ComputeThread(self._compute_prefix,
-                self._compute_suffix)
-        self._ct.start()
+        # background operators
+        self.jobProgress = QtWidgets.QProgressBar()
+        self.cancelJobs = QtWidgets.QPushButton("Cancel")
+        self.cancelJobs.clicked.connect(self._cancel_jobs)
+        self.statusBar().addPermanentWidget(self.jobProgress)
+        self.statusBar().addPermanentWidget(self.cancelJobs)
+        self.jobProgress.hide()
+        self.cancelJobs.hide()
+        self._jobs = JobQueue(self)
+        self._jobs.started_job.connect(self._job_started)
+        self._jobs.progress.connect(self._job_progress)
+        self._jobs.done.connect(self._job_done)
+        self._jobs.cancelled.connect(self._job_ended)
+        self._jobs.failed.connect(self._job_failed)
+        self._jobs.start()
+        self._exporter = CollectionExporter(self)
+        self._exporter.progress.connect(self._export_progress)
+        self._exporter.exported.connect(self._export_done)
+        self._exporter.cancelled.connect(self._export_cancelled)
+        self._exporter.failed.connect(self._export_failed)
+        self._exporter.finished.connect(self._export_ended)
 
     def setSelectMode(self):
         if self.navbar.icons['select'].isChecked():
             self.navbar.returnToSelectMode()
 
-    def _compute_prefix(self):
+    def _job_started(self,name):
         self.loadLabel.show()
-        self.spectraList.clearSelection()
-        self.canvas.suspendMouseNavigation()
+        self.jobProgress.setValue(0)
+        self.jobProgress.show()
+        self.cancelJobs.show()
+        self.statusBar().showMessage(name)
+
+    def _job_progress(self,name,done,total):
+        self.jobProgress.setMaximum(total)
+        self.jobProgress.setValue(done)
+
+    def _job_done(self,name,collection):
+        """Swap in the collection computed by a job"""
+        old = self._collection
+        if old is not None:
+            # keep the flags set while the job ran
+            collection.flags = old.flags
+        self._collection = collection
+        self.canvas.update_artists(collection)
+        if old is None or [s.name for s in old.spectra] != \
+                [s.name for s in collection.spectra]:
+            self._update_list()
+        else:
+            self._list.set_flags(collection.flags)
+            self.canvas.update_selected(self.selection_text)
+        self._job_ended(name)
 
-    def _compute_suffix(self):
-        self.canvas.update_artists(self._collection)
-        self.canvas.setupMouseNavigation()
-        self.loadLabel.hide()
+    def _job_failed(self,name,message):
+        self._job_ended(name)
+        self.statusBar().showMessage("{} failed: {}".format(name,message))
+
+    def _job_ended(self,name):
+        if not self._jobs.busy and not self._exporter.isRunning():
+            self.loadLabel.hide()
+            self.jobProgress.hide()
+            self.cancelJobs.hide()
+            self.statusBar().clearMessage()
+
+    def _cancel_jobs(self):
+        self._jobs.cancel()
+        self._exporter.cancel()
+
+    def closeEvent(self,event):
+        self._jobs.stop()
+        self._exporter.cancel()
+        self._exporter.wait()
+        super(SpecDALViewer,self).closeEvent(event)
 
     def _jump_correct(self):
         if not self._collection: 
             return
-        self._ct.compute(self._collection.jump_correct,
-                self.op_state.jump.splices, 
-                self.op_state.jump.reference)
+        self._jobs.submit("Jump correct",
+                map_operator(op.jump_correct,'jump_corrected',
+                    splices=self.op_state.jump.splices,
+                    reference=self.op_state.jump.reference))
 
     def _stitch(self):
         if not self._collection: 
@@ -296,17 +336,23 @@ class SpecDALViewer(QtWidgets.QMainWindow, qt_viewer_ui.Ui_MainWindow):
             "Mean":"mean",
             "Interpolated":"first"
         }[self.op_state.stitch.mode]
-        self._ct.compute(self._collection.stitch,mode)
+        self._jobs.submit("Stitch",
+                map_operator(op.stitch,'stitched',method=mode))
 
     def _interp(self):
         if not self._collection: 
             return
         spacing = self.op_state.interp.spacing
         method = self.op_state.interp.mode
-        self._ct.compute(self._collection.interpolate,spacing,method=method)
+        self._jobs.submit("Interpolate",
+                map_operator(op.interpolate,'interpolated',
+                    spacing=spacing,method=method))
 
     def _proximal_join(self):
-        raise NotImplemented
+        if not self._collection or not self.op_state.proximal.directory:
+            return
+        self._jobs.submit("Proximal join",
+                proximal_join_step(self.op_state.proximal.directory))
 
     def _export_flags(self):
         fname = QtWidgets.QFileDialog.getSaveFileName(self,
@@ -314,27 +360,50 @@ class SpecDALViewer(QtWidgets.QMainWindow, qt_viewer_ui.Ui_MainWindow):
                 filter="Supported types (*.csv, *.txt)")
         if not fname[0]:
             return
-        with open(fname[0],'w') as outf:
-            outf.write('\n'.join(self._collection.flags))
-            outf.write('\n')
+        write_flag_file(fname[0], self._collection.flags)
 
     def _export_dataset(self):
+        if not self._collection:
+            return
+        if self._exporter.isRunning():
+            self.statusBar().showMessage("An export is already running")
+            return
         dialog = SaveDialog()
         if dialog.exec_() == dialog.Accepted:
-            # need to keep a reference
-            self.exporter = CollectionExporter() 
-            self.exporter.export(self._collection,dialog.result)
+            self._exporter.export(self._collection,dialog.result)
+            self.jobProgress.setValue(0)
+            self.jobProgress.show()
+            self.cancelJobs.show()
+
+    def _export_progress(self,stage,done,total):
+        self.statusBar().showMessage(stage)
+        self.jobProgress.setMaximum(total)
+        self.jobProgress.setValue(done)
+
+    def _export_done(self,path):
+        self.statusBar().showMessage("Exported to {}".format(path))
+
+    def _export_cancelled(self):
+        self.statusBar().showMessage("Export cancelled")
+
+    def _export_failed(self,message):
+        self.statusBar().showMessage("Export failed: {}".format(message))
+
+    def _export_ended(self):
+        if not self._jobs.busy:
+            self.jobProgress.hide()
+            self.cancelJobs.hide()
 
     def _restore_dataset(self):
         """ Undo any operators applied to the current dataset """
         # keep track of flags
-        flags = self._collection.flags
+        flags = list(self._collection.flags)
         # restore the original spectra
         if self._directory is not None:
             self._open_dataset(self._directory)
         # restore flags
-        for flag in flags:
-            self._collection.flag(flag)
+        self._collection.flag(flags)
+        self._list.set_flags(self._collection.flags)
         self.canvas.add_flagged(flags)
         # restore groups
 
@@ -351,6 +420,7 @@ class SpecDALViewer(QtWidgets.QMainWindow, qt_viewer_ui.Ui_MainWindow):
 
     def _set_collection(self,collection):
         self._collection = collection
+        self._jobs.set_collection(collection)
         self._update_plot()
         self._update_list()
 
@@ -363,10 +433,15 @@ class SpecDALViewer(QtWidgets.QMainWindow, qt_viewer_ui.Ui_MainWindow):
     def _update_plot(self):
         self.canvas.update_artists(self._collection)
 
+    @property
+    def _names(self):
+        return self._list.names
+
     def _update_list(self):
-        self.spectraList.clear()
-        for s in self._collection.spectra:
-            self.spectraList.addItem(s.name)
+        self._list.set_collection(self._collection)
+        with block_signal(self.groupBox):
+            self.groupBox.clear()
+            self.groupBox.addItem('--')
 
     def _curveclicked(self,curve):
         if curve.highlighted:
@@ -396,102 +471,102 @@ class SpecDALViewer(QtWidgets.QMainWindow, qt_viewer_ui.Ui_MainWindow):
         self.canvas.selected.connect(self.updateFromBox)
 
     @property
-    def selection_items(self):
-        return self.spectraList.selectedItems()
+    def selected_rows(self):
+        """Sorted rows of the selected spectra in the list"""
+        rows = [index.row() for index in
+                self.spectraList.selectionModel().selectedIndexes()]
+        return np.array(sorted(rows), dtype=int)
 
     @property
     def selection_text(self):
-        return (item.text().split('(')[0].strip() 
-                for item in self.selection_items)
+        names = self._names.names
+        return [names[row] for row in self.selected_rows]
+
+    def _selected_mask(self):
+        mask = np.zeros(len(self._names), dtype=bool)
+        mask[self.selected_rows] = True
+        return mask
+
+    def _select_rows(self,mask):
+        """Select the rows of the list in mask, in one selection change"""
+        model = self.spectraList.model()
+        selection = QtCore.QItemSelection()
+        for start,stop in runs(mask):
+            selection.select(model.index(start,0),model.index(stop - 1,0))
+        # clearing first is much faster than ClearAndSelect, which
+        # computes the difference between two scattered selections
+        with block_signal(self.spectraList.selectionModel()):
+            self.spectraList.selectionModel().clearSelection()
+            self.spectraList.selectionModel().select(selection,
+                    QtCore.QItemSelectionModel.Select)
 
     def updateFromBox(self,event):
-        if not self._collection:
+        if not self._collection or self.canvas.artist is None:
             return
-        x0,x1,y0,y1 = event
-        try:
-            #if our data is sorted, we can easily isolate it
-            x_data = self._collection.data.loc[x0:x1]
-        except:
-            #if pandas builtin throws an error, use another pandas builtin
-            data = self._collection.data
-            in_xrange = (data.index >= x0) & (data.index <= x1)
-            x_data = data.iloc[in_xrange]
-
-        ylim = y0,y1
-        is_in_box = ((x_data > y0) & (x_data < y1)).any()
-        
-        highlighted = is_in_box.index[is_in_box].tolist()
-        key_list = list(self._collection._spectra.keys())
-
-        #self.canvas.update_selected(highlighted)
-        flags = set(self._collection.flags)
-        with block_signal(self.spectraList):
-            old_selection = self.selection_text
-            # don't clear selection if Ctrl is pressed
-            if (QtWidgets.QApplication.keyboardModifiers() 
-                  != QtCore.Qt.ControlModifier and 
-                QtWidgets.QApplication.keyboardModifiers() 
-                  != QtCore.Qt.ShiftModifier):
-                self.spectraList.clearSelection()
-            for highlight in highlighted:
-                if self.show_flagged or not (highlight in flags):
-                    pos = key_list.index(highlight)
-                    if self.show_unselected or highlight in old_selection:
-                        self.spectraList.item(pos).setSelected(True)
+        artist = self.canvas.artist
+        highlighted = artist.lod.in_box(*event)
+        old_selection = self._selected_mask()
+        if not self.show_flagged:
+            highlighted &= ~artist.flagged
+        if not self.show_unselected:
+            highlighted &= old_selection
+        # don't clear selection if Ctrl is pressed
+        if (QtWidgets.QApplication.keyboardModifiers() 
+              == QtCore.Qt.ControlModifier or 
+            QtWidgets.QApplication.keyboardModifiers() 
+              == QtCore.Qt.ShiftModifier):
+            highlighted |= old_selection
+        self._select_rows(highlighted)
         self.updateFromList()
 
     def updateFromGroup(self,text):
-        text = "({})".format(text)
-        print(text)
-        with block_signal(self.spectraList):
-            for i in range(self.spectraList.count()):
-                if text in self.spectraList.item(i).text():
-                    self.spectraList.item(i).setSelected(True)
-                else:
-                    self.spectraList.item(i).setSelected(False)
-        self.updateFromList(False)
+        if not self._collection:
+            return
+        mask = self._names.in_group(text)
+        self._select_rows(mask)
+        self.canvas.select_rows(mask)
         
     def updateFromRegex(self):
-        regex = self.nameSelection.text()
-        with block_signal(self.spectraList):
-            for i in range(self.spectraList.count()):
-                if re.search(regex,self.spectraList.item(i).text()):
-                    self.spectraList.item(i).setSelected(True)
-                else:
-                    self.spectraList.item(i).setSelected(False)
+        if not self._collection:
+            return
+        try:
+            mask = self._names.search(self.nameSelection.text())
+        except re.error as e:
+            self.statusBar().showMessage("Invalid pattern: {}".format(e))
+            return
+        self._select_rows(mask)
         self.updateFromList()
 
         
     def updateGroupNames(self):
+        if not self._collection:
+            return
         group_name = self.groupName.text()
         if group_name:
-            formatter = '{{}} ({})'.format(group_name)
             if self.groupBox.findText(group_name) == -1:
                 self.groupBox.addItem(group_name)
-        else:
-            formatter = '{}'
-        for item,text in zip(self.selection_items,self.selection_text):
-            item.setText(formatter.format(text))
+        rows = self.selected_rows
+        self._names.set_group(rows,group_name or None)
+        self._list.rows_changed(rows)
 
     def updateFromList(self,undo_groups=True):
         if undo_groups:
             with block_signal(self.groupBox):
                 self.groupBox.setCurrentIndex(0)
-        self.canvas.update_selected(self.selection_text)
+        self.canvas.select_rows(self._selected_mask())
 
     def flagFromList(self):
-        for item in self.selection_items:
-            item.setForeground(QtCore.Qt.red)
-        for spectrum in self.selection_text:
-            self._collection.flag(spectrum)
+        if not self._collection:
+            return
+        self._collection.flag(self.selection_text)
+        self._list.rows_changed(self.selected_rows)
         self.canvas.add_flagged(self.selection_text)
 
     def unflagFromList(self):
-        for item in self.selection_items:
-            item.setForeground(QtCore.Qt.black)
-        for spectrum in self.selection_text:
-            if spectrum in self._collection.flags:
-                self._collection.unflag(spectrum)
+        if not self._collection:
+            return
+        self._collection.unflag(self.selection_text)
+        self._list.rows_changed(self.selected_rows)
         self.canvas.remove_flagged(self.selection_text)
 
     def toggleSelectedVisibility(self,state):
@@ -15,10 +15,14 @@ from matplotlib.figure import Figure
 from matplotlib.patches import Rectangle
 sys.path.insert(0, os.path.abspath("../.."))
 from specdal.containers.spectrum import Spectrum
-from collections import Iterable
+from collections.abc import Iterable
 from specdal.containers.collection import Collection
-from datetime import datetime
+from specdal.containers.flags import write_flag_file
+from specdal.gui.lod import LevelOfDetail
+from specdal.gui.virtual_list import VirtualListbox
 
+# milliseconds without changes before the canvas is redrawn
+DRAW_DELAY = 50
 
 class ToolBar(NavigationToolbar2Tk):
     def __init__(self,canvas_,parent,ax):
@@ -227,6 +231,9 @@ class Viewer(tk.Frame):
         
         self.spectrum_mode = False
         self.show_flagged = True
+        self.artist_dict = {}
+        self._selected = set()
+        self._draw_job = None
         # data
         self.collection = collection
         self.head = 0
@@ -287,12 +294,14 @@ class Viewer(tk.Frame):
             #we're out of canvas bounds
             return
 
-        if self._rect is not None:
-            self._rect.remove()
-
-        self._rect = Rectangle((self._rect_start.xdata,self._rect_start.ydata),
-                dx,dy, color='k',ls='--',lw=1,fill=False)
-        self.ax.add_patch(self._rect)
+        if self._rect is None:
+            # animated: only drawn by blitting over the cached background
+            self._rect = Rectangle((self._rect_start.xdata,self._rect_start.ydata),
+                    dx,dy, color='k',ls='--',lw=1,fill=False,animated=True)
+            self.ax.add_patch(self._rect)
+        else:
+            self._rect.set_width(dx)
+            self._rect.set_height(dy)
         self.ax.draw_artist(self._rect)
 
     def rectangleEndEvent(self,event):
@@ -313,28 +322,16 @@ class Viewer(tk.Frame):
             x1 = max(self._rect_start.xdata,event.xdata)
             y0 = min(self._rect_start.ydata,event.ydata)
             y1 = max(self._rect_start.ydata,event.ydata)
-            try:
-                #if our data is sorted, we can easily isolate it
-                x_data = self.collection.data.loc[x0:x1]
-            except:
-                #Pandas builtin throws an error, use another pandas builtin
-                data = self.collection.data
-                in_xrange = (data.index >= x0) & (data.index <= x1)
-                x_data = data.iloc[in_xrange]
-
-            ylim = sorted([self._rect_start.ydata,event.ydata])
-            is_in_box = ((x_data > y0) & (x_data < y1)).any()
-            
-            highlighted = is_in_box.index[is_in_box].tolist()
-            key_list = list(self.collection._spectra.keys())
+            hits = self.lod.in_box(x0,x1,y0,y1)
+            highlighted = [self._lod_keys[i] for i in np.flatnonzero(hits)]
+            positions = self.list_positions()
 
             self.update_selected(highlighted)
             flags = self.collection.flags
-            for highlight in highlighted:
-                #O(n^2) woof
-                if (not (highlight in flags)) or self.show_flagged:
-                    pos = key_list.index(highlight)
-                    self.listbox.selection_set(pos)
+            self.listbox.select_rows(
+                [positions[highlight] for highlight in highlighted
+                 if ((not (highlight in flags)) or self.show_flagged) and
+                 highlight in positions])
 
     
     def setupMouseNavigation(self):
@@ -377,6 +374,7 @@ class Viewer(tk.Frame):
         self.canvas.mpl_connect('button_press_event',onMouseDown)
         self.canvas.mpl_connect('button_release_event',onMouseUp)
         self.canvas.mpl_connect('motion_notify_event',onMouseMove)
+        self.canvas.mpl_connect('resize_event',self.decimate)
 
         
 
@@ -415,12 +413,7 @@ class Viewer(tk.Frame):
 
 
     def move_selected_to_top(self):
-        selected = self.listbox.curselection()
-        keys = [self.collection.spectra[s].name for s in selected]
-        for s in selected[::-1]:
-            self.listbox.delete(s)
-        self.listbox.insert(0,*keys)
-        self.listbox.selection_set(0,len(keys))
+        self.listbox.move_to_top(self.listbox.curselection())
 
     def unselect_all(self):
         self.listbox.selection_clear(0,tk.END)
@@ -431,11 +424,7 @@ class Viewer(tk.Frame):
         self.update_selected()
 
     def invert_selection(self):
-        for i in range(self.listbox.size()):
-            if self.listbox.selection_includes(i):
-                self.listbox.selection_clear(i)
-            else:
-                self.listbox.selection_set(i)
+        self.listbox.select_mask(~self.listbox.selection_mask())
         self.update_selected()
 
     def change_color(self):
@@ -446,19 +435,17 @@ class Viewer(tk.Frame):
             self.color_pick.config(bg=self.color)
             #update our list of chosen colors
             selected = self.listbox.curselection()
-            selected_keys = [self.collection.spectra[s].name for s in selected]
+            selected_keys = [self.listbox.get(s) for s in selected]
 
             for key in selected_keys:
                 self.colors[key] = self.color
-            self.update()
+            self.restyle(selected_keys)
+            self.ask_for_draw()
 
     def select_by_name(self):
         pattern = self.name_filter.get()
-        for i in range(self.listbox.size()):
-            if pattern in self.listbox.get(i):
-                self.listbox.selection_set(i)
-            else:
-                self.listbox.selection_clear(i)
+        self.listbox.select_mask([pattern in name for name in
+                                  self.listbox.get(0, tk.END)])
         self.update_selected()
 
 
@@ -475,10 +462,9 @@ class Viewer(tk.Frame):
         self.sblabel = tk.Label(list_label,text="Showing: 0")
         self.sblabel.pack(side=tk.RIGHT)
 
-        self.scrollbar = tk.Scrollbar(self._sbframe)
-        self.listbox = tk.Listbox(self._sbframe, yscrollcommand=self.scrollbar.set,
-                                  selectmode=tk.EXTENDED, width=30)
-        self.scrollbar.config(command=self.listbox.yview)
+        # only the rows shown are in the Tk listbox, colored when shown
+        self.listbox = VirtualListbox(self._sbframe, color=self.list_color,
+                                      width=30)
 
         self.list_tools = tk.Frame(self._sbframe)
         tk.Button(self.list_tools, text="To Top", command = lambda:self.move_selected_to_top()
@@ -500,7 +486,6 @@ class Viewer(tk.Frame):
         self.color_field.pack(side=tk.TOP,anchor=tk.NW,fill=tk.X)
 
         self.list_tools.pack(side=tk.RIGHT,anchor=tk.NW)
-        self.scrollbar.pack(side=tk.RIGHT,anchor=tk.E, fill=tk.Y)
         self.listbox.pack(side=tk.RIGHT,anchor=tk.E, fill=tk.Y)
         self.listbox.bind('<<ListboxSelect>>', lambda x: 
                 self.set_head(self.listbox.curselection()))
@@ -598,21 +583,23 @@ class Viewer(tk.Frame):
             self.spectrum_mode = False
         else:
             self.spectrum_mode = True
-        self.update()
+        self.update_artists()
     def toggle_show_flagged(self):
         if self.show_flagged:
             self.show_flagged = False
         else:
             self.show_flagged = True
-        self.update()
+        self.restyle(list(self.collection.flags))
+        self.ask_for_draw()
     def unflag_all(self):
         #new flags -> new statistics
         self.reset_stats()
 
-        for spectrum in list(self.collection.flags):
-            self.collection.unflag(spectrum)
-        self.update()
-        self.update_list()
+        flagged = list(self.collection.flags)
+        self.collection.unflag(flagged)
+        self.listbox.rows_changed()
+        self.restyle(flagged)
+        self.ask_for_draw()
 
     def toggle_flag(self):
         #new flags -> new statistics
@@ -621,22 +608,17 @@ class Viewer(tk.Frame):
         selected = self.listbox.curselection()
         keys = [self.listbox.get(s) for s in selected]
         
-        for i,key in enumerate(keys):
-            print(i,key)
-            spectrum = key
-            if spectrum in self.collection.flags:
-                self.collection.unflag(spectrum)
-                self.listbox.itemconfigure(selected[i], foreground='black')
-            else:
-                self.collection.flag(spectrum)
-                self.listbox.itemconfigure(selected[i], foreground='red')
+        flags = self.collection.flags
+        flagged = [key in flags for key in keys]
+        self.collection.unflag([key for key,f in zip(keys,flagged) if f])
+        self.collection.flag([key for key,f in zip(keys,flagged) if not f])
+        self.listbox.rows_changed(selected)
         # update figure
-        self.update()
+        self.restyle(keys)
+        self.ask_for_draw()
     def save_flag(self):
         ''' save flag to self.flag_filepath'''
-        with open(self.flag_filepath, 'w') as f:
-            for spectrum in self.collection.flags:
-                print(spectrum, file=f)
+        write_flag_file(self.flag_filepath, self.collection.flags)
     def save_flag_as(self):
         ''' modify self.flag_filepath and call save_flag()'''
         flag_filepath = filedialog.asksaveasfilename()
@@ -646,20 +628,79 @@ class Viewer(tk.Frame):
         self.save_flag()
 
     def update_list(self):
-        self.listbox.delete(0, tk.END)
-        for i, spectrum in enumerate(self.collection.spectra):
-            self.listbox.insert(tk.END, spectrum.name)
-            if spectrum.name in self.collection.flags:
-                self.listbox.itemconfigure(i, foreground='red')
+        self.listbox.set_names([spectrum.name for spectrum in
+                                self.collection.spectra])
         self.update_selected()
+
+    def list_color(self, name):
+        """Color of a spectrum name in the listbox"""
+        if self.collection is not None and name in self.collection.flags:
+            return 'red'
+        return 'black'
     
     def ask_for_draw(self):
-        #debounce canvas updates
-        now = datetime.now()
-        print(now-self.last_draw)
-        if((now-self.last_draw).total_seconds() > 0.5):
-            self.canvas.draw()
-            self.last_draw = now
+        """
+        Redraw the canvas once changes stop coming in for DRAW_DELAY
+        milliseconds, so that bursts of changes are drawn once
+        """
+        if self._draw_job is not None:
+            self.after_cancel(self._draw_job)
+        self._draw_job = self.after(DRAW_DELAY, self._draw)
+
+    def _draw(self):
+        self._draw_job = None
+        self.canvas.draw()
+
+    def list_positions(self):
+        """Positions of the spectra in the listbox, by name"""
+        return {name:i for i,name in enumerate(self.listbox.get(0, tk.END))}
+
+    def restyle(self, keys):
+        """
+        Apply the flag, color and visibility of spectra keys to their
+        lines only, without redrawing
+        """
+        flags = self.collection.flags
+        for key in keys:
+            artist = self.artist_dict.get(key)
+            if artist is None:
+                continue
+            if key in flags:
+                artist.set_color('red')
+                artist.set_visible(self.show_flagged)
+            else:
+                artist.set_color(self.colors.get(key, 'black'))
+                artist.set_visible(True)
+        hidden = 0 if self.show_flagged else sum(
+                key in flags for key in self.artist_dict)
+        self.sblabel.config(text="Showing: {}".format(len(self.artist_dict) - hidden))
+
+    def setup_decimation(self, keys):
+        """
+        Precompute the levels of detail of the plotted spectra, named keys
+        """
+        self._lod_lines = list(self.ax.lines)
+        self._lod_keys = keys
+        self.artist_dict = {key:artist for key,artist in zip(keys,self._lod_lines)}
+        self._selected = set()
+        self.lod = LevelOfDetail(
+            [np.asarray(line.get_xdata(), dtype=float) for line in self._lod_lines],
+            [np.asarray(line.get_ydata(), dtype=float) for line in self._lod_lines])
+        self._lod_view = self.lod.view()
+        # clearing the axes drops this callback
+        self.ax.callbacks.connect('xlim_changed', self.decimate)
+        self.decimate()
+
+    def decimate(self, *args):
+        """Draw the spectra at the level of detail of the current view"""
+        if getattr(self, 'lod', None) is None:
+            return
+        view = self.lod.view(self.ax.get_xlim(), self.ax.bbox.width)
+        if view == self._lod_view:
+            return
+        self._lod_view = view
+        for line, vertices in zip(self._lod_lines, self.lod.segments(None, view)):
+            line.set_data(vertices[:, 0], vertices[:, 1])
 
     def update_artists(self,new_lim=False):
         if self.collection is None:
@@ -681,57 +722,43 @@ class Viewer(tk.Frame):
             idx = self.listbox.curselection()
             if len(idx) == 0:
                 idx = [self.head]
-            spectra = [self.collection.spectra[i] for i in idx]
-            flags = [s.name in self.collection.flags for s in spectra]
-            print("flags = ", flags)
-            flag_style = ' '
-            if self.show_flagged:
-                flag_style = 'r'
-            artists = Collection(name='selection', spectra=spectra).plot(ax=self.ax,
-                         style=list(np.where(flags, flag_style, self.color)),
-                         picker=1)
+            spectra = [self.collection[self.listbox.get(i)] for i in idx]
+            Collection(name='selection', spectra=spectra).plot(ax=self.ax,
+                         color='k', legend=False, picker=1)
             self.ax.set_title('selection')            
             # c = str(np.where(spectrum.name in self.collection.flags, 'r', 'k'))
             # spectrum.plot(ax=self.ax, label=spectrum.name, c=c)
         else:
-            # red curves for flagged spectra
-            flag_style = ' '
-            if self.show_flagged:
-                flag_style = 'r'
-            flags = [s.name in self.collection.flags for s in self.collection.spectra]
-            print("flags = ", flags)
-            self.collection.plot(ax=self.ax,
-                                 style=list(np.where(flags, flag_style, 'k')),
-                                 picker=1)
+            spectra = self.collection.spectra
+            self.collection.plot(ax=self.ax, color='k', legend=False, picker=1)
             #self.ax.set_title(self.collection.name)
 
-        keys = [s.name for s in self.collection.spectra]
-        artists = self.ax.lines
-        self.artist_dict = {key:artist for key,artist in zip(keys,artists)}
-        self.colors = {key:'black' for key in keys}
-        self.ax.legend().remove()
+        keys = [s.name for s in spectra]
+        self.setup_decimation(keys)
+        # every spectrum, since update() plots other ones in spectrum mode
+        self.colors = {s.name:'black' for s in self.collection.spectra}
+        # red curves for flagged spectra
+        self.restyle(keys)
         self.navbar.setHome(self.ax.get_xlim(),self.ax.get_ylim())
         self.canvas.draw()
-        self.sblabel.config(text="Showing: {}".format(len(artists)))
 
     def update_selected(self,to_add=None):
-        """ Update, only on flaged"""
+        """ Update the line style of the spectra whose selection changed """
         if self.collection is None:
             return
 
         if to_add:
-            for key in to_add:
-                self.artist_dict[key].set_linestyle('--')
+            selected = self._selected | set(to_add)
         else:
-            keys = [s.name for s in self.collection.spectra]
-            selected = self.listbox.curselection()
-            selected_keys = [self.collection.spectra[s].name for s in selected]
-            for key in keys:
-                if key in selected_keys:
-                    self.artist_dict[key].set_linestyle('--')
-                else:
-                    self.artist_dict[key].set_linestyle('-')
-        self.canvas.draw()
+            selected = set(self.listbox.get(s) for s in self.listbox.curselection())
+        changed = selected ^ self._selected
+        for key in changed:
+            artist = self.artist_dict.get(key)
+            if artist is not None:
+                artist.set_linestyle('--' if key in selected else '-')
+        self._selected = selected
+        if changed:
+            self.ask_for_draw()
 
 
     def update(self):
@@ -744,45 +771,19 @@ class Viewer(tk.Frame):
             idx = self.listbox.curselection()
             if len(idx) == 0:
                 idx = [self.head]
-            spectra = [self.collection.spectra[i] for i in idx]
-            flags = [s.name in self.collection.flags for s in spectra]
-            print("flags = ", flags)
-            flag_style = ' '
-            if self.show_flagged:
-                flag_style = 'r'
+            spectra = [self.collection[self.listbox.get(i)] for i in idx]
             Collection(name='selection',
-                       spectra=spectra).plot(ax=self.ax,
-                                             style=list(np.where(flags, flag_style, 'k')),
-                                             picker=1)
+                       spectra=spectra).plot(ax=self.ax, color='k',
+                                             legend=False, picker=1)
+            keys = [s.name for s in spectra]
+            self.setup_decimation(keys)
+            self.restyle(keys)
             self.ax.set_title('selection')            
             # c = str(np.where(spectrum.name in self.collection.flags, 'r', 'k'))
             # spectrum.plot(ax=self.ax, label=spectrum.name, c=c)
         else:
             # red curves for flagged spectra
-
-            keys = [s.name for s in self.collection.spectra]
-            for key in keys:
-                if key in self.collection.flags:
-                    if self.show_flagged:
-                        self.artist_dict[key].set_visible(True)
-                        self.artist_dict[key].set_color('red')
-                    else:
-                        self.artist_dict[key].set_visible(False)
-                else:
-                    self.artist_dict[key].set_color(self.colors[key])
-                    self.artist_dict[key].set_visible(True)
-
-            if self.show_flagged:
-                self.sblabel.config(text="Showing: {}".format(len(self.artist_dict)))
-            else:
-                self.sblabel.config(text="Showing: {}".format(
-                    len(self.artist_dict)-len(self.collection.flags)))
-            '''
-            self.collection.plot(ax=self.ax,
-                                 style=list(np.where(flags, flag_style, 'k')),
-                                 picker=1)
-            self.ax.set_title(self.collection.name)
-            '''
+            self.restyle(list(self.artist_dict))
             
         if self.spectrum_mode:
             #self.ax.legend()
@@ -797,7 +798,7 @@ class Viewer(tk.Frame):
         if self.max_line != None: self.max_line.set_visible(self.max)
         if self.min_line != None: self.min_line.set_visible(self.min)
         if self.std_line != None: self.std_line.set_visible(self.std)
-        self.canvas.draw()
+        self.ask_for_draw()
 
     def next_spectrum(self):
         if not self.spectrum_mode:
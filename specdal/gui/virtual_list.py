@@ -0,0 +1,231 @@
+# virtual_list.py shows a long list of names in a Tk Listbox holding only
+# the rows that fit in it. ListWindow keeps the names, the selection as a
+# boolean array and the scroll position; VirtualListbox renders the
+# visible window of it, reading the color of each row on demand, and
+# offers the part of the tk.Listbox interface used by the viewer.
+import tkinter as tk
+from tkinter import font as tkfont
+import numpy as np
+
+class ListWindow(object):
+    """
+    Names, selection and scroll position of a virtual list
+
+    Attributes
+    ----------
+    names: list of strings
+        rows in display order
+
+    selected: numpy boolean array
+        selection of each row
+
+    top: int
+        first row shown
+
+    visible: int
+        number of rows shown
+    """
+    def __init__(self, names=(), visible=10):
+        self.visible = visible
+        self.set_names(names)
+
+    def set_names(self, names):
+        self.names = list(names)
+        self.selected = np.zeros(len(self.names), dtype=bool)
+        self.top = 0
+        self.anchor = None
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def window(self):
+        """Range of the rows shown"""
+        return range(self.top, min(self.top + self.visible, len(self.names)))
+
+    def scroll_to(self, top):
+        self.top = int(max(0, min(top, len(self.names) - self.visible)))
+
+    def see(self, row):
+        """Scroll the least so that row is shown"""
+        if row < self.top:
+            self.scroll_to(row)
+        elif row >= self.top + self.visible:
+            self.scroll_to(row - self.visible + 1)
+
+    def fractions(self):
+        """First and last fraction of the list shown, for a Scrollbar"""
+        n = len(self.names)
+        if n <= self.visible:
+            return 0., 1.
+        return self.top/n, (self.top + self.visible)/n
+
+    def yview(self, *args):
+        """Scroll as asked by the command of a Scrollbar"""
+        if args[0] == 'moveto':
+            self.scroll_to(round(float(args[1])*len(self.names)))
+        elif args[0] == 'scroll':
+            step = self.visible if args[2] == 'pages' else 1
+            self.scroll_to(self.top + int(args[1])*step)
+
+    def click(self, row, shift=False, control=False):
+        """Update the selection for a click on row, as a tk.EXTENDED Listbox"""
+        if shift and self.anchor is not None:
+            low, high = sorted((self.anchor, row))
+            if not control:
+                self.selected[:] = False
+            self.selected[low:high + 1] = True
+        elif control:
+            self.selected[row] = not self.selected[row]
+            self.anchor = row
+        else:
+            self.selected[:] = False
+            self.selected[row] = True
+            self.anchor = row
+
+    def move_to_top(self, rows):
+        """Move rows to the top of the list, keeping them selected"""
+        rows = np.asarray(rows, dtype=int)
+        rest = np.ones(len(self.names), dtype=bool)
+        rest[rows] = False
+        order = np.concatenate((rows, np.flatnonzero(rest)))
+        self.names = [self.names[i] for i in order]
+        self.selected = self.selected[order]
+        self.anchor = None
+
+class VirtualListbox(tk.Frame):
+    """
+    A Listbox with a scrollbar holding only the rows it shows
+
+    Parameters
+    ----------
+    master: tk widget
+
+    color: callable
+        color of the text of a row, given its name; called for the rows
+        shown only
+
+    Notes
+    -----
+    Generates <<ListboxSelect>> when the selection changes by mouse. Row
+    numbers are positions in the whole list; tk.END may be used as last.
+    """
+    def __init__(self, master, color=None, width=30, **kwargs):
+        tk.Frame.__init__(self, master, **kwargs)
+        self.color = color
+        self.rows = ListWindow()
+        self.scrollbar = tk.Scrollbar(self, command=self._yview)
+        self.listbox = tk.Listbox(self, width=width, selectmode=tk.EXTENDED,
+                                  exportselection=False,
+                                  yscrollcommand=None)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox.pack(side=tk.RIGHT, fill=tk.Y)
+        self._linespace = tkfont.nametofont(self.listbox.cget('font')) \
+            .metrics('linespace') + 1
+        # replace the bindings of the Listbox class, which act on the
+        # rows inserted only
+        self.listbox.bindtags((self.listbox, self, '.', 'all'))
+        self.listbox.bind('<Button-1>', lambda e: self._click(e))
+        self.listbox.bind('<Shift-Button-1>', lambda e: self._click(e, shift=True))
+        self.listbox.bind('<Control-Button-1>', lambda e: self._click(e, control=True))
+        self.listbox.bind('<B1-Motion>', lambda e: self._click(e, shift=True))
+        self.listbox.bind('<MouseWheel>',
+                          lambda e: self._yview('scroll', -e.delta//120, 'units'))
+        self.listbox.bind('<Button-4>', lambda e: self._yview('scroll', -1, 'units'))
+        self.listbox.bind('<Button-5>', lambda e: self._yview('scroll', 1, 'units'))
+        self.listbox.bind('<Configure>', lambda e: self._resize(e.height))
+
+    def set_names(self, names):
+        """Show names, clearing the selection"""
+        self.rows.set_names(names)
+        self.refresh()
+
+    def refresh(self):
+        """Render the rows shown"""
+        window = self.rows.window
+        self.listbox.delete(0, tk.END)
+        if len(window) > 0:
+            self.listbox.insert(tk.END, *self.rows.names[window.start:window.stop])
+        for i, row in enumerate(window):
+            if self.color is not None:
+                self.listbox.itemconfigure(i, foreground=self.color(self.rows.names[row]))
+            if self.rows.selected[row]:
+                self.listbox.selection_set(i)
+        self.scrollbar.set(*self.rows.fractions())
+
+    def rows_changed(self, rows=None):
+        """Render again rows, or every row shown, if they are shown"""
+        window = self.rows.window
+        if rows is None or any(row in window for row in rows):
+            self.refresh()
+
+    def _resize(self, height):
+        visible = max(1, height//self._linespace)
+        if visible != self.rows.visible:
+            self.rows.visible = visible
+            self.rows.scroll_to(self.rows.top)
+            self.refresh()
+
+    def _yview(self, *args):
+        self.rows.yview(*args)
+        self.refresh()
+
+    def _click(self, event, shift=False, control=False):
+        if len(self.rows) == 0:
+            return 'break'
+        row = min(self.rows.top + self.listbox.nearest(event.y), len(self.rows) - 1)
+        self.rows.click(row, shift, control)
+        self.rows.see(row)
+        self.refresh()
+        self.event_generate('<<ListboxSelect>>')
+        return 'break'
+
+    def _rows(self, first, last=None):
+        last = first if last is None else last
+        if last == tk.END:
+            last = len(self.rows) - 1
+        if first == tk.END:
+            first = len(self.rows) - 1
+        return slice(int(first), int(last) + 1)
+
+    # tk.Listbox interface
+    def size(self):
+        return len(self.rows)
+
+    def get(self, first, last=None):
+        if last is None:
+            return self.rows.names[first]
+        return tuple(self.rows.names[self._rows(first, last)])
+
+    def curselection(self):
+        return tuple(int(i) for i in np.flatnonzero(self.rows.selected))
+
+    def selection_includes(self, row):
+        return bool(self.rows.selected[row])
+
+    def selection_set(self, first, last=None):
+        self.rows.selected[self._rows(first, last)] = True
+        self.refresh()
+
+    def selection_clear(self, first, last=None):
+        self.rows.selected[self._rows(first, last)] = False
+        self.refresh()
+
+    def selection_mask(self):
+        """Return the selection of every row as a boolean array"""
+        return self.rows.selected.copy()
+
+    def select_mask(self, mask):
+        """Set the selection of every row from a boolean array"""
+        self.rows.selected[:] = mask
+        self.refresh()
+
+    def select_rows(self, rows):
+        """Add rows (indices or boolean array) to the selection"""
+        self.rows.selected[rows] = True
+        self.refresh()
+
+    def move_to_top(self, rows):
+        self.rows.move_to_top(rows)
+        self.rows.scroll_to(0)
+        self.refresh()
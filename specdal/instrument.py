@@ -0,0 +1,176 @@
+# instrument.py measures where the time of a run goes. Library code wraps
+# its stages in stage(name); while a Profiler is active, each stage records
+# wall time, cpu time, how much it raised the peak resident memory of the
+# process, and an item count.
+import sys
+import json
+import time
+from collections import OrderedDict
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+# active profilers, innermost last
+_profilers = []
+
+def _cpu_time():
+    """cpu time of this process and its terminated children"""
+    if resource is None:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+def _peak_rss():
+    """peak resident set size of this process in bytes, or None"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == 'darwin' else rss*1024
+
+class _NullStage(object):
+    """stage() result when no profiler is active"""
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+
+class _Stage(object):
+    def __init__(self, name, items):
+        self.name = name
+        self.items = items
+    def __enter__(self):
+        self._wall = time.perf_counter()
+        self._cpu = _cpu_time()
+        self._rss = _peak_rss()
+        return self
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self._wall
+        cpu = _cpu_time() - self._cpu
+        # the peak is a high-water mark of the whole process, so a stage
+        # is charged with what it added to it only
+        rss = _peak_rss()
+        growth = None if rss is None else rss - self._rss
+        for profiler in _profilers:
+            profiler.record(self.name, wall, cpu, growth, self.items)
+        return False
+
+def stage(name, items=None):
+    """
+    Context manager measuring a stage for the active profilers
+
+    Parameters
+    ----------
+    name: string
+        stages with the same name are summed (e.g. one per file read)
+
+    items: int
+        number of items processed; it can also be set on the returned
+        object inside the block when only known at the end
+
+    Examples
+    --------
+    >>> with stage('Collection.stitch', items=len(spectra)):
+    ...     stitch(spectra)
+    """
+    if not _profilers:
+        return _NullStage()
+    return _Stage(name, items)
+
+class Profiler(object):
+    """
+    Collect the stages run while the profiler is active
+
+    Examples
+    --------
+    >>> with Profiler() as profiler:
+    ...     c = Collection(name='c', directory='~/data')
+    ...     c.interpolate()
+    >>> print(profiler.summary())
+    >>> profiler.to_json('profile.json')
+    """
+    def __init__(self):
+        self.stats = OrderedDict()
+        self._start = None
+        self.wall = None
+
+    def start(self):
+        """Start collecting stages"""
+        self._start = time.perf_counter()
+        _profilers.append(self)
+        return self
+
+    def stop(self):
+        """Stop collecting stages"""
+        _profilers.remove(self)
+        self.wall = time.perf_counter() - self._start
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def record(self, name, wall, cpu, peak_rss_growth=None, items=None):
+        """
+        Add one run of stage name; peak_rss_growth is how many bytes the
+        run added to the peak resident memory of the process
+        """
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = self.stats[name] = {'calls': 0, 'wall': 0., 'cpu': 0.,
+                                       'peak_rss_growth': None, 'items': None}
+        stat['calls'] += 1
+        stat['wall'] += wall
+        stat['cpu'] += cpu
+        if peak_rss_growth is not None:
+            stat['peak_rss_growth'] = (stat['peak_rss_growth'] or 0) + peak_rss_growth
+        if items is not None:
+            stat['items'] = (stat['items'] or 0) + items
+
+    def to_dict(self):
+        wall = self.wall
+        if wall is None and self._start is not None:
+            wall = time.perf_counter() - self._start
+        return {'wall': wall, 'peak_rss': _peak_rss(),
+                'stages': [dict(stage=name, **stat)
+                           for name, stat in self.stats.items()]}
+
+    def to_json(self, path):
+        """Write the stage statistics to path as json"""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def summary(self):
+        """
+        Return a table of the stages in the order they first ran.
+        Nested stages (e.g. the reads of Collection.read) are counted
+        in their parent too. The peak rss growth of a stage is what its
+        runs added to the peak memory of the process; stages running
+        below an earlier peak show 0.
+        """
+        rows = [('stage', 'calls', 'items', 'wall (s)', 'cpu (s)',
+                 'items/s', 'peak rss growth (MB)')]
+        for name, stat in self.stats.items():
+            items = stat['items']
+            rate = ''
+            if items and stat['wall'] > 0:
+                rate = '{:.1f}'.format(items/stat['wall'])
+            rows.append((name, str(stat['calls']),
+                         '' if items is None else str(items),
+                         '{:.3f}'.format(stat['wall']),
+                         '{:.3f}'.format(stat['cpu']), rate,
+                         '' if stat['peak_rss_growth'] is None else
+                         '{:.1f}'.format(stat['peak_rss_growth']/2**20)))
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        lines = []
+        for row in rows:
+            lines.append('  '.join([row[0].ljust(widths[0])] +
+                                   [cell.rjust(width) for cell, width
+                                    in zip(row[1:], widths[1:])]))
+        lines.insert(1, '-'*len(lines[0]))
+        return '\n'.join(lines)
@@ -1,11 +1,11 @@
-from os.path import dirname, basename, isfile 
-import glob
-modules = glob.glob(dirname(__file__)+"/*.py")
-__all__ = [ basename(f)[:-3] for f in modules if isfile(f) and not f.endswith('__init__.py')]
+__all__ = ['derivative', 'interpolate', 'jump_correct', 'proximal_join',
+           'resample_bands', 'smooth', 'stitch']
 
 from .proximal_join import proximal_join, get_column_types
 from .interpolate import interpolate
 from .stitch import stitch
 from .jump_correct import jump_correct
 from .derivative import derivative
+from .smooth import smooth, smoothing_kernel
+from .resample_bands import resample_bands, band_matrix, read_bands, SENSORS
 
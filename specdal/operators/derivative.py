@@ -2,9 +2,53 @@ import pandas as pd
 import numpy as np
 ################################################################################
 # derivative: calculate derivative of a spectrum
-def derivative(series):
+def derivative(series, order=1, method='gradient', window=11, polyorder=2):
     '''
-    Calculate the spectral derivative. Not Implemented Yet.
-    '''
-    pass
+    Calculate the spectral derivative
+
+    Parameters
+    ----------
+    series: pandas.Series or pandas.DataFrame
+        measurement with wavelength as index. The columns of a DataFrame
+        (e.g. Collection.data) are differentiated together in one call.
+
+    order: int
+        1 for the first derivative, 2 for the second, ...
+
+    method: string
+        "gradient" for central finite differences, which allow uneven
+        wavelength spacing, or "savgol" for a Savitzky-Golay filter,
+        which smooths the noise amplified by differentiation and needs
+        evenly spaced wavelengths (see interpolate)
 
+    window: int
+        odd number of bands in the Savitzky-Golay window
+
+    polyorder: int
+        order of the Savitzky-Golay polynomial, at least order
+
+    Returns
+    -------
+    object of the type of series holding the derivative per nm
+    '''
+    wavelengths = np.asarray(series.index, dtype=float)
+    if not (np.diff(wavelengths) > 0).all():
+        raise ValueError("Derivative requires increasing wavelengths. "
+                         "Try after stitching the overlaps.")
+    values = series.values
+    if method == 'gradient':
+        for _ in range(order):
+            values = np.gradient(values, wavelengths, axis=0)
+    elif method == 'savgol':
+        from scipy.signal import savgol_filter
+        spacing = np.diff(wavelengths)
+        if not np.allclose(spacing, spacing[0]):
+            raise ValueError("Savitzky-Golay derivative requires evenly "
+                             "spaced wavelengths. Try interpolating.")
+        values = savgol_filter(values, window, polyorder, deriv=order,
+                               delta=spacing[0], axis=0)
+    else:
+        raise ValueError("Unknown derivative method {}".format(method))
+    if isinstance(series, pd.DataFrame):
+        return pd.DataFrame(values, index=series.index, columns=series.columns)
+    return pd.Series(values, index=series.index, name=series.name)
@@ -0,0 +1,163 @@
+import hashlib
+import pandas as pd
+import numpy as np
+from collections import OrderedDict
+################################################################################
+# resample_bands: convolve spectra to the bands of a sensor
+
+# gaussian approximations of multispectral sensors, as (band centers,
+# full widths at half maximum) in nm
+SENSORS = {
+    'landsat8': ([443., 482., 561.5, 654.5, 865., 1373.5, 1608.5, 2200.5],
+                 [16., 60., 57., 37., 28., 20., 85., 187.]),
+    'sentinel2a': ([442.7, 492.4, 559.8, 664.6, 704.1, 740.5, 782.8, 832.8,
+                    864.7, 945.1, 1373.5, 1613.7, 2202.4],
+                   [21., 66., 36., 31., 15., 15., 20., 106., 21., 20., 31.,
+                    91., 175.]),
+}
+
+# gaussian responses are cut at this many standard deviations
+TRUNCATE = 3.
+
+# weight matrices by (source wavelengths, bands), most recent last
+_matrices = OrderedDict()
+_MAX_MATRICES = 32
+
+def _digest(*arrays):
+    h = hashlib.sha1()
+    for array in arrays:
+        h.update(np.ascontiguousarray(array, dtype=float).tobytes())
+        h.update(b'|')
+    return h.hexdigest()
+
+def band_matrix(wavelengths, centers=None, fwhm=None, srf=None):
+    '''
+    Return the (bands x wavelengths) sparse matrix of weights convolving
+    spectra measured at wavelengths to a set of bands, and the band
+    centers. Matrices are kept for reuse per (wavelengths, bands).
+
+    Parameters
+    ----------
+    wavelengths: array
+        increasing source wavelengths
+
+    centers, fwhm: arrays
+        centers and full widths at half maximum of gaussian bands, in nm
+
+    srf: pandas.DataFrame
+        tabulated spectral response functions, with wavelength as index
+        and one column per band; used instead of centers and fwhm
+
+    Returns
+    -------
+    (scipy.sparse.csr_matrix, numpy.ndarray of band centers)
+
+    Notes
+    -----
+    Each row holds the band response at the source wavelengths times the
+    width of the source bands, normalized to sum to 1. Bands outside the
+    source wavelengths have an empty row.
+    '''
+    from scipy import sparse
+    wavelengths = np.asarray(wavelengths, dtype=float)
+    if srf is not None:
+        key = ('srf', _digest(wavelengths, srf.index.values, srf.values))
+    else:
+        key = ('gaussian', _digest(wavelengths, centers, fwhm))
+    if key in _matrices:
+        _matrices.move_to_end(key)
+        return _matrices[key]
+    if not (np.diff(wavelengths) > 0).all():
+        raise ValueError("Band resampling requires increasing wavelengths. "
+                         "Try after stitching the overlaps.")
+    # width of each source band, for uneven spacing
+    widths = np.gradient(wavelengths) if len(wavelengths) > 1 else np.ones(1)
+    rows, cols, weights = [], [], []
+    if srf is not None:
+        srf_wavelengths = np.asarray(srf.index, dtype=float)
+        responses = [np.interp(wavelengths, srf_wavelengths,
+                               srf[band].values, left=0., right=0.)
+                     for band in srf.columns]
+        band_centers = np.array([(srf_wavelengths*srf[band].values).sum() /
+                                 srf[band].values.sum() for band in srf.columns])
+        for i, response in enumerate(responses):
+            j = np.flatnonzero(response)
+            rows.append(np.full(len(j), i))
+            cols.append(j)
+            weights.append(response[j]*widths[j])
+    else:
+        band_centers = np.asarray(centers, dtype=float)
+        sigmas = np.asarray(fwhm, dtype=float)/(2*np.sqrt(2*np.log(2)))
+        assert band_centers.shape == sigmas.shape
+        for i, (center, sigma) in enumerate(zip(band_centers, sigmas)):
+            start, stop = np.searchsorted(wavelengths,
+                                          [center - TRUNCATE*sigma,
+                                           center + TRUNCATE*sigma])
+            j = np.arange(start, stop)
+            rows.append(np.full(len(j), i))
+            cols.append(j)
+            weights.append(np.exp(-0.5*((wavelengths[j] - center)/sigma)**2) *
+                           widths[j])
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    weights = np.concatenate(weights)
+    totals = np.bincount(rows, weights, minlength=len(band_centers))
+    weights = weights/totals[rows]
+    matrix = sparse.csr_matrix((weights, (rows, cols)),
+                               shape=(len(band_centers), len(wavelengths)))
+    _matrices[key] = matrix, band_centers
+    while len(_matrices) > _MAX_MATRICES:
+        _matrices.popitem(last=False)
+    return matrix, band_centers
+
+def resample_bands(series, centers=None, fwhm=None, srf=None, sensor=None):
+    '''
+    Convolve the measurement to the bands of a sensor
+
+    Parameters
+    ----------
+    series: pandas.Series or pandas.DataFrame
+        measurement with increasing wavelengths as index. The columns of
+        a DataFrame (e.g. Collection.data) are resampled in one matrix
+        product.
+
+    centers, fwhm: arrays
+        centers and full widths at half maximum of gaussian bands, in nm
+
+    srf: pandas.DataFrame
+        tabulated spectral response functions (see band_matrix)
+
+    sensor: string
+        name of a band set in SENSORS, e.g. "sentinel2a"
+
+    Returns
+    -------
+    object of the type of series, indexed by the band centers. Bands
+    not covered by the measurement are NaN.
+    '''
+    if sensor is not None:
+        centers, fwhm = SENSORS[sensor]
+    assert srf is not None or (centers is not None and fwhm is not None)
+    matrix, band_centers = band_matrix(series.index, centers, fwhm, srf)
+    values = matrix.dot(series.values)
+    # rows without any weight
+    values[np.diff(matrix.indptr) == 0] = np.nan
+    index = pd.Index(band_centers, name=series.index.name)
+    if isinstance(series, pd.DataFrame):
+        return pd.DataFrame(values, index=index, columns=series.columns)
+    return pd.Series(values, index=index, name=series.name)
+
+def read_bands(path):
+    '''
+    Read a band set from a csv file, as keyword arguments of
+    resample_bands
+
+    The file either has "center" and "fwhm" columns, one row per band,
+    or tabulated responses with the wavelength in the first column and
+    one column per band.
+    '''
+    df = pd.read_csv(path)
+    columns = [str(c).strip().lower() for c in df.columns]
+    if 'center' in columns and 'fwhm' in columns:
+        return {'centers': df.iloc[:, columns.index('center')].values,
+                'fwhm': df.iloc[:, columns.index('fwhm')].values}
+    return {'srf': df.set_index(df.columns[0])}
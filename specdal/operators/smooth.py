@@ -0,0 +1,97 @@
+import pandas as pd
+import numpy as np
+from functools import lru_cache
+################################################################################
+# smooth: reduce noise by convolution along the wavelength axis
+@lru_cache(maxsize=64)
+def smoothing_kernel(method, window, spacing, polyorder=2, sigma=None):
+    '''
+    Return the convolution kernel of a smoothing method for wavelengths
+    evenly spaced by spacing. Kernels are computed once per set of
+    arguments.
+
+    Parameters
+    ----------
+    method: string
+        "savgol", "mean" or "gaussian"
+
+    window: float
+        width of the kernel in nm, rounded to an odd number of bands
+
+    spacing: float
+        wavelength spacing in nm
+
+    polyorder: int
+        order of the Savitzky-Golay polynomial
+
+    sigma: float
+        standard deviation of the gaussian in nm; window/6 by default, so
+        that the window spans 3 standard deviations on either side
+
+    Returns
+    -------
+    read-only numpy.ndarray
+    '''
+    bands = max(1, int(round(window/spacing)))
+    if bands % 2 == 0:
+        bands += 1
+    if method == 'savgol':
+        from scipy.signal import savgol_coeffs
+        kernel = savgol_coeffs(bands, min(polyorder, bands - 1))
+    elif method == 'mean':
+        kernel = np.full(bands, 1./bands)
+    elif method == 'gaussian':
+        if sigma is None:
+            sigma = window/6.
+        x = (np.arange(bands) - bands//2)*spacing
+        kernel = np.exp(-0.5*(x/sigma)**2)
+        kernel /= kernel.sum()
+    else:
+        raise ValueError("Unknown smoothing method {}".format(method))
+    kernel.setflags(write=False)
+    return kernel
+
+def smooth(series, method='savgol', window=10, polyorder=2, sigma=None):
+    '''
+    Smooth the measurement along the wavelength axis
+
+    Parameters
+    ----------
+    series: pandas.Series or pandas.DataFrame
+        measurement with evenly spaced wavelengths as index (see
+        interpolate). The columns of a DataFrame (e.g. Collection.data)
+        are smoothed together in one convolution.
+
+    method: string
+        "savgol" (Savitzky-Golay), "mean" (moving average) or "gaussian"
+
+    window: float
+        width of the smoothing window in nm
+
+    polyorder: int
+        order of the Savitzky-Golay polynomial
+
+    sigma: float
+        standard deviation of the gaussian in nm
+
+    Returns
+    -------
+    object of the type of series
+
+    Notes
+    -----
+    Values beyond the ends of the spectrum are taken equal to the
+    first and last values.
+    '''
+    from scipy.ndimage import convolve1d
+    spacing = np.diff(np.asarray(series.index, dtype=float))
+    if len(spacing) == 0 or not (spacing[0] > 0 and
+                                 np.allclose(spacing, spacing[0])):
+        raise ValueError("Smoothing requires evenly spaced, increasing "
+                         "wavelengths. Try interpolating.")
+    kernel = smoothing_kernel(method, window, float(spacing[0]), polyorder,
+                              sigma)
+    values = convolve1d(series.values, kernel, axis=0, mode='nearest')
+    if isinstance(series, pd.DataFrame):
+        return pd.DataFrame(values, index=series.index, columns=series.columns)
+    return pd.Series(values, index=series.index, name=series.name)
@@ -0,0 +1,172 @@
+# parallel.py runs per-spectrum operators on a process pool. Measurements
+# are shipped to the workers as numpy blocks (one wavelength axis and a 2-D
+# array of values per run of spectra sharing their wavelengths) instead of
+# pickled pandas objects, and the results come back in order.
+import os
+import atexit
+import logging
+import multiprocessing
+import numpy as np
+import pandas as pd
+
+# default number of processes used by Collection.stitch, interpolate and
+# jump_correct; 1 runs them serially and None uses every cpu
+PROCESSES = 1
+
+# collections with fewer spectra always run serially, since starting the
+# workers and shipping the data would cost more than it saves
+MIN_SPECTRA = 200
+
+# multiprocessing start method of the pool ('fork', 'spawn', ...); None
+# uses the platform default, which is spawn on macOS and Windows
+START_METHOD = None
+
+_pool = None
+_pool_processes = None
+
+def set_processes(processes=1, min_spectra=None):
+    """
+    Set the default number of processes of the Collection operators
+
+    Parameters
+    ----------
+    processes: int or None
+        number of worker processes; 1 runs serially, None uses every cpu
+
+    min_spectra: int
+        collections with fewer spectra run serially
+    """
+    global PROCESSES, MIN_SPECTRA
+    PROCESSES = processes
+    if min_spectra is not None:
+        MIN_SPECTRA = min_spectra
+
+def resolve_processes(processes=None, n_spectra=None):
+    """
+    Return the number of processes to use for n_spectra spectra, 1 meaning
+    serial. processes=None falls back to the module default.
+    """
+    if processes is None:
+        processes = PROCESSES
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if n_spectra is not None and n_spectra < MIN_SPECTRA:
+        return 1
+    return max(1, processes)
+
+def _get_pool(processes):
+    """Return a pool of processes workers, reused between calls"""
+    global _pool, _pool_processes
+    if _pool is None or _pool_processes != (processes, START_METHOD):
+        shutdown()
+        _pool = multiprocessing.get_context(START_METHOD).Pool(processes)
+        _pool_processes = (processes, START_METHOD)
+    return _pool
+
+def shutdown():
+    """Terminate the worker pool, if any"""
+    global _pool, _pool_processes
+    if _pool is not None:
+        _pool.terminate()
+        _pool.join()
+    _pool = None
+    _pool_processes = None
+
+atexit.register(shutdown)
+
+def _encode(names, series):
+    """
+    Pack series into blocks of (names, series names, wavelengths,
+    wavelength name, 2-D values) over runs sharing a wavelength axis
+    """
+    blocks = []
+    start = 0
+    for i in range(1, len(series) + 1):
+        if i < len(series):
+            index, previous = series[i].index, series[i-1].index
+            if index is previous or (len(index) == len(previous) and
+                                     np.array_equal(index.values, previous.values)):
+                continue
+        run = series[start:i]
+        blocks.append((names[start:i], [s.name for s in run],
+                       run[0].index.values, run[0].index.name,
+                       np.vstack([s.values for s in run])))
+        start = i
+    return blocks
+
+def _decode(blocks):
+    """Inverse of _encode, returning (names, list of pandas.Series)"""
+    names = []
+    series = []
+    for block_names, series_names, wavelengths, index_name, values in blocks:
+        index = pd.Index(wavelengths, name=index_name)
+        names.extend(block_names)
+        series.extend(pd.Series(row, index=index, name=name)
+                      for row, name in zip(values, series_names))
+    return names, series
+
+def _apply(job):
+    """Worker: apply an operator to an encoded chunk and encode the result"""
+    function, kwargs, blocks = job
+    names, series = _decode(blocks)
+    result = []
+    for name, s in zip(names, series):
+        try:
+            result.append(function(s, **kwargs))
+        except Exception:
+            logging.error("Error occurred while processing {}".format(name))
+            raise
+    return _encode(names, result)
+
+def map_spectra(function, spectra, processes=None, chunksize=None, **kwargs):
+    """
+    Apply function(measurement, **kwargs) to the measurement of every
+    spectrum and return the resulting pandas.Series in order
+
+    Parameters
+    ----------
+    function: callable
+        picklable function of a pandas.Series returning a pandas.Series,
+        such as the functions of specdal.operators
+
+    spectra: list of specdal.Spectrum
+
+    processes: int or None
+        number of worker processes; defaults to specdal.parallel.PROCESSES.
+        Lists shorter than MIN_SPECTRA run serially.
+
+    chunksize: int
+        number of spectra sent to a worker at a time
+    """
+    result = []
+    for chunk in imap_spectra(function, spectra, processes, chunksize,
+                              **kwargs):
+        result.extend(chunk)
+    return result
+
+def imap_spectra(function, spectra, processes=None, chunksize=None,
+                 **kwargs):
+    """
+    Like map_spectra, but yield the results one chunk of chunksize
+    spectra at a time, in order, so that callers can report progress or
+    stop early. At most two chunks per process are submitted ahead of the
+    one being consumed: closing the generator leaves little work behind
+    in the pool.
+    """
+    processes = resolve_processes(processes, len(spectra))
+    if chunksize is None:
+        chunksize = max(1, -(-len(spectra)//(processes*4)))
+    chunks = [spectra[i:i+chunksize] for i in range(0, len(spectra), chunksize)]
+    if processes <= 1:
+        for chunk in chunks:
+            yield [function(s.measurement, **kwargs) for s in chunk]
+        return
+    pool = _get_pool(processes)
+    pending = []
+    for chunk in chunks:
+        pending.append(pool.apply_async(_apply, ((function, kwargs, _encode(
+            [s.name for s in chunk], [s.measurement for s in chunk])),)))
+        if len(pending) > 2*processes:
+            yield _decode(pending.pop(0).get())[1]
+    for result in pending:
+        yield _decode(result.get())[1]
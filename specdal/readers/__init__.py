@@ -1,34 +1,190 @@
-#via https://stackoverflow.com/a/1057534
-from os.path import dirname, basename, isfile 
-from os.path import abspath, expanduser, splitext, join, split
-import glob
-from .asd import read_asd
-from .sed import read_sed
-from .sig import read_sig
-from .pico import read_pico
-
-modules = glob.glob(dirname(__file__)+"/*.py")
-__all__ = [ basename(f)[:-3] for f in modules if isfile(f) and not f.endswith('__init__.py')]
-
-SUPPORTED_READERS = {
-        '.asd':read_asd, 
-        '.sig':read_sig,
-        '.sed':read_sed,
-        '.pico':read_pico,
-        '.light':read_pico,
-        '.dark':read_pico,
-}
-
-def read(filepath, read_data=True, read_metadata=True, verbose=False):
+from os.path import abspath, expanduser, splitext
+from collections import OrderedDict
+from collections.abc import Mapping
+from importlib import import_module
+from specdal.instrument import stage
+
+__all__ = ['read', 'register_reader', 'get_reader_ext', 'ReaderRegistry',
+           'SUPPORTED_READERS', 'ENTRY_POINT_GROUP', 'asd', 'sed', 'sig',
+           'pico', 'sniff']
+
+# third party packages can provide readers by declaring an entry point in
+# this group, named after the extension it handles, e.g.
+#   entry_points={'specdal.readers': ['.spc = mypkg.spc:read_spc']}
+ENTRY_POINT_GROUP = 'specdal.readers'
+
+# builtin readers are stored as "module:function" and imported on first use
+_BUILTIN_READERS = OrderedDict([
+        ('.asd', 'specdal.readers.asd:read_asd'),
+        ('.sig', 'specdal.readers.sig:read_sig'),
+        ('.sed', 'specdal.readers.sed:read_sed'),
+        ('.pico', 'specdal.readers.pico:read_pico'),
+        ('.light', 'specdal.readers.pico:read_pico'),
+        ('.dark', 'specdal.readers.pico:read_pico'),
+])
+
+def _iter_entry_points(group):
+    """Yield installed entry points in group, whatever the python version."""
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        try:
+            from pkg_resources import iter_entry_points
+        except ImportError:
+            return
+        for ep in iter_entry_points(group):
+            yield ep
+        return
+    eps = entry_points()
+    if hasattr(eps, 'select'):
+        eps = eps.select(group=group)
+    else:
+        eps = eps.get(group, [])
+    for ep in eps:
+        yield ep
+
+def _normalize_ext(ext):
+    ext = ext.lower()
+    if not ext.startswith('.'):
+        ext = '.' + ext
+    return ext
+
+def _resolve(reader):
+    """Turn a "module:function" string or entry point into a callable."""
+    if isinstance(reader, str):
+        module, func = reader.split(':')
+        return getattr(import_module(module), func)
+    if hasattr(reader, 'load'):
+        return reader.load()
+    return reader
+
+class ReaderRegistry(Mapping):
+    """
+    Mapping from file extension to reader function.
+
+    Readers are registered as callables, "module:function" strings or
+    entry points, and are only imported the first time their extension is
+    looked up. Entry points in ENTRY_POINT_GROUP are scanned the first
+    time an extension that is not already registered is requested.
+    """
+    def __init__(self, readers=None, group=ENTRY_POINT_GROUP):
+        self._readers = OrderedDict()
+        self._group = group
+        self._entry_points_loaded = group is None
+        if readers is not None:
+            for ext, reader in readers.items():
+                self.register(ext, reader)
+
+    def register(self, ext, reader):
+        """
+        Register reader for files ending in ext.
+
+        Parameters
+        ----------
+        ext: string
+            file extension including the leading dot, e.g. ".asd"
+
+        reader: callable or string
+            function with the signature of read_asd, or a
+            "module:function" string to be imported lazily
+        """
+        self._readers[_normalize_ext(ext)] = reader
+
+    def _load_entry_points(self):
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        for ep in _iter_entry_points(self._group):
+            # explicitly registered readers take precedence
+            self._readers.setdefault(_normalize_ext(ep.name), ep)
+
+    def __getitem__(self, ext):
+        ext = _normalize_ext(ext)
+        if ext not in self._readers:
+            self._load_entry_points()
+        reader = self._readers[ext]
+        if isinstance(reader, str) or hasattr(reader, 'load'):
+            reader = _resolve(reader)
+            self._readers[ext] = reader
+        return reader
+
+    def __contains__(self, ext):
+        if not isinstance(ext, str):
+            return False
+        ext = _normalize_ext(ext)
+        if ext not in self._readers:
+            self._load_entry_points()
+        return ext in self._readers
+
+    def __iter__(self):
+        self._load_entry_points()
+        return iter(list(self._readers))
+
+    def __len__(self):
+        self._load_entry_points()
+        return len(self._readers)
+
+SUPPORTED_READERS = ReaderRegistry(_BUILTIN_READERS)
+
+def register_reader(ext, reader):
+    """Register a reader function for ext in SUPPORTED_READERS."""
+    SUPPORTED_READERS.register(ext, reader)
+
+def __getattr__(name):
+    # keep `from specdal.readers import read_asd` working without importing
+    # every reader module when the package is imported
+    for spec in _BUILTIN_READERS.values():
+        module, func = spec.split(':')
+        if func == name:
+            return getattr(import_module(module), func)
+    raise AttributeError("module {!r} has no attribute {!r}".format(
+        __name__, name))
+
+def get_reader_ext(filepath, sniff=False):
+    """
+    Return the key in SUPPORTED_READERS used to read filepath, or None.
+
+    Parameters
+    ----------
+    sniff: boolean
+        if True, identify the format from the file content (see
+        specdal.readers.sniff) and only fall back to the extension when
+        the content is not recognized
+    """
+    if sniff:
+        from .sniff import sniff as sniff_format
+        ext = sniff_format(filepath)
+        if ext is not None and ext in SUPPORTED_READERS:
+            return ext
+    ext = splitext(filepath)[1]
+    if ext in SUPPORTED_READERS:
+        return ext
+    return None
+
+def read(filepath, read_data=True, read_metadata=True, verbose=False,
+         sniff=False, dtype=None):
     """Calls a reader function based on the extension of the passed filename.
         .asd: read_asd
         .sig: read_sig
         .sed: read_sed
         .pico: read_pico
+
+    Additional extensions can be added with register_reader or through
+    the "specdal.readers" entry point group. If sniff is True, the format
+    is identified from the file content instead, so mislabeled files
+    (e.g. .asd.bak, .txt) can be read. If dtype is given (e.g. "float32"),
+    the floating point columns of the data are converted to it.
     """
-    ext = splitext(filepath)[1]
-    assert ext in SUPPORTED_READERS
+    ext = get_reader_ext(filepath, sniff)
+    assert ext is not None
     reader = SUPPORTED_READERS[ext]
-    return reader(abspath(expanduser(filepath)), read_data,
-                  read_metadata, verbose)
-
+    with stage('read' + ext, items=1):
+        data, metadata = reader(abspath(expanduser(filepath)), read_data,
+                                read_metadata, verbose)
+        if dtype is not None and data is not None:
+            columns = data.select_dtypes('floating').columns
+            if len(columns) == data.shape[1]:
+                data = data.astype(dtype)
+            elif len(columns):
+                data = data.astype({c:dtype for c in columns})
+        return data, metadata
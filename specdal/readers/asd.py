@@ -40,7 +40,8 @@ def read_asd(filepath, read_data=True, read_metadata=True, verbose=False):
     with open(abspath(expanduser(filepath)), 'rb') as f:
         if verbose:
             print('reading {}'.format(filepath))
-        binconts = f.read()
+        # the header holds the metadata
+        binconts = f.read() if read_data else f.read(484)
         version = binconts[0:3].decode('utf-8')
         assert(version in ASD_VERSIONS) # TODO: define ASD_VERSIONS
         # read spectrum type
@@ -56,16 +57,15 @@ def read_asd(filepath, read_data=True, read_metadata=True, verbose=False):
             tgt_column = ASD_DATA_TYPES[spectrum_type]
             ref_column = tgt_column.replace('tgt', 'ref')
             data_format = struct.unpack('B', binconts[199:(199 + 1)])[0]
-            fmt = 'f'*num_channels
-            if data_format == 2:
-                fmt = 'd'*num_channels
-            if data_format == 0:
-                fmt = 'f'*num_channels
+            # doubles, otherwise floats; returned as float64 like the
+            # other readers, float32 being opted into with dtype=
+            dtype = np.dtype('<f8') if data_format == 2 else np.dtype('<f4')
             # data to DataFrame
-            size = num_channels*8
+            size = num_channels*dtype.itemsize
             # Read the spectrum block data
             waves = np.linspace(wavestart, wavestop, num_channels)
-            spectrum = np.array(struct.unpack(fmt, binconts[484:(484 + size)]))
+            spectrum = np.frombuffer(binconts, dtype, num_channels,
+                                     484).astype(np.float64)
             reference = None
             if ASD_HAS_REF[version]:
                 # read reference
@@ -75,7 +75,8 @@ def read_asd(filepath, read_data=True, read_metadata=True, verbose=False):
                 ref_desc_length = struct.unpack('H', binconts[first:last])[0]
                 first = start + 20 + ref_desc_length
                 last = first + size
-                reference = np.array(struct.unpack(fmt, binconts[first:last]))
+                reference = np.frombuffer(binconts, dtype, num_channels,
+                                          first).astype(np.float64)
             data = pd.DataFrame({tgt_column : spectrum,
                                  ref_column: reference}, index=waves)
             data.index.name = 'wavelength'
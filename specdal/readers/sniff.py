@@ -0,0 +1,70 @@
+# sniff.py identifies the format of a spectrum file from its first bytes, so
+# that renamed or extensionless files can still be dispatched to a reader.
+import os
+from os.path import abspath, expanduser
+from functools import lru_cache
+
+# number of bytes read from the start of each file
+SNIFF_SIZE = 8192
+
+# version tags at bytes 0-3 of asd files (see asd.ASD_VERSIONS)
+ASD_MAGIC = (b'ASD', b'asd', b'as6', b'as7', b'as8')
+
+def _is_asd(head):
+    return head[0:3] in ASD_MAGIC
+
+def _is_sig(head):
+    return head.lstrip().startswith(b'/*** Spectra Vista')
+
+def _is_sed(head):
+    return head.startswith(b'Data:') or b'\nData:' in head
+
+def _is_pico(head):
+    return head.lstrip().startswith(b'{')
+
+# (extension, test) pairs tried in order; the extension names the reader in
+# SUPPORTED_READERS that handles files passing the test
+FORMAT_SIGNATURES = [
+    ('.asd', _is_asd),
+    ('.sig', _is_sig),
+    ('.sed', _is_sed),
+    ('.pico', _is_pico),
+]
+
+def sniff_bytes(head):
+    """
+    Identify a spectrum format from the leading bytes of a file
+
+    Returns
+    -------
+    string extension of the matching reader, or None
+    """
+    for ext, test in FORMAT_SIGNATURES:
+        if test(head):
+            return ext
+    return None
+
+@lru_cache(maxsize=65536)
+def _sniff_file(filepath, mtime, size):
+    with open(filepath, 'rb') as f:
+        head = f.read(SNIFF_SIZE)
+    return sniff_bytes(head)
+
+def sniff(filepath):
+    """
+    Identify the format of filepath from its content
+
+    Results are cached per file (keyed on path, modification time and
+    size), so repeated scans of the same directory only read each file's
+    header once.
+
+    Returns
+    -------
+    string extension of the matching reader (e.g. ".asd"), or None
+    """
+    filepath = abspath(expanduser(filepath))
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return _sniff_file(filepath, stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,136 @@
+import os
+import sys
+import shutil
+import pickle
+import tempfile
+import pandas as pd
+import unittest
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.spectrum import Spectrum
+from specdal.containers.collection import Collection
+from specdal.cache import (StageCache, OutputManifest, run_stages, fingerprint,
+                           fingerprint_directory, fingerprint_collection)
+
+def make_collection(values):
+    return Collection(name='c1', spectra=[
+        Spectrum(name='s{}'.format(i),
+                 measurement=pd.Series([1, 2, v], index=pd.Index([1, 2, 3], name='wavelength'),
+                                       name='pct_reflect'))
+        for i, v in enumerate(values)])
+
+class stageCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.calls = []
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+    def stages(self, scale):
+        def read(_):
+            self.calls.append('read')
+            return 1
+        def multiply(x):
+            self.calls.append('multiply')
+            return x*scale
+        key = fingerprint('read')
+        return [('read', key, read),
+                ('multiply', fingerprint(key, scale), multiply)]
+    def test_reuse(self):
+        self.assertEqual(run_stages(self.stages(2), StageCache(self.tmpdir)), 2)
+        self.assertEqual(run_stages(self.stages(2), StageCache(self.tmpdir)), 2)
+        self.assertEqual(self.calls, ['read', 'multiply'])
+    def test_changed_argument(self):
+        run_stages(self.stages(2), StageCache(self.tmpdir))
+        self.assertEqual(run_stages(self.stages(3), StageCache(self.tmpdir)), 3)
+        self.assertEqual(self.calls, ['read', 'multiply', 'multiply'])
+    def test_prune(self):
+        run_stages(self.stages(2), StageCache(self.tmpdir))
+        cache = StageCache(self.tmpdir)
+        run_stages(self.stages(3), cache)
+        cache.prune()
+        self.assertEqual(len(os.listdir(self.tmpdir)), 2)
+        self.assertNotIn(('multiply', self.stages(2)[1][1]), cache)
+    def test_prune_keeps_join_inputs(self):
+        base = self.stages(5)
+        def join(x):
+            return x + run_stages(base, cache)
+        key = fingerprint(self.stages(2)[-1][1], base[-1][1], 'join')
+        stages = self.stages(2) + [('join', key, join, [base])]
+        cache = StageCache(self.tmpdir)
+        self.assertEqual(run_stages(stages, cache), 7)
+        cache = StageCache(self.tmpdir)
+        self.assertEqual(run_stages(stages, cache), 7)
+        cache.prune()
+        self.assertIn(base[-1][:2], cache)
+        # a changed target reuses the base
+        del self.calls[:]
+        cache = StageCache(self.tmpdir)
+        stages = self.stages(3) + [('join', fingerprint('other'), join, [base])]
+        self.assertEqual(run_stages(stages, cache), 8)
+        self.assertEqual(self.calls, ['multiply'])
+    def test_no_cache(self):
+        run_stages(self.stages(2))
+        run_stages(self.stages(2))
+        self.assertEqual(len(self.calls), 4)
+
+class fingerprintTests(unittest.TestCase):
+    def test_collection(self):
+        self.assertEqual(fingerprint_collection(make_collection([3, 4])),
+                         fingerprint_collection(make_collection([3, 4])))
+        self.assertNotEqual(fingerprint_collection(make_collection([3, 4])),
+                            fingerprint_collection(make_collection([3, 5])))
+    def test_directory(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            key = fingerprint_directory(tmpdir)
+            with open(os.path.join(tmpdir, 'a.asd'), 'w') as f:
+                f.write('a')
+            self.assertNotEqual(fingerprint_directory(tmpdir), key)
+        finally:
+            shutil.rmtree(tmpdir)
+    def test_pickle_collection(self):
+        c = make_collection([3, 4])
+        c.flag('s1')
+        c2 = pickle.loads(pickle.dumps(c))
+        self.assertEqual(list(c2.flags), ['s1'])
+        self.assertEqual(fingerprint_collection(c2), fingerprint_collection(c))
+
+class outputManifestTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+    def write(self, manifest, name, key):
+        path = os.path.join(self.tmpdir, name)
+        written = manifest.changed(path, key)
+        if written:
+            open(path, 'w').close()
+        manifest.record(path, key)
+        return written
+    def test_changed(self):
+        manifest = OutputManifest(self.tmpdir)
+        self.assertTrue(self.write(manifest, 'a.csv', '1'))
+        manifest.save()
+        manifest = OutputManifest(self.tmpdir)
+        self.assertFalse(self.write(manifest, 'a.csv', '1'))
+        self.assertTrue(self.write(manifest, 'b.csv', '1'))
+        manifest.save()
+        manifest = OutputManifest(self.tmpdir)
+        self.assertTrue(self.write(manifest, 'a.csv', '2'))
+    def test_remove_stale(self):
+        manifest = OutputManifest(self.tmpdir)
+        self.write(manifest, 'a.csv', '1')
+        self.write(manifest, 'b.csv', '1')
+        manifest.save()
+        manifest = OutputManifest(self.tmpdir)
+        self.write(manifest, 'a.csv', '1')
+        manifest.save()
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir, 'a.csv')))
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, 'b.csv')))
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
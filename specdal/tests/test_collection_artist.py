@@ -0,0 +1,63 @@
+import os
+import sys
+import unittest
+import warnings
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+from matplotlib.colors import to_rgba
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.spectrum import Spectrum
+from specdal.containers.collection import Collection
+from specdal.gui.collection_artist import CollectionArtist
+
+class collectionArtistTests(unittest.TestCase):
+    def setUp(self):
+        index = pd.Index(np.arange(400., 410.), name='wavelength')
+        self.c = Collection(name='c')
+        for i in range(4):
+            self.c.append(Spectrum(name=str(i),
+                                   measurement=pd.Series(i + np.zeros(10),
+                                                         index=index),
+                                   measure_type='pct_reflect'))
+        self.c.flag('1')
+        self.ax = Figure().add_subplot(111)
+        self.artist = CollectionArtist(self.ax, self.c)
+    def test_single_artist(self):
+        self.assertEqual(len(self.ax.lines), 0)
+        self.assertEqual(len(self.ax.collections), 1)
+        self.assertEqual(len(self.artist.lines.get_segments()), 4)
+    def test_flags(self):
+        self.assertEqual(list(self.artist.flagged), [False, True, False, False])
+        colors = self.artist.lines.get_colors()
+        self.assertEqual(tuple(colors[1]), to_rgba('r'))
+        self.assertEqual(tuple(colors[0]), to_rgba('k'))
+    def test_hide(self):
+        self.artist.selected[self.artist.indices(['2', '3', 'missing'])] = True
+        self.artist.show_unselected = False
+        self.artist.update()
+        segments = self.artist.lines.get_segments()
+        self.assertEqual([s[0, 1] for s in segments], [2, 3])
+        self.artist.show_unselected = True
+        self.artist.show_flagged = False
+        self.artist.update()
+        segments = self.artist.lines.get_segments()
+        self.assertEqual([s[0, 1] for s in segments], [0, 2, 3])
+    def test_mixed_selection(self):
+        self.artist.selected[self.artist.indices(['0', '2'])] = True
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            self.artist.update()
+        styles = self.artist.lines.get_linestyles()
+        self.assertEqual(styles[0], styles[2])
+        self.assertNotEqual(styles[0], styles[1])
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import os
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.spectrum import Spectrum
+from specdal.containers.collection import Collection
+from specdal.operators import derivative
+
+class derivativeTests(unittest.TestCase):
+    def setUp(self):
+        self.index = pd.Index(np.arange(400., 500.), name='wavelength')
+        # 0.5 + 1e-4*w**2: first derivative 2e-4*w, second 2e-4
+        self.s1 = pd.Series(0.5 + 1e-4*self.index.values**2,
+                            index=self.index, name='pct_reflect')
+    def test_gradient(self):
+        first = derivative(self.s1)
+        self.assertTrue(np.allclose(first.values[1:-1],
+                                    2e-4*self.index.values[1:-1]))
+        second = derivative(self.s1, order=2)
+        self.assertTrue(np.allclose(second.values[2:-2], 2e-4))
+    def test_uneven_spacing(self):
+        index = pd.Index([400., 401., 403., 406., 410.], name='wavelength')
+        s = pd.Series(3*index.values, index=index)
+        self.assertTrue(np.allclose(derivative(s).values, 3))
+    def test_savgol(self):
+        second = derivative(self.s1, order=2, method='savgol', window=7)
+        self.assertTrue(np.allclose(second.values, 2e-4))
+        with self.assertRaises(ValueError):
+            derivative(self.s1.iloc[[0, 1, 3, 4, 5, 6, 7, 8]], method='savgol',
+                       window=5)
+    def test_dataframe(self):
+        df = pd.concat([self.s1, 2*self.s1], axis=1, keys=['a', 'b'])
+        result = derivative(df, method='savgol', window=7)
+        pdt.assert_series_equal(result['a'], derivative(self.s1,
+                                method='savgol', window=7), check_names=False)
+    def test_unstitched(self):
+        s = pd.Series([1., 2., 3., 4.], index=[400., 401., 400.5, 402.])
+        with self.assertRaises(ValueError):
+            derivative(s)
+    def test_collection(self):
+        c = Collection(name='c')
+        for i in range(3):
+            c.append(Spectrum(name=str(i), measurement=self.s1*(i + 1),
+                              measure_type='pct_reflect'))
+        # a spectrum with other wavelengths
+        c.append(Spectrum(name='short', measurement=self.s1.iloc[::2],
+                          measure_type='pct_reflect'))
+        expected = [derivative(s.measurement, 2, 'savgol', 7)
+                    for s in c.spectra]
+        c.derivative(order=2, method='savgol', window=7)
+        for s, e in zip(c.spectra, expected):
+            pdt.assert_series_equal(s.measurement, e)
+        self.assertEqual(c.spectra[0].measurement.name, 'pct_reflect')
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import shutil
+import struct
+import tempfile
+import numpy as np
+import pandas as pd
+import unittest
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.spectrum import Spectrum
+from specdal.containers.collection import Collection
+from specdal.readers import read
+from specdal import parallel
+
+def write_asd(path, data_format, channels=10):
+    """minimal as7 file of raw counts with a white reference"""
+    dtype = '<f8' if data_format == 2 else '<f4'
+    header = bytearray(484)
+    header[0:3] = b'as7'
+    struct.pack_into('f', header, 191, 350.)
+    struct.pack_into('f', header, 195, 1.)
+    header[199] = data_format
+    struct.pack_into('h', header, 204, channels)
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(np.full(channels, 50, dtype=dtype).tobytes())
+        f.write(bytearray(20))
+        f.write(np.full(channels, 100, dtype=dtype).tobytes())
+
+def make_collection(dtype=None):
+    wavelengths = np.arange(350, 360, 0.5)
+    return Collection(name='c1', dtype=dtype, spectra=[
+        Spectrum(name='s{}'.format(i),
+                 measurement=pd.Series(np.linspace(0, 1, len(wavelengths)) + i,
+                                       index=pd.Index(wavelengths, name='wavelength'),
+                                       name='pct_reflect'))
+        for i in range(3)])
+
+class dtypeTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+    def test_asd_precision(self):
+        # float and double files read as float64 unless float32 is asked
+        for data_format in (0, 2):
+            path = os.path.join(self.tmpdir, 'f{}.asd'.format(data_format))
+            write_asd(path, data_format)
+            data, meta = read(path)
+            self.assertEqual(data['tgt_count'].dtype, np.float64)
+            self.assertEqual(data['ref_count'].dtype, np.float64)
+            self.assertEqual(list(data['ref_count']), [100]*10)
+            data, meta = read(path, dtype='float32')
+            self.assertEqual(data['tgt_count'].dtype, np.float32)
+    def test_read_dtype(self):
+        path = os.path.join(self.tmpdir, 'a.asd')
+        write_asd(path, 2)
+        data, meta = read(path, dtype='float32')
+        self.assertEqual(data['tgt_count'].dtype, np.float32)
+        c = Collection(name='c', directory=self.tmpdir, dtype='float32')
+        self.assertEqual(c.data.values.dtype, np.float32)
+        np.testing.assert_allclose(c.data.values, 0.5)
+    def test_collection_operations(self):
+        c = make_collection('float32')
+        self.assertEqual(c.spectra[0].measurement.dtype, np.float32)
+        c.interpolate(spacing=1)
+        c.jump_correct(splices=[355], reference=0)
+        self.assertEqual(c.spectra[0].measurement.dtype, np.float32)
+        self.assertEqual(c.data.values.dtype, np.float32)
+        self.assertEqual(c.mean().measurement.dtype, np.float32)
+    def test_parallel(self):
+        defaults = parallel.PROCESSES, parallel.MIN_SPECTRA
+        try:
+            parallel.set_processes(2, min_spectra=0)
+            c = make_collection('float32')
+            c.interpolate(spacing=1)
+            self.assertEqual(c.spectra[0].measurement.dtype, np.float32)
+        finally:
+            parallel.set_processes(*defaults)
+            parallel.shutdown()
+    def test_set_dtype(self):
+        c = make_collection()
+        self.assertEqual(c.data.values.dtype, np.float64)
+        c.set_dtype('float32')
+        self.assertEqual(c.data.values.dtype, np.float32)
+        c.append(Spectrum(name='s4', measurement=c.spectra[0].measurement.astype(float)))
+        self.assertEqual(c['s4'].measurement.dtype, np.float32)
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
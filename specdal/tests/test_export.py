@@ -0,0 +1,107 @@
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+import unittest
+from PyQt5 import QtCore
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.spectrum import Spectrum
+from specdal.containers.collection import Collection
+from specdal.gui.pyqt.export_collection import CollectionExporter
+
+def make_collection(n=5):
+    wavelengths = pd.Index(np.arange(350., 400.), name='wavelength')
+    return Collection(name='c', spectra=[
+        Spectrum(name='s{}'.format(i),
+                 measurement=pd.Series(i + np.sin(wavelengths.values),
+                                       index=wavelengths, name='pct_reflect'))
+        for i in range(n)])
+
+def configuration(path, **kwargs):
+    result = {"path": path, "flags": False, "resume": False,
+              "data": {"dataset": True, "individual": True},
+              "figures": {"dataset": True, "individual": True}}
+    result.update(kwargs)
+    return result
+
+class collectionExporterTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.events = []
+        self.ended = threading.Event()
+        self.exporter = CollectionExporter()
+        self.exporter.progress.connect(lambda *args: self.events.append(('progress',) + args))
+        self.exporter.exported.connect(lambda path: self.events.append(('exported', path)))
+        self.exporter.cancelled.connect(lambda: self.events.append(('cancelled',)))
+        self.exporter.failed.connect(lambda message: self.events.append(('failed', message)))
+        self.exporter.finished.connect(self.ended.set)
+        self.c = make_collection()
+        self.c.flag('s1')
+    def tearDown(self):
+        self.exporter.wait()
+        shutil.rmtree(self.tmpdir)
+    def export(self, configuration):
+        self.ended.clear()
+        self.events = []
+        self.exporter.export(self.c, configuration)
+        # signals are delivered by the event loop of this thread
+        for _ in range(1000):
+            self.app.processEvents()
+            if self.ended.wait(0.01):
+                break
+        self.assertTrue(self.ended.is_set())
+        self.app.processEvents()
+        return self.events
+    def listdir(self, *path):
+        return sorted(os.listdir(os.path.join(self.tmpdir, *path)))
+    def test_export(self):
+        events = self.export(configuration(self.tmpdir))
+        self.assertEqual(events[-1], ('exported', self.tmpdir))
+        self.assertIn(('progress', 'Writing spectra', 4, 4), events)
+        self.assertIn(('progress', 'Plotting spectra', 4, 4), events)
+        self.assertEqual(self.listdir('data', 'indiv'),
+                         ['s0.csv', 's2.csv', 's3.csv', 's4.csv'])
+        self.assertEqual(self.listdir('figures', 'indiv'),
+                         ['s0.png', 's2.png', 's3.png', 's4.png'])
+        self.assertEqual(self.listdir('data'), ['c_unflagged.csv', 'indiv'])
+        self.assertEqual(self.listdir('figures'), ['c_unflagged.png', 'indiv'])
+    def test_resume(self):
+        self.export(configuration(self.tmpdir))
+        csv = os.path.join(self.tmpdir, 'data', 'indiv', 's2.csv')
+        os.remove(csv)
+        mtime = os.path.getmtime(os.path.join(self.tmpdir, 'data', 'indiv', 's3.csv'))
+        events = self.export(configuration(self.tmpdir, resume=True))
+        self.assertEqual(events[-1], ('exported', self.tmpdir))
+        # progress counts the files written before
+        self.assertIn(('progress', 'Writing spectra', 3, 4), events)
+        self.assertIn(('progress', 'Plotting spectra', 4, 4), events)
+        self.assertNotIn('Writing dataset', [e[1] for e in events[:-1]])
+        self.assertTrue(os.path.exists(csv))
+        self.assertEqual(mtime, os.path.getmtime(
+            os.path.join(self.tmpdir, 'data', 'indiv', 's3.csv')))
+    def test_cancel(self):
+        self.exporter.progress.connect(lambda *args: self.exporter.cancel(),
+                                       QtCore.Qt.DirectConnection)
+        events = self.export(configuration(self.tmpdir, flags=True))
+        self.assertEqual(events[-1], ('cancelled',))
+        self.assertEqual(self.listdir('figures'), [])
+    def test_failed(self):
+        path = os.path.join(self.tmpdir, 'file')
+        open(path, 'w').close()
+        events = self.export(configuration(path))
+        self.assertEqual(events[-1][0], 'failed')
+        self.assertIn('NotADirectoryError', events[-1][1])
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
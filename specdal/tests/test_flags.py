@@ -0,0 +1,143 @@
+import os
+import sys
+import pickle
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import unittest
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.spectrum import Spectrum
+from specdal.containers.collection import Collection
+from specdal.containers.flags import RowIndex, read_flag_file, write_flag_file
+
+def make_collection(n=5):
+    index = pd.Index([1., 2., 3.], name='wavelength')
+    return Collection(name='c', spectra=[
+        Spectrum(name='s{}'.format(i),
+                 measurement=pd.Series([1., 2., float(i)], index=index,
+                                       name='pct_reflect'))
+        for i in range(n)])
+
+class rowIndexTests(unittest.TestCase):
+    def test_lookup(self):
+        names = ['s{}'.format(i) for i in range(1000)]
+        index = RowIndex(names)
+        query = ['s999', 'x', 's0'] + names[::-1]
+        expected = [999, -1, 0] + list(range(999, -1, -1))
+        np.testing.assert_array_equal(index.lookup(query), expected)
+        self.assertEqual(len(index.lookup([])), 0)
+        self.assertEqual(list(index.lookup('s5')), [5])
+    def test_remove(self):
+        index = RowIndex(['a', 'b', 'c'])
+        self.assertEqual(index.remove('b'), 1)
+        self.assertEqual(index.rows, {'a': 0, 'c': 1})
+        self.assertEqual(list(index.lookup(['c'] * 100)), [1] * 100)
+
+class flagTests(unittest.TestCase):
+    def setUp(self):
+        self.c = make_collection()
+    def test_flag_many(self):
+        self.c.flag(['s3', 's1', 'missing'])
+        self.assertEqual(list(self.c.flags), ['s1', 's3'])
+        np.testing.assert_array_equal(self.c.flags.mask,
+                                      [False, True, False, True, False])
+        self.assertIn('s1', self.c.flags)
+        self.assertNotIn('s2', self.c.flags)
+        self.assertNotIn('missing', self.c.flags)
+        self.assertEqual(len(self.c.flags), 2)
+        self.c.unflag(['s1', 's2'])
+        self.assertEqual(list(self.c.flags), ['s3'])
+    def test_dict_interface(self):
+        self.c.flag('s2')
+        self.assertEqual(dict(self.c.flags.items()), {'s2': True})
+        self.assertTrue(self.c.flags['s2'])
+        self.assertFalse(self.c.flags['s0'])
+        del self.c.flags['s2']
+        self.assertEqual(len(self.c.flags), 0)
+        self.c.flags = ['s0', 's4']
+        self.assertEqual(list(self.c.flags), ['s0', 's4'])
+    def test_layers(self):
+        self.c.flag('s0')
+        self.c.flag(['s1', 's2'], layer='white')
+        self.c.flag('s2', layer='saturated')
+        self.assertEqual(self.c.flag_layers, ['manual', 'white', 'saturated'])
+        self.assertEqual(list(self.c.flags), ['s0'])
+        np.testing.assert_array_equal(self.c.flag_mask(),
+                                      [True, True, True, False, False])
+        np.testing.assert_array_equal(self.c.flag_mask('saturated'),
+                                      [False, False, True, False, False])
+        unflagged = self.c.as_unflagged()
+        self.assertEqual([s.name for s in unflagged.spectra], ['s3', 's4'])
+        flagged = self.c.as_flagged(['white'])
+        self.assertEqual([s.name for s in flagged.spectra], ['s1', 's2'])
+        self.assertEqual(list(flagged.flag_layer('saturated')), ['s2'])
+        # the spectra are shared, not copied
+        self.assertIs(flagged['s1'], self.c['s1'])
+    def test_append_delete(self):
+        self.c.flag(['s1', 's4'])
+        self.c.append(Spectrum(name='s5', measurement=self.c['s0'].measurement))
+        self.c.flag('s5')
+        self.assertEqual(list(self.c.flags), ['s1', 's4', 's5'])
+        del self.c['s1']
+        del self.c['s2']
+        self.assertEqual(list(self.c.flags), ['s4', 's5'])
+        np.testing.assert_array_equal(self.c.flags.mask,
+                                      [False, False, True, True])
+    def test_replace_spectra(self):
+        self.c.flag('s3')
+        self.c.flag('s1', layer='white')
+        self.c.spectra = self.c.spectra[1:][::-1]
+        self.assertEqual(list(self.c.flags), ['s3'])
+        np.testing.assert_array_equal(self.c.flag_mask(),
+                                      [False, True, False, True])
+    def test_pickle(self):
+        self.c.flag('s3')
+        self.c.flag('s0', layer='white')
+        c = pickle.loads(pickle.dumps(self.c))
+        self.assertEqual(list(c.flags), ['s3'])
+        self.assertEqual(list(c.flag_layer('white')), ['s0'])
+        c.flag('s4')
+        self.assertEqual(list(c.flags), ['s3', 's4'])
+    def test_statistics_ignore_flagged(self):
+        self.c.flag('s4', layer='saturated')
+        self.assertEqual(self.c.mean().measurement.iloc[-1], 1.5)
+    def test_subset_attributes(self):
+        c = Collection(name='c', spectra=make_collection().spectra,
+                       measure_type='tgt_count', dtype='float32')
+        c.flag('s1')
+        for subset in (c.as_flagged(), c.as_unflagged()):
+            self.assertEqual(subset.measure_type, 'tgt_count')
+            self.assertEqual(subset.dtype, np.float32)
+
+class flagFileTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.c = make_collection()
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+    def test_round_trip(self):
+        path = os.path.join(self.tmpdir, 'flags.txt')
+        self.c.flag(['s1', 's3'])
+        write_flag_file(path, self.c.flags)
+        self.assertEqual(read_flag_file(path), ['s1', 's3'])
+    def test_apply(self):
+        paths = [os.path.join(self.tmpdir, name) for name in ('a.txt', 'b.txt')]
+        with open(paths[0], 'w') as f:
+            f.write('s4\n\n  s0 \nmissing\n')
+        write_flag_file(paths[1], ['s0', 's2'])
+        self.c.flag('s1', layer='white')
+        with self.assertLogs(level='WARNING'):
+            self.assertEqual(self.c.apply_flag_files(paths), 3)
+        self.assertEqual(list(self.c.flags), ['s0', 's2', 's4'])
+        self.assertEqual([s.name for s in self.c.as_unflagged().spectra], ['s3'])
+        self.assertEqual([s.name for s in self.c.as_unflagged('manual').spectra],
+                         ['s1', 's3'])
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import os
+import sys
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import unittest
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.spectrum import Spectrum
+from specdal.containers.collection import Collection, hdf_to_collection
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+def make_spectrum(name, values, wavelengths=(1, 2, 3, 4)):
+    meta = OrderedDict()
+    meta['file'] = name + '.asd'
+    meta['gps_time_tgt'] = np.float64(100)
+    meta['wavelength_range'] = (wavelengths[0], wavelengths[-1])
+    return Spectrum(name=name,
+                    measurement=pd.Series(values,
+                                          index=pd.Index(wavelengths,
+                                                         name='wavelength'),
+                                          name='pct_reflect'),
+                    metadata=meta, interpolated=True)
+
+@unittest.skipIf(h5py is None, "h5py is not installed")
+class hdfTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'c1.h5')
+        self.c = Collection(name='c1', spectra=[
+            make_spectrum('s1', [.1, .2, .3, .4]),
+            make_spectrum('s2', [.5, .6, .7, .8]),
+            make_spectrum('s3', [.9, 1., 1.1, 1.2])])
+        self.c.flag('s2')
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+    def test_round_trip(self):
+        self.c.to_hdf(self.path, chunksize=2)
+        c = hdf_to_collection(self.path)
+        self.assertEqual(c.name, 'c1')
+        self.assertEqual([s.name for s in c.spectra], ['s1', 's2', 's3'])
+        self.assertEqual(list(c.flags), ['s2'])
+        np.testing.assert_array_equal(c.data.values, self.c.data.values)
+        np.testing.assert_array_equal(c.data.index, self.c.data.index)
+        self.assertEqual(c['s1'].metadata['file'], 's1.asd')
+        self.assertEqual(c['s1'].metadata['wavelength_range'], [1, 4])
+        self.assertTrue(c['s1'].interpolated)
+        self.assertFalse(c['s1'].stitched)
+    def test_float32(self):
+        self.c.set_dtype('float32')
+        self.c.to_hdf(self.path)
+        c = hdf_to_collection(self.path)
+        self.assertEqual(c.data.values.dtype, np.float32)
+        c = hdf_to_collection(self.path, dtype='float64')
+        self.assertEqual(c.data.values.dtype, np.float64)
+    def test_empty(self):
+        Collection(name='empty', dtype='float32').to_hdf(self.path)
+        c = hdf_to_collection(self.path)
+        self.assertEqual(c.name, 'empty')
+        self.assertEqual(len(c.spectra), 0)
+        self.assertEqual(c.dtype, np.float32)
+        # appending to an empty file writes the wavelengths of the spectra
+        self.c.to_hdf(self.path, mode='a')
+        c = hdf_to_collection(self.path)
+        self.assertEqual([s.name for s in c.spectra], ['s1', 's2', 's3'])
+        np.testing.assert_array_equal(c.data.index, self.c.data.index)
+    def test_append(self):
+        self.c.to_hdf(self.path)
+        Collection(name='c2', spectra=[
+            make_spectrum('s4', [1, 2, 3, 4])]).to_hdf(self.path, mode='a')
+        c = hdf_to_collection(self.path, name='c3')
+        self.assertEqual(c.name, 'c3')
+        self.assertEqual([s.name for s in c.spectra], ['s1', 's2', 's3', 's4'])
+    def test_append_different_wavelengths(self):
+        self.c.to_hdf(self.path)
+        c2 = Collection(name='c2', spectra=[
+            make_spectrum('s4', [1, 2, 3], wavelengths=(1, 2, 3))])
+        self.assertRaises(ValueError, c2.to_hdf, self.path, mode='a')
+    def test_nonuniform_wavelengths(self):
+        c = Collection(name='c1', spectra=[
+            make_spectrum('s1', [.1, .2, .3, .4]),
+            make_spectrum('s2', [.5, .6, .7], wavelengths=(2, 3, 4))])
+        c.to_hdf(self.path)
+        c = hdf_to_collection(self.path)
+        self.assertTrue(np.isnan(c['s2'].measurement.loc[1]))
+        self.assertEqual(c['s2'].measurement.loc[4], .7)
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
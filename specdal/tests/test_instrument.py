@@ -0,0 +1,81 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import unittest
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.spectrum import Spectrum
+from specdal.containers.collection import Collection
+from specdal.instrument import Profiler, stage
+
+def make_collection():
+    return Collection(name='c1', spectra=[
+        Spectrum(name='s{}'.format(i),
+                 measurement=pd.Series([1, 2, i], index=pd.Index([1, 2, 4], name='wavelength'),
+                                       name='pct_reflect'))
+        for i in range(3)])
+
+class profilerTests(unittest.TestCase):
+    def test_stage(self):
+        with Profiler() as profiler:
+            with stage('outer', items=2):
+                for i in range(3):
+                    with stage('inner') as s:
+                        s.items = 1
+        self.assertEqual(list(profiler.stats), ['inner', 'outer'])
+        self.assertEqual(profiler.stats['inner']['calls'], 3)
+        self.assertEqual(profiler.stats['inner']['items'], 3)
+        self.assertEqual(profiler.stats['outer']['items'], 2)
+        self.assertGreaterEqual(profiler.stats['outer']['wall'],
+                                profiler.stats['inner']['wall'])
+    def test_peak_rss_growth(self):
+        with Profiler() as profiler:
+            with stage('allocate'):
+                values = np.ones(2**24)
+            del values
+            with stage('after'):
+                pass
+        if profiler.stats['allocate']['peak_rss_growth'] is None:
+            self.skipTest("resource is not available")
+        self.assertGreaterEqual(profiler.stats['allocate']['peak_rss_growth'], 0)
+        # the peak reached by the first stage is not charged to the second
+        self.assertEqual(profiler.stats['after']['peak_rss_growth'], 0)
+    def test_inactive(self):
+        profiler = Profiler()
+        with stage('ignored') as s:
+            s.items = 1
+        self.assertEqual(len(profiler.stats), 0)
+    def test_collection_methods(self):
+        c = make_collection()
+        with Profiler() as profiler:
+            c.interpolate(spacing=1)
+            c.mean()
+        self.assertEqual(list(profiler.stats),
+                         ['Collection.interpolate', 'Collection.mean'])
+        self.assertEqual(profiler.stats['Collection.interpolate']['items'], 3)
+        self.assertIn('Collection.mean', profiler.summary())
+    def test_json(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            with Profiler() as profiler:
+                with stage('a', items=1):
+                    pass
+            path = os.path.join(tmpdir, 'profile.json')
+            profiler.to_json(path)
+            with open(path) as f:
+                result = json.load(f)
+            self.assertEqual(result['stages'][0]['stage'], 'a')
+            self.assertEqual(result['stages'][0]['calls'], 1)
+        finally:
+            shutil.rmtree(tmpdir)
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import os
+import sys
+import threading
+import numpy as np
+import pandas as pd
+import unittest
+from PyQt5 import QtCore
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.spectrum import Spectrum
+from specdal.containers.collection import Collection
+import specdal.operators as op
+from specdal.gui.pyqt.jobs import JobQueue, map_operator
+
+def make_collection(n=5):
+    # two detectors overlapping from 400 to 410 nm
+    wavelengths = np.concatenate((np.arange(350., 411.), np.arange(400., 451.)))
+    return Collection(name='c', spectra=[
+        Spectrum(name='s{}'.format(i),
+                 measurement=pd.Series(i + np.zeros(len(wavelengths)),
+                                       index=pd.Index(wavelengths, name='wavelength'),
+                                       name='pct_reflect'))
+        for i in range(n)])
+
+class jobQueueTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    def setUp(self):
+        self.events = []
+        self.ended = threading.Event()
+        self.queue = JobQueue()
+        self.queue.progress.connect(lambda *args: self.events.append(('progress',) + args))
+        for name in ('done', 'cancelled', 'failed'):
+            getattr(self.queue, name).connect(self._ender(name))
+        self.c = make_collection()
+        self.c.flag('s1')
+        self.queue.set_collection(self.c)
+        self.queue.start()
+    def tearDown(self):
+        self.queue.stop()
+    def _ender(self, name):
+        def slot(*args):
+            self.events.append((name,) + args)
+            self.ended.set()
+        return slot
+    def wait(self):
+        # signals are delivered by the event loop of this thread
+        for _ in range(1000):
+            self.app.processEvents()
+            if self.ended.wait(0.01):
+                break
+        self.assertTrue(self.ended.is_set())
+        self.ended.clear()
+        return self.events[-1]
+    def test_done(self):
+        self.queue.submit('stitch', map_operator(op.stitch, 'stitched', method='mean'))
+        event = self.wait()
+        self.assertEqual(event[:2], ('done', 'stitch'))
+        result = event[2]
+        # the collection shown is left untouched
+        self.assertEqual(len(self.c.spectra[0].measurement), 112)
+        self.assertFalse(self.c.spectra[0].stitched)
+        self.assertEqual(len(result.spectra[0].measurement), 101)
+        self.assertTrue(result.spectra[0].stitched)
+        self.assertEqual([k for k, v in result.flags.items() if v], ['s1'])
+        self.assertEqual(self.events[-2], ('progress', 'stitch', 5, 5))
+        self.assertIs(self.queue.collection, result)
+        self.assertFalse(self.queue.busy)
+        # the next job starts from the result
+        self.queue.submit('interpolate', map_operator(op.interpolate, spacing=2))
+        self.assertEqual(len(self.wait()[2].spectra[0].measurement), 51)
+    def blocking_step(self, started, collection, job):
+        started.set()
+        while True:
+            job.check()
+            threading.Event().wait(0.01)
+    def test_cancel(self):
+        started = threading.Event()
+        self.queue.submit('block', lambda c, job: self.blocking_step(started, c, job))
+        self.assertTrue(started.wait(10))
+        self.assertTrue(self.queue.busy)
+        self.queue.cancel()
+        self.assertEqual(self.wait(), ('cancelled', 'block'))
+        self.assertIs(self.queue.collection, self.c)
+    def test_replaced(self):
+        started = threading.Event()
+        self.queue.submit('block', lambda c, job: self.blocking_step(started, c, job))
+        self.assertTrue(started.wait(10))
+        other = make_collection(2)
+        self.queue.set_collection(other)
+        self.assertEqual(self.wait(), ('cancelled', 'block'))
+        self.assertIs(self.queue.collection, other)
+    def test_failed(self):
+        def fail(collection, job):
+            raise ValueError("no")
+        self.queue.submit('fail', fail)
+        self.assertEqual(self.wait(), ('failed', 'fail', 'ValueError: no'))
+        self.assertIs(self.queue.collection, self.c)
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
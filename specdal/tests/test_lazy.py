@@ -0,0 +1,124 @@
+import os
+import sys
+import pickle
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas.testing as pdt
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.collection import Collection
+from specdal.containers.lazy import LazySpectrum, LRUCache
+
+# (start, stop, channels) of three detectors overlapping at their edges
+DETECTORS = ((350., 1005., 120), (990., 1905., 150), (1890., 2500., 90))
+
+def write_sig(path, rng, gps_time):
+    """minimal SVC .sig file of radiances with overlapping detectors"""
+    waves = np.concatenate([np.linspace(*d) for d in DETECTORS])
+    reference = 1000. + 500.*np.sin(waves/300.)
+    target = reference*rng.uniform(0.2, 0.6, len(waves))
+    lines = ['/*** Spectra Vista SIG Data ***/',
+             'integration= 100, 100, 100, 100, 100, 100',
+             'units= Radiance, Radiance',
+             'gpstime= {:.2f}, {:.2f}'.format(gps_time - 5, gps_time),
+             'data= ']
+    lines.extend('{:.2f}  {:.2f}  {:.2f}  {:.2f}'.format(w, r, t, 100*t/r)
+                 for w, r, t in zip(waves, reference, target))
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+class lruCacheTests(unittest.TestCase):
+    def test_evict_least_recent(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+    def test_unbounded(self):
+        cache = LRUCache(None)
+        for i in range(10):
+            cache.put(i, i)
+        self.assertEqual(len(cache), 10)
+
+class lazyCollectionTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        directory = os.path.join(cls.tmpdir, 'sig')
+        os.makedirs(directory)
+        rng = np.random.RandomState(0)
+        for i in range(6):
+            write_sig(os.path.join(directory, 'plot{:02d}_{:04d}.sig'.format(i % 2, i)),
+                      rng, gps_time=100000 + 10*i)
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+    def setUp(self):
+        directory = os.path.join(self.tmpdir, 'sig')
+        self.eager = Collection(name='eager', directory=directory)
+        self.lazy = Collection(name='lazy', directory=directory, lazy=True,
+                               cache_size=2)
+    def test_header_only(self):
+        self.assertEqual(len(self.lazy), 6)
+        self.assertEqual(len(self.lazy._cache), 0)
+        self.assertTrue(all(isinstance(s, LazySpectrum)
+                            for s in self.lazy.spectra))
+        for s, t in zip(self.eager.spectra, self.lazy.spectra):
+            self.assertEqual(s.name, t.name)
+            self.assertEqual(s.metadata['gps_time_tgt'],
+                             t.metadata['gps_time_tgt'])
+    def test_bounded_cache(self):
+        pdt.assert_frame_equal(self.eager.data, self.lazy.data)
+        self.assertEqual(len(self.lazy._cache), 2)
+        self.assertTrue(self.lazy.spectra[-1].loaded)
+        self.assertFalse(self.lazy.spectra[0].loaded)
+        # read again after eviction
+        pdt.assert_series_equal(self.eager.spectra[0].measurement,
+                                self.lazy.spectra[0].measurement)
+    def test_operators_replayed(self):
+        for c in (self.eager, self.lazy):
+            c.stitch()
+            c.interpolate()
+            c.derivative()
+        self.assertTrue(all(s.stitched and s.interpolated
+                            for s in self.lazy.spectra))
+        pdt.assert_frame_equal(self.eager.data, self.lazy.data)
+        # evicted spectra are read and processed again
+        pdt.assert_series_equal(self.eager.spectra[0].measurement,
+                                self.lazy.spectra[0].measurement)
+    def test_assigned_measurement_kept(self):
+        spectrum = self.lazy.spectra[0]
+        measurement = spectrum.measurement*2
+        spectrum.measurement = measurement
+        self.lazy.data
+        self.assertIs(spectrum.measurement, measurement)
+    def test_dtype(self):
+        self.lazy.set_dtype('float32')
+        self.assertEqual(self.lazy.spectra[0].measurement.dtype, 'float32')
+    def test_subset_shares_cache(self):
+        self.lazy.data
+        loaded = [s.loaded for s in self.lazy.spectra]
+        self.lazy.flag(self.lazy.spectra[0].name)
+        subset = self.lazy.as_unflagged()
+        self.assertIs(subset._cache, self.lazy._cache)
+        self.assertEqual([s.loaded for s in self.lazy.spectra], loaded)
+        self.assertEqual(len(subset), 5)
+    def test_pickle(self):
+        self.lazy.stitch()
+        self.lazy.data
+        restored = pickle.loads(pickle.dumps(self.lazy))
+        self.assertEqual(len(restored._cache), 0)
+        self.assertIs(restored.spectra[0]._cache, restored._cache)
+        pdt.assert_frame_equal(self.lazy.data, restored.data)
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
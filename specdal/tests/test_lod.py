@@ -0,0 +1,140 @@
+import os
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.spectrum import Spectrum
+from specdal.containers.collection import Collection
+from specdal.gui.lod import LevelOfDetail
+from specdal.gui.collection_artist import CollectionArtist
+
+class levelOfDetailTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.x = np.arange(350., 2501.)
+        self.y = rng.normal(size=(5, len(self.x)))
+        self.lod = LevelOfDetail([self.x]*5, list(self.y))
+    def test_full_resolution(self):
+        segments = self.lod.segments([3, 1])
+        np.testing.assert_array_equal(segments[0][:, 0], self.x)
+        np.testing.assert_array_equal(segments[0][:, 1], self.y[3])
+        np.testing.assert_array_equal(segments[1][:, 1], self.y[1])
+    def test_envelope(self):
+        view = self.lod.view((350, 2500), 100)
+        level = view[0][0]
+        self.assertGreaterEqual(level, 2)
+        segments = self.lod.segments([2], view)
+        self.assertLess(len(segments[0]), len(self.x)/2)
+        # the envelope spans the values of the data
+        self.assertEqual(segments[0][:, 1].min(), self.y[2].min())
+        self.assertEqual(segments[0][:, 1].max(), self.y[2].max())
+        self.assertEqual(segments[0][0, 0], self.x[0])
+        self.assertEqual(segments[0][-1, 0], self.x[-1])
+        # every bin holds the extrema of its wavelengths
+        bins = len(segments[0])//2
+        for j in range(bins):
+            values = self.y[2][j << level:(j + 1) << level]
+            self.assertEqual(segments[0][2*j, 1], values.min())
+            self.assertEqual(segments[0][2*j + 1, 1], values.max())
+    def test_clipping(self):
+        view = self.lod.view((1000, 1010), 800)
+        self.assertEqual(view[0][0], 0)
+        segments = self.lod.segments([0], view)
+        np.testing.assert_array_equal(segments[0][:, 0], np.arange(999., 1012.))
+        self.assertEqual(view, self.lod.view((999.8, 1010.2), 800))
+        self.assertNotEqual(view, self.lod.view((1000, 1100), 800))
+    def test_groups(self):
+        x = np.arange(400., 410.)
+        lod = LevelOfDetail([x, self.x, x], [np.ones(10), self.y[0], np.zeros(10)])
+        segments = lod.segments()
+        self.assertEqual([len(s) for s in segments], [10, len(self.x), 10])
+        self.assertEqual(segments[2][0, 1], 0)
+        self.assertEqual(lod.bounds, (350., self.y[0].min(), 2500., self.y[0].max()))
+
+def crosses(x, y, x0, x1, y0, y1):
+    """Whether the line through points (x, y) crosses a rectangle"""
+    for i in range(len(x) - 1):
+        xa, xb, ya, yb = x[i], x[i + 1], y[i], y[i + 1]
+        if xb <= xa:
+            continue
+        # clip the segment to [x0, x1]
+        ta, tb = max((x0 - xa)/(xb - xa), 0), min((x1 - xa)/(xb - xa), 1)
+        if ta > tb:
+            continue
+        ys = ya + (yb - ya)*ta, ya + (yb - ya)*tb
+        if max(ys) >= y0 and min(ys) <= y1:
+            return True
+    return False
+
+class inBoxTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.RandomState(1)
+        self.x = np.arange(400., 500.)
+        self.y = np.cumsum(rng.normal(size=(200, len(self.x))), axis=1)
+        self.lod = LevelOfDetail([self.x]*200, list(self.y), min_bins=4)
+    def test_against_segments(self):
+        rng = np.random.RandomState(2)
+        for _ in range(50):
+            x0, x1 = sorted(rng.uniform(395, 505, 2))
+            y0, y1 = sorted(rng.uniform(-15, 15, 2))
+            expected = [crosses(self.x, y, x0, x1, y0, y1) for y in self.y]
+            np.testing.assert_array_equal(self.lod.in_box(x0, x1, y0, y1),
+                                          expected)
+    def test_between_points(self):
+        x = np.array([0., 10.])
+        lod = LevelOfDetail([x, x], [np.array([0., 10.]), np.array([10., 0.])])
+        # a small box on the first line, between its two points
+        self.assertEqual(list(lod.in_box(4.9, 5.1, 5.2, 5.3)), [False, False])
+        self.assertEqual(list(lod.in_box(4.9, 5.1, 4.95, 5.05)), [True, True])
+        self.assertEqual(list(lod.in_box(1.9, 2.1, 1.8, 2.2)), [True, False])
+    def test_unstitched(self):
+        # overlapping detectors: the wavelengths go back at 1000
+        x = np.concatenate((np.arange(900., 1011.), np.arange(1000., 1101.)))
+        y = np.concatenate((np.zeros(111), np.ones(101)))
+        lod = LevelOfDetail([x], [y])
+        self.assertTrue(lod.in_box(1005, 1006, -0.1, 0.1)[0])
+        self.assertTrue(lod.in_box(1005, 1006, 0.9, 1.1)[0])
+        self.assertFalse(lod.in_box(1005, 1006, 0.4, 0.6)[0])
+    def test_nan(self):
+        x = np.arange(10.)
+        y = np.where(x < 5, np.nan, 1.)
+        lod = LevelOfDetail([x], [y])
+        self.assertFalse(lod.in_box(0, 3, -10, 10)[0])
+        self.assertTrue(lod.in_box(0, 6, -10, 10)[0])
+
+class collectionArtistLodTests(unittest.TestCase):
+    def test_follows_xlim(self):
+        c = Collection(name='c')
+        x = pd.Index(np.arange(350., 2501.), name='wavelength')
+        for i in range(3):
+            c.append(Spectrum(name=str(i),
+                              measurement=pd.Series(np.sin(x.values/(i + 1.)),
+                                                    index=x),
+                              measure_type='pct_reflect'))
+        ax = Figure(figsize=(4, 3), dpi=50).add_subplot(111)
+        artist = CollectionArtist(ax, c)
+        ax.set_xlim(350, 2500)
+        coarse = artist.lines.get_segments()
+        self.assertEqual(len(coarse), 3)
+        self.assertLess(len(coarse[0]), len(x)/2)
+        ax.set_xlim(1000, 1020)
+        fine = artist.lines.get_segments()
+        np.testing.assert_array_equal(fine[1][:, 0], np.arange(999., 1022.))
+        artist.flagged[1] = True
+        artist.show_flagged = False
+        artist.update()
+        self.assertEqual(len(artist.lines.get_segments()), 2)
+        self.assertEqual(artist.in_box(1000, 1001, -2, 2), ['0', '1', '2'])
+        self.assertEqual(artist.in_box(1000, 1001, 1.5, 2), [])
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import os
+import re
+import sys
+import numpy as np
+import unittest
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.gui.name_index import NameIndex, runs
+
+NAMES = ['site1_plot01_a', 'site1_plot02_b', 'site2_plot01_a',
+         'white_ref', 'site2_plot10_b', 'x']
+
+class nameIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.index = NameIndex(NAMES)
+    def expected(self, pattern):
+        return [re.search(pattern, name, re.MULTILINE) is not None
+                for name in NAMES]
+    def test_search(self):
+        for pattern in ['plot01', '^site2', 'a$', r'_\w$', 'b|ref',
+                        r'plot\d0', 'x', 'nothing', '', 'z*',
+                        # matches over the joined names, searched one by one
+                        r'a\nsite', r'a\ssite', '[^_]*_ref', r'\Asite',
+                        r'a\Z', r'(?<=t)e', r'1(?!_)', '(?s)b.x']:
+            np.testing.assert_array_equal(self.index.search(pattern),
+                                          self.expected(pattern),
+                                          err_msg=pattern)
+    def test_invalid(self):
+        with self.assertRaises(re.error):
+            self.index.search('plot(')
+    def test_empty(self):
+        self.assertEqual(len(NameIndex([]).search('a')), 0)
+    def test_groups(self):
+        self.index.set_group([0, 1], 'one')
+        self.index.set_group(np.array([False, True, True, False, False, False]),
+                             'two')
+        np.testing.assert_array_equal(np.flatnonzero(self.index.in_group('one')), [0])
+        np.testing.assert_array_equal(np.flatnonzero(self.index.in_group('two')), [1, 2])
+        self.assertFalse(self.index.in_group('--').any())
+        self.assertEqual(self.index.label(2), 'site2_plot01_a (two)')
+        self.index.set_group([2], None)
+        self.assertEqual(self.index.label(2), 'site2_plot01_a')
+    def test_runs(self):
+        mask = np.array([True, True, False, True, False, False, True])
+        self.assertEqual(runs(mask), [(0, 2), (3, 4), (6, 7)])
+        self.assertEqual(runs(np.zeros(3, dtype=bool)), [])
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
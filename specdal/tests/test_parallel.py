@@ -0,0 +1,93 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import unittest
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.spectrum import Spectrum
+from specdal.containers.collection import Collection
+from specdal import parallel
+
+def make_collection(n=6):
+    wavelengths = np.arange(350, 450, 1.5)
+    rng = np.random.RandomState(0)
+    return Collection(name='c1', spectra=[
+        Spectrum(name='s{}'.format(i),
+                 measurement=pd.Series(rng.rand(len(wavelengths)),
+                                       index=pd.Index(wavelengths, name='wavelength'),
+                                       name='pct_reflect'))
+        for i in range(n)])
+
+class parallelTests(unittest.TestCase):
+    def setUp(self):
+        self.defaults = parallel.PROCESSES, parallel.MIN_SPECTRA
+        parallel.set_processes(1, min_spectra=0)
+    def tearDown(self):
+        parallel.set_processes(*self.defaults)
+        parallel.shutdown()
+    def assertSameSpectra(self, c1, c2):
+        for s1, s2 in zip(c1.spectra, c2.spectra):
+            self.assertEqual(s1.name, s2.name)
+            pd.testing.assert_series_equal(s1.measurement, s2.measurement)
+            self.assertEqual(s1.interpolated, s2.interpolated)
+    def test_interpolate(self):
+        serial, pooled = make_collection(), make_collection()
+        serial.interpolate(spacing=1)
+        pooled.interpolate(spacing=1, processes=2)
+        self.assertSameSpectra(serial, pooled)
+        self.assertTrue(pooled.spectra[0].interpolated)
+    def test_spawn(self):
+        # workers started by spawn import specdal afresh instead of
+        # inheriting the parent, as on macOS and Windows
+        start_method = parallel.START_METHOD
+        parallel.START_METHOD = 'spawn'
+        try:
+            serial, pooled = make_collection(), make_collection()
+            serial.interpolate(spacing=1)
+            pooled.interpolate(spacing=1, processes=2)
+            self.assertSameSpectra(serial, pooled)
+            self.assertEqual(parallel._pool_processes, (2, 'spawn'))
+        finally:
+            parallel.START_METHOD = start_method
+    def test_global_processes(self):
+        serial, pooled = make_collection(), make_collection()
+        serial.jump_correct(splices=[400], reference=0)
+        parallel.set_processes(2)
+        pooled.jump_correct(splices=[400], reference=0)
+        self.assertSameSpectra(serial, pooled)
+        self.assertTrue(pooled.spectra[0].jump_corrected)
+    def test_imap_chunks(self):
+        c = make_collection(7)
+        import specdal.operators as op
+        for processes in (1, 2):
+            chunks = list(parallel.imap_spectra(op.interpolate, c.spectra,
+                                                processes, chunksize=3,
+                                                spacing=1))
+            self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+            expected = [op.interpolate(s.measurement, spacing=1)
+                        for s in c.spectra]
+            for s1, s2 in zip(expected, sum(chunks, [])):
+                pd.testing.assert_series_equal(s1, s2)
+    def test_resolve_processes(self):
+        parallel.set_processes(4, min_spectra=100)
+        self.assertEqual(parallel.resolve_processes(None, 10), 1)
+        self.assertEqual(parallel.resolve_processes(None, 100), 4)
+        self.assertEqual(parallel.resolve_processes(2, 100), 2)
+    def test_encode_mixed_wavelengths(self):
+        c = make_collection(3)
+        c.spectra[1].interpolate(spacing=1)
+        series = [s.measurement for s in c.spectra]
+        blocks = parallel._encode([s.name for s in c.spectra], series)
+        self.assertEqual(len(blocks), 3)
+        names, decoded = parallel._decode(blocks)
+        self.assertEqual(names, ['s0', 's1', 's2'])
+        for s1, s2 in zip(series, decoded):
+            pd.testing.assert_series_equal(s1, s2)
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
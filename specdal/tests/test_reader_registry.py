@@ -0,0 +1,50 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.readers import ReaderRegistry, SUPPORTED_READERS, read, \
+        register_reader
+
+def fake_reader(filepath, read_data=True, read_metadata=True, verbose=False):
+    return 'data', {'file': filepath}
+
+class readerRegistryTests(unittest.TestCase):
+    def setUp(self):
+        pass
+    def test_builtin_extensions(self):
+        for ext in ('.asd', '.sig', '.sed', '.pico', '.light', '.dark'):
+            self.assertTrue(ext in SUPPORTED_READERS)
+        self.assertFalse('.foo' in SUPPORTED_READERS)
+    def test_lazy_resolution(self):
+        registry = ReaderRegistry({'.x': 'os.path:basename'}, group=None)
+        # stored as a string until looked up
+        self.assertTrue(isinstance(registry._readers['.x'], str))
+        self.assertTrue(registry['.x'] is os.path.basename)
+        self.assertTrue(registry._readers['.x'] is os.path.basename)
+    def test_extension_normalized(self):
+        registry = ReaderRegistry({'x': fake_reader}, group=None)
+        self.assertTrue('.X' in registry)
+        self.assertTrue(registry['.x'] is fake_reader)
+    def test_unknown_extension(self):
+        registry = ReaderRegistry({'.x': fake_reader}, group=None)
+        self.assertRaises(KeyError, lambda: registry['.y'])
+        self.assertEqual(list(registry), ['.x'])
+        self.assertEqual(len(registry), 1)
+    def test_register_reader(self):
+        register_reader('.fake', fake_reader)
+        try:
+            with tempfile.NamedTemporaryFile(suffix='.fake') as f:
+                data, meta = read(f.name)
+                self.assertEqual(data, 'data')
+                self.assertEqual(meta['file'], f.name)
+        finally:
+            del SUPPORTED_READERS._readers['.fake']
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.spectrum import Spectrum
+from specdal.containers.collection import Collection
+from specdal.operators import resample_bands, band_matrix, read_bands
+
+class resampleBandsTests(unittest.TestCase):
+    def setUp(self):
+        index = pd.Index(np.arange(400., 1001.), name='wavelength')
+        self.s1 = pd.Series(0.2 + 1e-4*index.values, index=index,
+                            name='pct_reflect')
+    def test_gaussian(self):
+        matrix, centers = band_matrix(self.s1.index, [500., 700.], [10., 40.])
+        self.assertTrue(np.allclose(matrix.sum(axis=1), 1))
+        # symmetric bands average a line to its value at the center
+        result = resample_bands(self.s1, [500., 700.], [10., 40.])
+        pdt.assert_index_equal(result.index, pd.Index([500., 700.],
+                                                      name='wavelength'))
+        self.assertTrue(np.allclose(result.values, 0.2 + 1e-4*centers))
+    def test_matrix_reused(self):
+        first = band_matrix(self.s1.index, [500.], [10.])[0]
+        self.assertIs(band_matrix(self.s1.index.copy(), [500.], [10.])[0],
+                      first)
+    def test_srf(self):
+        # a box response averages the band
+        srf = pd.DataFrame({'b1': [0., 1., 1., 0.]},
+                           index=[599.5, 600., 610., 610.5])
+        result = resample_bands(self.s1, srf=srf)
+        self.assertAlmostEqual(result.index[0], 605.)
+        self.assertAlmostEqual(result.iloc[0], self.s1.loc[600:610].mean(),
+                               places=4)
+    def test_outside(self):
+        result = resample_bands(self.s1, [500., 2000.], [10., 10.])
+        self.assertTrue(np.isnan(result.iloc[1]))
+    def test_sensor(self):
+        result = resample_bands(self.s1, sensor='sentinel2a')
+        self.assertEqual(len(result), 13)
+        # band 9 (945 nm) is covered, band 10 (1373 nm) is not
+        self.assertFalse(np.isnan(result.iloc[9]))
+        self.assertTrue(np.isnan(result.iloc[10]))
+    def test_collection(self):
+        c = Collection(name='c')
+        for i in range(3):
+            c.append(Spectrum(name=str(i), measurement=self.s1*(i + 1),
+                              measure_type='pct_reflect'))
+        expected = [resample_bands(s.measurement, sensor='landsat8')
+                    for s in c.spectra]
+        c.resample_bands(sensor='landsat8')
+        for s, e in zip(c.spectra, expected):
+            pdt.assert_series_equal(s.measurement, e)
+    def test_read_bands(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'bands.csv')
+            with open(path, 'w') as f:
+                f.write('Center,FWHM\n500,10\n600,20\n')
+            bands = read_bands(path)
+            self.assertEqual(list(bands['centers']), [500, 600])
+            self.assertEqual(list(bands['fwhm']), [10, 20])
+            with open(path, 'w') as f:
+                f.write('wavelength,b1,b2\n500,1,0\n501,1,1\n502,0,1\n')
+            srf = read_bands(path)['srf']
+            self.assertEqual(list(srf.columns), ['b1', 'b2'])
+        finally:
+            shutil.rmtree(tmpdir)
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
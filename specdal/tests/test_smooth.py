@@ -0,0 +1,59 @@
+import os
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.spectrum import Spectrum
+from specdal.containers.collection import Collection
+from specdal.operators import smooth, smoothing_kernel
+
+class smoothTests(unittest.TestCase):
+    def setUp(self):
+        index = pd.Index(np.arange(400., 600., 2.), name='wavelength')
+        rng = np.random.default_rng(0)
+        self.line = pd.Series(0.1 + 1e-3*index.values, index=index,
+                              name='pct_reflect')
+        self.noisy = self.line + rng.normal(0, 0.01, len(index))
+    def test_kernels(self):
+        for method in ('savgol', 'mean', 'gaussian'):
+            kernel = smoothing_kernel(method, 10, 2.)
+            # 10 nm at 2 nm spacing
+            self.assertEqual(len(kernel), 5)
+            self.assertAlmostEqual(kernel.sum(), 1)
+        self.assertEqual(len(smoothing_kernel('mean', 10, 1.)), 11)
+        # computed once per spacing
+        self.assertIs(smoothing_kernel('gaussian', 10, 2.),
+                      smoothing_kernel('gaussian', 10, 2.))
+    def test_preserve_line(self):
+        # interior of a straight line is unchanged by symmetric kernels
+        for method in ('savgol', 'mean', 'gaussian'):
+            result = smooth(self.line, method=method, window=10)
+            self.assertTrue(np.allclose(result.values[3:-3],
+                                        self.line.values[3:-3]))
+    def test_reduce_noise(self):
+        for method in ('savgol', 'mean', 'gaussian'):
+            result = smooth(self.noisy, method=method, window=20)
+            self.assertLess((result - self.line).std(),
+                            (self.noisy - self.line).std())
+    def test_uneven(self):
+        with self.assertRaises(ValueError):
+            smooth(self.line.iloc[[0, 1, 3, 4, 5]])
+    def test_collection(self):
+        c = Collection(name='c')
+        for i in range(3):
+            c.append(Spectrum(name=str(i), measurement=self.noisy*(i + 1),
+                              measure_type='pct_reflect'))
+        expected = [smooth(s.measurement, 'gaussian', 20) for s in c.spectra]
+        c.smooth(method='gaussian', window=20)
+        for s, e in zip(c.spectra, expected):
+            pdt.assert_series_equal(s.measurement, e)
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import shutil
+import struct
+import tempfile
+import numpy as np
+import unittest
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.readers import read, get_reader_ext
+from specdal.readers.sniff import sniff, sniff_bytes
+from specdal.containers.collection import Collection
+
+SED_CONTENT = '\n'.join([
+    'Comment: ',
+    'Version: 2.3 [1.2.6286]',
+    'File Name: test.sed',
+    'Instrument: PSR-3500 (SN: 1234)',
+    'Measurement: REFLECTANCE',
+    'Integration: 10,10,10',
+    'GPS Time: n/a',
+    'Wavelength Range: 1,4',
+    'Data:',
+    'Wvl\tReflect. %',
+    '1\t10.0',
+    '2\t20.0',
+    '3\t30.0',
+    '4\t40.0',
+    ''])
+
+def write_asd(path, channels=4):
+    """minimal as7 file of raw counts with a white reference"""
+    header = bytearray(484)
+    header[0:3] = b'as7'
+    struct.pack_into('f', header, 191, 350.)
+    struct.pack_into('f', header, 195, 1.)
+    struct.pack_into('h', header, 204, channels)
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(np.full(channels, 50, dtype='<f4').tobytes())
+        f.write(bytearray(20))
+        f.write(np.full(channels, 100, dtype='<f4').tobytes())
+
+class sniffTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        for fname in ('a.sed', 'b.sed.bak', 'c.txt'):
+            with open(os.path.join(self.tmpdir, fname), 'w') as f:
+                f.write(SED_CONTENT)
+        with open(os.path.join(self.tmpdir, 'notes.txt'), 'w') as f:
+            f.write('field notes\n')
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+    def test_sniff_bytes(self):
+        self.assertEqual(sniff_bytes(b'as7 binary'), '.asd')
+        self.assertEqual(sniff_bytes(b'/*** Spectra Vista SIG Data ***/\n'),
+                         '.sig')
+        self.assertEqual(sniff_bytes(SED_CONTENT.encode()), '.sed')
+        self.assertEqual(sniff_bytes(b'  {"Spectra": []}'), '.pico')
+        self.assertEqual(sniff_bytes(b'field notes'), None)
+    def test_sniff_file(self):
+        self.assertEqual(sniff(os.path.join(self.tmpdir, 'c.txt')), '.sed')
+        self.assertEqual(sniff(os.path.join(self.tmpdir, 'notes.txt')), None)
+        self.assertEqual(sniff(os.path.join(self.tmpdir, 'missing')), None)
+    def test_get_reader_ext(self):
+        path = os.path.join(self.tmpdir, 'b.sed.bak')
+        self.assertEqual(get_reader_ext(path), None)
+        self.assertEqual(get_reader_ext(path, sniff=True), '.sed')
+    def test_read_sniff(self):
+        path = os.path.join(self.tmpdir, 'c.txt')
+        self.assertRaises(AssertionError, read, path)
+        data, meta = read(path, sniff=True)
+        self.assertEqual(list(data['pct_reflect']), [.1, .2, .3, .4])
+    def test_collection_read_sniff(self):
+        c = Collection(name='c', directory=self.tmpdir)
+        self.assertEqual([s.name for s in c.spectra], ['a'])
+        c = Collection(name='c', directory=self.tmpdir, sniff=True)
+        self.assertEqual([s.name for s in c.spectra], ['a', 'b.sed', 'c'])
+    def test_collection_read_upper_case(self):
+        directory = os.path.join(self.tmpdir, 'upper')
+        os.makedirs(directory)
+        write_asd(os.path.join(directory, 'd.ASD'))
+        write_asd(os.path.join(directory, 'e.asd.bak'))
+        for sniff_content in (False, True):
+            c = Collection(name='c', directory=directory, sniff=sniff_content)
+            self.assertIn('d', c)
+        self.assertEqual(len(c.spectra), 2)
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
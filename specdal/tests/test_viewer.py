@@ -0,0 +1,82 @@
+import os
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.spectrum import Spectrum
+from specdal.containers.collection import Collection
+from specdal.gui.viewer import Viewer
+from specdal.gui.virtual_list import VirtualListbox, ListWindow
+# viewer selects TkAgg when imported; draw off screen instead
+matplotlib.use('Agg')
+
+class Listbox(VirtualListbox):
+    """VirtualListbox without Tk widgets"""
+    def __init__(self, color):
+        self.rows = ListWindow()
+        self.color = color
+    def refresh(self):
+        pass
+
+class Label(object):
+    def config(self, **kwargs):
+        self.text = kwargs['text']
+
+class Navbar(object):
+    def setHome(self, *lims):
+        pass
+
+def make_viewer(collection):
+    """A Viewer drawing on an Agg canvas, without a Tk window"""
+    viewer = Viewer.__new__(Viewer)
+    viewer.fig = Figure()
+    viewer.canvas = FigureCanvasAgg(viewer.fig)
+    viewer.ax = viewer.fig.add_subplot(111)
+    viewer.listbox = Listbox(viewer.list_color)
+    viewer.sblabel = Label()
+    viewer.navbar = Navbar()
+    viewer.spectrum_mode = False
+    viewer.show_flagged = True
+    viewer.artist_dict = {}
+    viewer._selected = set()
+    viewer._draw_job = None
+    viewer.color = '#000000'
+    viewer.after = lambda ms, function: None
+    viewer.after_cancel = lambda job: None
+    for stat in ('mean', 'median', 'max', 'min', 'std'):
+        setattr(viewer, stat, False)
+    viewer._collection = collection
+    viewer.head = 0
+    viewer.update_list()
+    return viewer
+
+class viewerTests(unittest.TestCase):
+    def setUp(self):
+        index = pd.Index(np.arange(400., 410.), name='wavelength')
+        self.c = Collection(name='c', spectra=[
+            Spectrum(name='s{}'.format(i),
+                     measurement=pd.Series(i + np.zeros(10), index=index),
+                     measure_type='pct_reflect')
+            for i in range(3)])
+        self.viewer = make_viewer(self.c)
+    def test_next_spectrum(self):
+        self.viewer.spectrum_mode = True
+        self.viewer.update_artists(new_lim=True)
+        self.assertEqual(list(self.viewer.artist_dict), ['s0'])
+        self.viewer.next_spectrum()
+        self.assertEqual(list(self.viewer.artist_dict), ['s1'])
+        self.c.flag('s2')
+        self.viewer.next_spectrum()
+        self.assertEqual(self.viewer.artist_dict['s2'].get_color(), 'red')
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import unittest
+from PyQt5 import QtCore
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.spectrum import Spectrum
+from specdal.containers.collection import Collection
+from specdal.gui.virtual_list import ListWindow
+from specdal.gui.pyqt.list_model import SpectrumListModel
+
+NAMES = ['s{}'.format(i) for i in range(100)]
+
+class listWindowTests(unittest.TestCase):
+    def setUp(self):
+        self.rows = ListWindow(NAMES, visible=10)
+    def test_window(self):
+        self.assertEqual(self.rows.window, range(0, 10))
+        self.rows.scroll_to(95)
+        self.assertEqual(self.rows.window, range(90, 100))
+        self.rows.scroll_to(-5)
+        self.assertEqual(self.rows.top, 0)
+        self.assertEqual(ListWindow(NAMES[:3]).window, range(0, 3))
+    def test_yview(self):
+        self.rows.yview('scroll', 2, 'pages')
+        self.assertEqual(self.rows.top, 20)
+        self.rows.yview('scroll', -1, 'units')
+        self.assertEqual(self.rows.top, 19)
+        self.rows.yview('moveto', '0.5')
+        self.assertEqual(self.rows.top, 50)
+        self.assertEqual(self.rows.fractions(), (0.5, 0.6))
+    def test_see(self):
+        self.rows.see(25)
+        self.assertEqual(self.rows.window, range(16, 26))
+        self.rows.see(3)
+        self.assertEqual(self.rows.top, 3)
+    def test_click(self):
+        self.rows.click(5)
+        self.rows.click(8, shift=True)
+        self.assertEqual(list(np.flatnonzero(self.rows.selected)), [5, 6, 7, 8])
+        self.rows.click(20, control=True)
+        self.rows.click(6, control=True)
+        self.assertEqual(list(np.flatnonzero(self.rows.selected)), [5, 7, 8, 20])
+        self.rows.click(2)
+        self.assertEqual(list(np.flatnonzero(self.rows.selected)), [2])
+    def test_move_to_top(self):
+        self.rows.selected[[4, 9]] = True
+        self.rows.move_to_top([4, 9])
+        self.assertEqual(self.rows.names[:3], ['s4', 's9', 's0'])
+        self.assertEqual(list(np.flatnonzero(self.rows.selected)), [0, 1])
+        self.assertEqual(sorted(self.rows.names), sorted(NAMES))
+
+class spectrumListModelTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    def setUp(self):
+        self.collection = Collection(name='c', spectra=[
+            Spectrum(name=name, measurement=pd.Series([0., 1.], index=[400., 401.]))
+            for name in NAMES[:5]])
+        self.model = SpectrumListModel()
+        self.model.set_collection(self.collection)
+        self.changed = []
+        self.model.dataChanged.connect(
+            lambda first, last: self.changed.append((first.row(), last.row())))
+    def text(self, row, role=QtCore.Qt.DisplayRole):
+        return self.model.data(self.model.index(row), role)
+    def test_rows(self):
+        self.assertEqual(self.model.rowCount(), 5)
+        self.assertEqual(self.text(3), 's3')
+        self.model.names.set_group([3], 'g')
+        self.assertEqual(self.text(3), 's3 (g)')
+    def test_flags(self):
+        self.collection.flag(['s1'])
+        self.assertIsNotNone(self.text(1, QtCore.Qt.ForegroundRole))
+        self.assertIsNone(self.text(2, QtCore.Qt.ForegroundRole))
+    def test_rows_changed(self):
+        self.model.rows_changed([1, 2, 4])
+        self.assertEqual(self.changed, [(1, 2), (4, 4)])
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import os
+import sys
+import shutil
+import tempfile
+import pandas as pd
+import unittest
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.spectrum import Spectrum
+from specdal.containers.collection import Collection
+from specdal.watch import FolderWatcher, IncrementalPipeline
+
+def make_collection(name, paths):
+    return Collection(name=name, spectra=[
+        Spectrum(name=os.path.splitext(os.path.basename(path))[0],
+                 measurement=pd.Series([1., 2.], index=[400., 401.]))
+        for path in paths])
+
+class folderWatcherTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.write('old.asd', 'a')
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+    def write(self, name, text, mode='w'):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, mode) as f:
+            f.write(text)
+        return path
+    def test_ignore_existing(self):
+        watcher = FolderWatcher(self.tmpdir)
+        self.assertEqual(watcher.poll(), [])
+        self.assertEqual(watcher.poll(), [])
+    def test_report_existing(self):
+        watcher = FolderWatcher(self.tmpdir, ignore_existing=False)
+        watcher.poll()
+        self.assertEqual(watcher.poll(),
+                         [os.path.join(self.tmpdir, 'old.asd')])
+    def test_new_file_once_complete(self):
+        watcher = FolderWatcher(self.tmpdir)
+        path = self.write('new.asd', 'a')
+        # first seen, may still be written
+        self.assertEqual(watcher.poll(), [])
+        self.write('new.asd', 'b', mode='a')
+        self.assertEqual(watcher.poll(), [])
+        self.assertEqual(watcher.poll(), [path])
+        # reported once
+        self.assertEqual(watcher.poll(), [])
+
+class incrementalPipelineTests(unittest.TestCase):
+    def setUp(self):
+        self.joins = []
+    def process(self, paths):
+        return make_collection('new', paths)
+    def join(self, base, target):
+        # stands for the proximal join: one spectrum per target
+        self.joins.append(([s.name for s in base.spectra],
+                           [s.name for s in target.spectra]))
+        return make_collection('joined', [s.name for s in target.spectra])
+    def make_pipeline(self, base=True):
+        target = make_collection('target', ['t1'])
+        if not base:
+            return IncrementalPipeline(target, target, self.process)
+        return IncrementalPipeline(target, self.join(make_collection('base', ['b1']), target),
+                                   self.process, base=make_collection('base', ['b1']),
+                                   process_base=self.process, join=self.join)
+    def names(self, c):
+        return [s.name for s in c.spectra]
+    def test_new_target(self):
+        pipeline = self.make_pipeline(base=False)
+        c = pipeline.update(['/data/t2.asd'])
+        self.assertEqual(self.names(c), ['t1', 't2'])
+        self.assertIs(c, pipeline.target)
+    def test_new_target_joined_alone(self):
+        pipeline = self.make_pipeline()
+        c = pipeline.update(['/data/t2.asd'])
+        self.assertEqual(self.names(c), ['t1', 't2'])
+        self.assertEqual(self.joins[-1], (['b1'], ['t2']))
+        self.assertEqual(self.names(pipeline.target), ['t1', 't2'])
+    def test_new_base_rejoins(self):
+        pipeline = self.make_pipeline()
+        c = pipeline.update(['/data/t2.asd'], ['/base/b2.asd'])
+        self.assertEqual(self.joins[-1], (['b1', 'b2'], ['t1', 't2']))
+        self.assertEqual(self.names(c), ['t1', 't2'])
+        self.assertEqual(self.names(pipeline.base), ['b1', 'b2'])
+    def test_no_changes(self):
+        pipeline = self.make_pipeline()
+        self.assertIsNotNone(pipeline.update(['/data/t2.asd']))
+        joins = len(self.joins)
+        # nothing new, or files already read
+        self.assertIsNone(pipeline.update())
+        self.assertIsNone(pipeline.update(['/data/t2.asd'], ['/base/b1.asd']))
+        self.assertEqual(len(self.joins), joins)
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import os
+import sys
+import shutil
+import tarfile
+import tempfile
+import zipfile
+import numpy as np
+import pandas as pd
+import unittest
+
+sys.path.insert(0, os.path.abspath("../../"))
+from specdal.containers.spectrum import Spectrum
+from specdal.writers import write_csvs, write_pngs
+
+def make_spectra(n):
+    return [Spectrum(name='s{}'.format(i),
+                     measurement=pd.Series([1, 2, 3, i],
+                                           index=pd.Index([1, 2, 3, 4],
+                                                          name='wavelength'),
+                                           name='pct_reflect'))
+            for i in range(n)]
+
+class pngWriterTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+    def test_serial(self):
+        n = write_pngs(make_spectra(3), self.tmpdir, processes=1)
+        self.assertEqual(n, 3)
+        self.assertEqual(sorted(os.listdir(self.tmpdir)),
+                         ['s0.png', 's1.png', 's2.png'])
+    def test_pool(self):
+        n = write_pngs(make_spectra(5), self.tmpdir, ylim=(0, 5),
+                       processes=2, chunksize=2)
+        self.assertEqual(n, 5)
+        self.assertEqual(len(os.listdir(self.tmpdir)), 5)
+    def test_empty(self):
+        self.assertEqual(write_pngs([], self.tmpdir), 0)
+    def test_callback(self):
+        counts = []
+        write_pngs(make_spectra(5), self.tmpdir, processes=1, chunksize=2,
+                   callback=counts.append)
+        self.assertEqual(counts, [2, 4, 5])
+    def test_callback_stops(self):
+        def stop(done):
+            raise KeyboardInterrupt
+        with self.assertRaises(KeyboardInterrupt):
+            write_pngs(make_spectra(5), self.tmpdir, processes=2,
+                       chunksize=1, callback=stop)
+        # only complete files under their final name
+        for name in os.listdir(self.tmpdir):
+            self.assertTrue(name.endswith('.png') or name.endswith('.tmp'))
+
+class csvWriterTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.spectra = make_spectra(3)
+        self.spectra[1].measurement.iloc[0] = np.nan
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+    def expected(self, spectrum):
+        path = os.path.join(self.tmpdir, 'expected.csv')
+        spectrum.to_csv(path)
+        with open(path) as f:
+            return f.read()
+    def test_matches_to_csv(self):
+        outdir = os.path.join(self.tmpdir, 'indiv')
+        os.mkdir(outdir)
+        self.assertEqual(write_csvs(self.spectra, outdir), 3)
+        for s in self.spectra:
+            with open(os.path.join(outdir, s.name + '.csv')) as f:
+                self.assertEqual(f.read(), self.expected(s))
+    def test_threads(self):
+        outdir = os.path.join(self.tmpdir, 'indiv')
+        os.mkdir(outdir)
+        write_csvs(self.spectra, outdir, threads=2)
+        self.assertEqual(sorted(os.listdir(outdir)),
+                         ['s0.csv', 's1.csv', 's2.csv'])
+    def test_callback(self):
+        outdir = os.path.join(self.tmpdir, 'indiv')
+        os.mkdir(outdir)
+        spectra = make_spectra(200)
+        counts = []
+        write_csvs(spectra, outdir, callback=counts.append)
+        self.assertEqual(counts, [64, 128, 192, 200])
+        counts = []
+        write_csvs(spectra, outdir, threads=2, callback=counts.append)
+        self.assertEqual(counts, [128, 200])
+        self.assertEqual(len(os.listdir(outdir)), 200)
+    def test_zip(self):
+        path = os.path.join(self.tmpdir, 'indiv.zip')
+        write_csvs(self.spectra, path)
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(archive.read('s1.csv').decode(),
+                             self.expected(self.spectra[1]))
+    def test_tar(self):
+        path = os.path.join(self.tmpdir, 'indiv.tar.gz')
+        write_csvs(self.spectra, path)
+        with tarfile.open(path) as archive:
+            self.assertEqual(archive.getnames(),
+                             ['s0.csv', 's1.csv', 's2.csv'])
+            self.assertEqual(archive.extractfile('s2.csv').read().decode(),
+                             self.expected(self.spectra[2]))
+
+def main():
+    unittest.main()
+
+
+if __name__ == "__main__":
+    main()
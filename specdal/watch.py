@@ -0,0 +1,142 @@
+# watch.py polls a directory for the files a spectrometer writes during a
+# field campaign, so that they can be processed as they arrive.
+import os
+import time
+from os.path import abspath, expanduser
+
+class FolderWatcher(object):
+    """
+    Poll a directory for new files
+
+    A file is reported once, after its size and modification time did
+    not change between two polls, so files still being written are
+    not read. Polling works on network shares and removable media, where
+    file system notifications are often unavailable.
+
+    Parameters
+    ----------
+    directory: string
+
+    interval: float
+        seconds between polls
+
+    ignore_existing: bool
+        if True, files present when the watcher is created are never
+        reported
+    """
+    def __init__(self, directory, interval=2.0, ignore_existing=True):
+        self.directory = abspath(expanduser(directory))
+        self.interval = interval
+        self._seen = set()
+        self._pending = {}
+        if ignore_existing:
+            self._seen.update(self._stat().keys())
+
+    def _stat(self):
+        result = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    result[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return result
+
+    def poll(self):
+        """
+        Return the sorted paths of the new files that stopped changing
+        since the previous poll
+        """
+        ready = []
+        pending = {}
+        for path, stat in self._stat().items():
+            if path in self._seen:
+                continue
+            if self._pending.get(path) == stat:
+                ready.append(path)
+                self._seen.add(path)
+            else:
+                pending[path] = stat
+        self._pending = pending
+        return sorted(ready)
+
+    def __iter__(self):
+        """
+        Yield the batches of new files, waiting interval seconds between
+        polls. A file is reported within two intervals of its last write.
+        """
+        while True:
+            ready = self.poll()
+            if ready:
+                yield ready
+            time.sleep(self.interval)
+
+def _stem(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+class IncrementalPipeline(object):
+    """
+    The collections of a watched pipeline, updated with each batch of
+    new files
+
+    Parameters
+    ----------
+    target: specdal.Collection
+        processed target spectra
+
+    result: specdal.Collection
+        the spectra written out: target itself without a base, else the
+        join of base and target
+
+    process: callable
+        process(filepaths) returns a collection of the processed target
+        files, post-processed too when there is no base
+
+    base: specdal.Collection or None
+        processed proximal reference spectra
+
+    process_base: callable
+        process_base(filepaths) returns a collection of the processed
+        base files
+
+    join: callable
+        join(base, target) returns the post-processed proximal join
+    """
+    def __init__(self, target, result, process, base=None,
+                 process_base=None, join=None):
+        self.target = target
+        self.result = result
+        self.process = process
+        self.base = base
+        self.process_base = process_base
+        self.join = join
+
+    def update(self, new_files=(), new_base_files=()):
+        """
+        Add the new target and base files and return the updated result,
+        or None if nothing changed. Files named as a spectrum already
+        read are skipped.
+        """
+        new_files = [f for f in new_files if _stem(f) not in self.target]
+        if self.base is not None:
+            new_base_files = [f for f in new_base_files
+                              if _stem(f) not in self.base]
+        if not (new_files or new_base_files):
+            return None
+        new = None
+        if new_files:
+            new = self.process(new_files)
+            for spectrum in new.spectra:
+                self.target.append(spectrum)
+        if new_base_files:
+            for spectrum in self.process_base(new_base_files).spectra:
+                self.base.append(spectrum)
+        if self.base is None:
+            self.result = self.target
+        elif self.target.spectra and self.base.spectra:
+            if new_base_files or not self.result.spectra:
+                # the nearest base measurement may have changed for any target
+                self.result = self.join(self.base, self.target)
+            elif new.spectra:
+                for spectrum in self.join(self.base, new).spectra:
+                    self.result.append(spectrum)
+        return self.result
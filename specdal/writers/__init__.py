@@ -0,0 +1,4 @@
+__all__ = ['csv', 'png', 'write_csvs', 'write_pngs']
+
+from .csv import write_csvs
+from .png import write_pngs
@@ -0,0 +1,130 @@
+# csv.py writes the individual csv file of every spectrum in a collection
+# without building a pandas.DataFrame per spectrum. Output matches
+# Spectrum.to_csv: a header of wavelengths and one row of values.
+import os
+import io
+import time
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from specdal.instrument import stage
+
+ARCHIVE_EXTENSIONS = {
+    '.zip': 'zip',
+    '.tar': 'w',
+    '.tar.gz': 'w:gz',
+    '.tgz': 'w:gz',
+}
+
+def _format_values(values):
+    values = np.asarray(values)
+    strings = values.astype(str)
+    if values.dtype.kind == 'f':
+        # pandas writes missing values as empty fields
+        strings[np.isnan(values)] = ''
+    return ','.join(strings)
+
+class CSVFormatter(object):
+    """
+    Format spectra as csv text, caching the header of the last
+    wavelength axis seen so it is only formatted once per collection.
+    """
+    def __init__(self):
+        self._index = None
+        self._header = None
+
+    def header(self, index):
+        if self._index is None or not (index is self._index or (
+                len(index) == len(self._index) and
+                np.array_equal(index.values, self._index.values))):
+            self._index = index
+            self._header = ',' + _format_values(index.values) + '\n'
+        return self._header
+
+    def format(self, spectrum):
+        measurement = spectrum.measurement
+        label = measurement.name if measurement.name is not None else 0
+        return (self.header(measurement.index) + str(label) + ',' +
+                _format_values(measurement.values) + '\n')
+
+def _archive_mode(path):
+    for ext, mode in ARCHIVE_EXTENSIONS.items():
+        if path.endswith(ext):
+            return mode
+    return None
+
+def _write_file(path, text):
+    # write then rename, so that a file at path is always complete
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def write_csvs(spectra, path, threads=None, callback=None):
+    """
+    Write one csv file per spectrum
+
+    Parameters
+    ----------
+    spectra: list of specdal.Spectrum
+
+    path: string
+        output directory, or an archive path ending in .zip, .tar,
+        .tar.gz or .tgz to stream every file into a single archive
+        (fewer filesystem operations on network shares)
+
+    threads: int
+        number of threads writing files concurrently when path is a
+        directory. Defaults to writing serially.
+
+    callback: callable
+        called with the number of files written so far after each batch
+        of files written to a directory. An exception raised by callback
+        stops the export; files are written under a temporary name and
+        renamed, so every csv present is complete.
+
+    Returns
+    -------
+    number of files written
+    """
+    with stage('write_csvs', items=len(spectra)):
+        return _write_csvs(spectra, path, threads, callback)
+
+def _write_csvs(spectra, path, threads, callback=None):
+    formatter = CSVFormatter()
+    mode = _archive_mode(path)
+    if mode == 'zip':
+        with zipfile.ZipFile(path, 'w') as archive:
+            for s in spectra:
+                archive.writestr(s.name + '.csv', formatter.format(s))
+        return len(spectra)
+    if mode is not None:
+        with tarfile.open(path, mode) as archive:
+            for s in spectra:
+                data = formatter.format(s).encode()
+                info = tarfile.TarInfo(s.name + '.csv')
+                info.size = len(data)
+                info.mtime = time.time()
+                archive.addfile(info, io.BytesIO(data))
+        return len(spectra)
+    jobs = [(os.path.join(path, s.name + '.csv'), s) for s in spectra]
+    if threads is None or threads <= 1:
+        for i, (filepath, s) in enumerate(jobs):
+            _write_file(filepath, formatter.format(s))
+            if callback is not None and ((i + 1) % 64 == 0 or
+                                         i + 1 == len(jobs)):
+                callback(i + 1)
+        return len(jobs)
+    # format a batch at a time so the text of every file is never in memory
+    batch = threads*64
+    with ThreadPoolExecutor(threads) as pool:
+        for i in range(0, len(jobs), batch):
+            texts = [(filepath, formatter.format(s))
+                     for filepath, s in jobs[i:i+batch]]
+            # consume the results to surface any exceptions
+            for _ in pool.map(lambda job: _write_file(*job), texts):
+                pass
+            if callback is not None:
+                callback(min(i + batch, len(jobs)))
+    return len(jobs)
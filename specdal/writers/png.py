@@ -0,0 +1,104 @@
+# png.py renders one figure per spectrum. Each worker process draws into a
+# single reused figure and Line2D instead of building a new figure per file.
+import os
+import multiprocessing
+import numpy as np
+from specdal.instrument import stage
+
+# (figure, axes, line, ylim) of the current process, set by _init_figure
+_figure = None
+
+def _init_figure(ylim=None, xlabel='wavelength'):
+    global _figure
+    # draw with the Agg canvas directly so the caller's backend is untouched
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    line, = ax.plot([], [])
+    ax.set_xlabel(xlabel)
+    _figure = (fig, ax, line, ylim)
+
+def _render(jobs):
+    """Render a list of (path, wavelengths, values) with the reused figure"""
+    fig, ax, line, ylim = _figure
+    for path, x, y in jobs:
+        line.set_data(x, y)
+        ax.relim()
+        ax.autoscale_view()
+        if ylim:
+            ax.set_ylim(*ylim)
+        # write then rename, so that a file at path is always complete
+        fig.savefig(path + '.tmp', format='png', bbox_inches='tight')
+        os.replace(path + '.tmp', path)
+    return len(jobs)
+
+def write_pngs(spectra, directory, ylim=None, processes=None, chunksize=64,
+               callback=None):
+    """
+    Save a line plot of each spectrum to directory/<name>.png
+
+    Parameters
+    ----------
+    spectra: list of specdal.Spectrum
+
+    directory: string
+        existing output directory
+
+    ylim: tuple
+        (ymin, ymax) to force on every figure
+
+    processes: int
+        number of worker processes. Defaults to the number of cpus;
+        1 renders in the calling process.
+
+    chunksize: int
+        number of figures sent to a worker at a time
+
+    callback: callable
+        called with the number of figures written so far after each
+        chunk. An exception raised by callback stops the export and the
+        workers; every png present is complete.
+
+    Returns
+    -------
+    number of figures written
+    """
+    with stage('write_pngs', items=len(spectra)):
+        return _write_pngs(spectra, directory, ylim, processes, chunksize,
+                           callback)
+
+def _write_pngs(spectra, directory, ylim, processes, chunksize,
+                callback=None):
+    if len(spectra) == 0:
+        return 0
+    xlabel = spectra[0].measurement.index.name or ''
+    jobs = [(os.path.join(directory, s.name + '.png'),
+             np.asarray(s.measurement.index, dtype=float),
+             np.asarray(s.measurement.values, dtype=float))
+            for s in spectra]
+    chunks = [jobs[i:i+chunksize] for i in range(0, len(jobs), chunksize)]
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(processes, len(chunks))
+    done = 0
+    if processes <= 1:
+        global _figure
+        _init_figure(ylim, xlabel)
+        try:
+            for chunk in chunks:
+                done += _render(chunk)
+                if callback is not None:
+                    callback(done)
+            return done
+        finally:
+            _figure = None
+    # leaving the with block terminates the workers, also on errors
+    with multiprocessing.Pool(processes, initializer=_init_figure,
+                              initargs=(ylim, xlabel)) as pool:
+        for count in pool.imap_unordered(_render, chunks):
+            done += count
+            if callback is not None:
+                callback(done)
+    return done